@@ -37,7 +37,7 @@ class DoAThing:
         return self._rando
 
     def print_header(self):
-        return pprint.pformat(_read_header(self._filename))
+        return pprint.pformat(_read_header(self._romdata))
 
     def print_tags(self, *tags):
         if len(tags) == 0:
@@ -99,6 +99,15 @@ class DoAThing:
         from .components import AssemblyObject
         return AssemblyObject._from_mem_structure(self._rando[comp]).annotate(self._romdata)
 
+    def benchmark_compression(self, effort=32):
+        from .game.ff6.components import FF6CompressionCodec
+        blocks = [self._rando[name] for name in sorted(self._rando.compressed_blocks())]
+        return pprint.pformat(FF6CompressionCodec.benchmark(blocks, self._romdata, effort))
+
+    def find_callers(self, addr):
+        cfg = self._rando.control_flow(self._romdata)
+        return pprint.pformat([hex(src) for src in cfg.callers_of(addr)])
+
     def apply_ips_patch(self, ips_file):
         from .tasks import PatchFromIPS
         log.info(f"Apply patch from {ips_file}")
@@ -120,6 +129,26 @@ class DoAThing:
 
         return
 
+    def batch_generate(self, seeds=1, flags=(), start=0, out_dir="seeds", fmt="ips",
+                       workers=None):
+        """
+        Generate `seeds` seeds (or those in a list of seeds), starting from `start`, in parallel. `flags` names the steps to run for each, see `tasks.batch`.
+        """
+        from .tasks.batch import batch_generate
+        seeds = range(start, start + seeds) if isinstance(seeds, int) else seeds
+        managers = {}
+        from .game.ff6.randomizers import FF6StaticRandomizer
+        if isinstance(self._rando, FF6StaticRandomizer):
+            from .game.ff6.managers.item import FF6ItemManager
+            from .game.ff6.managers.command import FF6CommandManager
+            managers = {"items": FF6ItemManager, "commands": FF6CommandManager}
+
+        report = batch_generate(self._romdata, [(seed, flags) for seed in seeds],
+                                self._rando.__class__, managers=managers,
+                                out_dir=out_dir, fmt=fmt, workers=workers)
+        report.pop("results")
+        return pprint.pformat(report)
+
     def apply_randomizer_task(self, task, comp, *args):
         log.info(f"Queueing task {task} for component {comp}, with args {args}")
         # TODO: We might validate args
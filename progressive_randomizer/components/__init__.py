@@ -1,3 +1,4 @@
+import csv
 import pprint
 import math
 import bisect
@@ -9,6 +10,10 @@ from dataclasses import dataclass, asdict
 import logging
 log = logging.getLogger()
 
+from .intervals import IntervalIndex
+from .image import RomImage, map_rom
+from .patchset import PatchSet
+
 @dataclass(repr=True, init=True)
 class MemoryStructure:
     """
@@ -73,12 +78,12 @@ class MemoryStructure:
             rom = struct @ b"\xff\xff" >> rom
 
             Note that this will do *all* writes starting from this link in the chain.
+            If `bindata` is a `RomImage`, it is written to in place, otherwise it is copied into a new `RomImage` first.
             """
-            bindata = bytearray(bindata)
-            for p in [*self]:
-                r = p.addr + len(p.payload)
-                bindata[p.addr:r] = p.payload
-            return bytes(bindata)
+            bindata = RomImage.wrap(bindata)
+            for p in self:
+                bindata.write(p.addr, p.payload)
+            return bindata
 
     def as_tuple(self):
         """
@@ -192,13 +197,13 @@ class MemoryStructure:
     def copy_to(self, dst, bindata):
         log.debug(f"{self.name}: Copying 0x{self.length:x} bytes of data "
                   f"starting at 0x{self.addr:x} to {dst:x}")
-        bindata[dst:dst + self.length] = bindata[self.addr:self.addr + self.length]
+        bindata[dst:dst + self.length] = bytes(bindata[self.addr:self.addr + self.length])
         return bindata
 
     def fill(self, bindata, fill_byte=0x0):
         log.debug(f"{self.name}: Filling 0x{self.length:x} bytes of data "
                   f"with {fill_byte:x} to 0x{self.addr:x}")
-        bindata[self.addr:self.addr + self.length] = bytes(fill_byte) * self.length
+        bindata[self.addr:self.addr + self.length] = bytes([fill_byte]) * self.length
         return bindata
 
     def read(self, bindata):
@@ -217,6 +222,13 @@ class MemoryStructure:
                   f"starting at 0x{self.addr:x}")
         return bytes(bindata[self.addr:self.addr+self.length])
 
+    def view(self, bindata):
+        """
+        Zero-copy, read-only view of this structure's data in `bindata`.
+        """
+        assert 0 <= self.addr < len(bindata)
+        return memoryview(bindata)[self.addr:self.addr + self.length].toreadonly()
+
     def deserialize(self, bindata):
         """
         Return a dictionary representation of this object with some metadata. Designed for use with JSON serialization.
@@ -229,6 +241,7 @@ class MemoryStructure:
     def chain_write(cls, writes):
         """
         Convenience method to generate several chained writes from a list.
+        For large numbers of writes, prefer a `PatchSet`.
         """
         payloads = []
         for addr, data in writes.items():
@@ -237,9 +250,10 @@ class MemoryStructure:
                       descr=f"I/O layer for chain writer @ {addr:x}")
             payloads.append(blk @ data)
 
+        # link in address order directly, chaining one at a time is quadratic
         payloads = sorted(payloads)
         for p1, p2 in zip(payloads[:-1], payloads[1:]):
-            p1.chain(p2)
+            p1.link = p2
         return payloads[0]
 
     @classmethod
@@ -252,11 +266,11 @@ class MemoryStructure:
         while addr < len(bindata):
             # Find the next position of an empty_byte, starting one
             # beyond the current address. If none is found, we're done.
-            try:
-                addr = st_addr = bindata.index(empty_byte, addr)
-                addr += 1
-            except ValueError:
+            # NOTE: find over index so that mapped images work as well
+            addr = st_addr = bindata.find(bytes([empty_byte]), addr)
+            if addr < 0:
                 break
+            addr += 1
             # Count up the length of this stretch
             while addr < len(bindata) and bindata[addr] == empty_byte:
                 addr += 1
@@ -337,8 +351,8 @@ class Registry:
 
     def __init__(self):
         self._blocks = {}
-        # TODO: make into interval tree
-        self._tree = {}
+        # block name -> address span
+        self._tree = IntervalIndex()
         self._tags = defaultdict(set)
 
     def check_contiguous(self):
@@ -357,7 +371,8 @@ class Registry:
             return self._blocks[name]
 
         block = MemoryStructure(addr, length, name, descr)
-        self._blocks[name] = self._tree[block.as_tuple()] = block
+        self._blocks[name] = block
+        self._tree.add(name, *block.as_tuple())
 
         for tag in tags:
             self._tags[tag].add(name)
@@ -368,7 +383,7 @@ class Registry:
         """
         Removes the block from the registry and its associated metadata, returning it.
         """
-        self._tree.pop(block.as_tuple())
+        self._tree.discard(block.name)
         for tag, blk_list in self._tags.items():
             blk_list.discard(block.name)
 
@@ -381,8 +396,20 @@ class Registry:
         """
         From a given address, find all blocks that contain this address and return them.
         """
-        return {block.name: block for span, block in self._tree.items()
-                                  if addr >= span[0] and addr < span[1]}
+        return {name: self._blocks[name] for name in self._tree.at(addr)}
+
+    def find_blks_in_range(self, beg, end):
+        """
+        Find all blocks overlapping the address range [beg, end) and return them.
+        """
+        return {name: self._blocks[name] for name in self._tree.overlapping(beg, end)}
+
+    def find_innermost_blk(self, addr):
+        """
+        From a given address, find the smallest block containing it, or None if it is not covered.
+        """
+        name = self._tree.innermost(addr)
+        return None if name is None else self._blocks[name]
 
     def format_tags(self, tag, sort_by=None):
         """
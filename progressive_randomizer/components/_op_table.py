@@ -0,0 +1,259 @@
+# Generated from snes_op_code_ref.csv by opcodes.build, do not edit.
+OPCODES = (
+    ('BRK', None, 'Break', 0, 'Stack/Interrupt', '----DI--', 2, None),
+    ('ORA (dp,X)', None, 'OR Accumulator with Memory', 1, 'DP Indexed Indirect,X', 'N-----Z-', 2, None),
+    ('COP #const', None, 'Co-Processor', 2, 'Stack/Interrupt', '----DI--', 2, None),
+    ('ORA sr,S', None, 'OR Accumulator with Memory', 3, 'Stack Relative', 'N-----Z-', 2, None),
+    ('TSB dp', None, 'Test and Set Memory Bits Against Accumulator', 4, 'Direct Page', '------Z-', 2, None),
+    ('ORA dp', None, 'OR Accumulator with Memory', 5, 'Direct Page', 'N-----Z-', 2, None),
+    ('ASL dp', None, 'Arithmetic Shift Left', 6, 'Direct Page', 'N-----ZC', 2, None),
+    ('ORA [dp]', None, 'OR Accumulator with Memory', 7, 'DP Indirect Long', 'N-----Z-', 2, None),
+    ('PHP', None, 'Push Processor Status Register', 8, 'Stack (Push)', '', 1, None),
+    ('ORA #const', None, 'OR Accumulator with Memory', 9, 'Immediate', 'N-----Z-', 2, 32),
+    ('ASL A', None, 'Arithmetic Shift Left', 10, 'Accumulator', 'N-----ZC', 1, None),
+    ('PHD', None, 'Push Direct Page Register', 11, 'Stack (Push)', '', 1, None),
+    ('TSB addr', None, 'Test and Set Memory Bits Against Accumulator', 12, 'Absolute', '------Z-', 3, None),
+    ('ORA addr', None, 'OR Accumulator with Memory', 13, 'Absolute', 'N-----Z-', 3, None),
+    ('ASL addr', None, 'Arithmetic Shift Left', 14, 'Absolute', 'N-----ZC', 3, None),
+    ('ORA long', None, 'OR Accumulator with Memory', 15, 'Absolute Long', 'N-----Z-', 4, None),
+    ('BPL nearlabel', None, 'Branch if Plus', 16, 'Program Counter Relative', '', 2, None),
+    ('ORA (dp),Y', None, 'OR Accumulator with Memory', 17, 'DP Indirect Indexed, Y', 'N-----Z-', 2, None),
+    ('ORA (dp)', None, 'OR Accumulator with Memory', 18, 'DP Indirect', 'N-----Z-', 2, None),
+    ('ORA (sr,S),Y', None, 'OR Accumulator with Memory', 19, 'SR Indirect Indexed,Y', 'N-----Z-', 2, None),
+    ('TRB dp', None, 'Test and Reset Memory Bits Against Accumulator', 20, 'Direct Page', '------Z-', 2, None),
+    ('ORA dp,X', None, 'OR Accumulator with Memory', 21, 'DP Indexed,X', 'N-----Z-', 2, None),
+    ('ASL dp,X', None, 'Arithmetic Shift Left', 22, 'DP Indexed,X', 'N-----ZC', 2, None),
+    ('ORA [dp],Y', None, 'OR Accumulator with Memory', 23, 'DP Indirect Long Indexed, Y', 'N-----Z-', 2, None),
+    ('CLC', None, 'Clear Carry', 24, 'Implied', '-------C', 1, None),
+    ('ORA addr,Y', None, 'OR Accumulator with Memory', 25, 'Absolute Indexed,Y', 'N-----Z-', 3, None),
+    ('INC A', 'INA', 'Increment', 26, 'Accumulator', 'N-----Z-', 1, None),
+    ('TCS', None, 'Transfer 16-bit Accumulator to Stack Pointer', 27, 'Implied', '', 1, None),
+    ('TRB addr', None, 'Test and Reset Memory Bits Against Accumulator', 28, 'Absolute', '------Z-', 3, None),
+    ('ORA addr,X', None, 'OR Accumulator with Memory', 29, 'Absolute Indexed,X', 'N-----Z-', 3, None),
+    ('ASL addr,X', None, 'Arithmetic Shift Left', 30, 'Absolute Indexed,X', 'N-----ZC', 3, None),
+    ('ORA long,X', None, 'OR Accumulator with Memory', 31, 'Absolute Long Indexed,X', 'N-----Z-', 4, None),
+    ('JSR addr', None, 'Jump to Subroutine', 32, 'Absolute', '', 3, None),
+    ('AND (dp,X)', None, 'AND Accumulator with Memory', 33, 'DP Indexed Indirect,X', 'N-----Z-', 2, None),
+    ('JSR long', 'JSL', 'Jump to Subroutine', 34, 'Absolute Long', '', 4, None),
+    ('AND sr,S', None, 'AND Accumulator with Memory', 35, 'Stack Relative', 'N-----Z-', 2, None),
+    ('BIT dp', None, 'Test Bits', 36, 'Direct Page', 'NV----Z-', 2, None),
+    ('AND dp', None, 'AND Accumulator with Memory', 37, 'Direct Page', 'N-----Z-', 2, None),
+    ('ROL dp', None, 'Rotate Memory or Accumulator Left', 38, 'Direct Page', 'N-----ZC', 2, None),
+    ('AND [dp]', None, 'AND Accumulator with Memory', 39, 'DP Indirect Long', 'N-----Z-', 2, None),
+    ('PLP', None, 'Pull Processor Status Register', 40, 'Stack (Pull)', 'NVMXDIZC', 1, None),
+    ('AND #const', None, 'AND Accumulator with Memory', 41, 'Immediate', 'N-----Z-', 2, 32),
+    ('ROL A', None, 'Rotate Memory or Accumulator Left', 42, 'Accumulator', 'N-----ZC', 1, None),
+    ('PLD', None, 'Pull Direct Page Register', 43, 'Stack (Pull)', 'N-----Z-', 1, None),
+    ('BIT addr', None, 'Test Bits', 44, 'Absolute', 'NV----Z-', 3, None),
+    ('AND addr', None, 'AND Accumulator with Memory', 45, 'Absolute', 'N-----Z-', 3, None),
+    ('ROL addr', None, 'Rotate Memory or Accumulator Left', 46, 'Absolute', 'N-----ZC', 3, None),
+    ('AND long', None, 'AND Accumulator with Memory', 47, 'Absolute Long', 'N-----Z-', 4, None),
+    ('BMI nearlabel', None, 'Branch if Minus', 48, 'Program Counter Relative', '', 2, None),
+    ('AND (dp),Y', None, 'AND Accumulator with Memory', 49, 'DP Indirect Indexed, Y', 'N-----Z-', 2, None),
+    ('AND (dp)', None, 'AND Accumulator with Memory', 50, 'DP Indirect', 'N-----Z-', 2, None),
+    ('AND (sr,S),Y', None, 'AND Accumulator with Memory', 51, 'SR Indirect Indexed,Y', 'N-----Z-', 2, None),
+    ('BIT dp,X', None, 'Test Bits', 52, 'DP Indexed,X', 'NV----Z-', 2, None),
+    ('AND dp,X', None, 'AND Accumulator with Memory', 53, 'DP Indexed,X', 'N-----Z-', 2, None),
+    ('ROL dp,X', None, 'Rotate Memory or Accumulator Left', 54, 'DP Indexed,X', 'N-----ZC', 2, None),
+    ('AND [dp],Y', None, 'AND Accumulator with Memory', 55, 'DP Indirect Long Indexed, Y', 'N-----Z-', 2, None),
+    ('SEC', None, 'Set Carry Flag', 56, 'Implied', '-------C', 1, None),
+    ('AND addr,Y', None, 'AND Accumulator with Memory', 57, 'Absolute Indexed,Y', 'N-----Z-', 3, None),
+    ('DEC A', 'DEA', 'Decrement', 58, 'Accumulator', 'N-----Z-', 1, None),
+    ('TSC', None, 'Transfer Stack Pointer to 16-bit Accumulator', 59, 'Implied', 'N-----Z-', 1, None),
+    ('BIT addr,X', None, 'Test Bits', 60, 'Absolute Indexed,X', 'NV----Z-', 3, None),
+    ('AND addr,X', None, 'AND Accumulator with Memory', 61, 'Absolute Indexed,X', 'N-----Z-', 3, None),
+    ('ROL addr,X', None, 'Rotate Memory or Accumulator Left', 62, 'Absolute Indexed,X', 'N-----ZC', 3, None),
+    ('AND long,X', None, 'AND Accumulator with Memory', 63, 'Absolute Long Indexed,X', 'N-----Z-', 4, None),
+    ('RTI', None, 'Return from Interrupt', 64, 'Stack (RTI)', 'NVMXDIZC', 1, None),
+    ('EOR (dp,X)', None, 'Exclusive-OR Accumulator with Memory', 65, 'DP Indexed Indirect,X', 'N-----Z-', 2, None),
+    ('WDM', None, 'Reserved for Future Expansion', 66, '', '', 2, None),
+    ('EOR sr,S', None, 'Exclusive-OR Accumulator with Memory', 67, 'Stack Relative', 'N-----Z-', 2, None),
+    ('MVP srcbk,destbk', None, 'Block Move Positive', 68, 'Block Move', '', 3, None),
+    ('EOR dp', None, 'Exclusive-OR Accumulator with Memory', 69, 'Direct Page', 'N-----Z-', 2, None),
+    ('LSR dp', None, 'Logical Shift Memory or Accumulator Right', 70, 'Direct Page', 'N-----ZC', 2, None),
+    ('EOR [dp]', None, 'Exclusive-OR Accumulator with Memory', 71, 'DP Indirect Long', 'N-----Z-', 2, None),
+    ('PHA', None, 'Push Accumulator', 72, 'Stack (Push)', '', 1, None),
+    ('EOR #const', None, 'Exclusive-OR Accumulator with Memory', 73, 'Immediate', 'N-----Z-', 2, 32),
+    ('LSR A', None, 'Logical Shift Memory or Accumulator Right', 74, 'Accumulator', 'N-----ZC', 1, None),
+    ('PHK', None, 'Push Program Bank Register', 75, 'Stack (Push)', '', 1, None),
+    ('JMP addr', None, 'Jump', 76, 'Absolute', '', 3, None),
+    ('EOR addr', None, 'Exclusive-OR Accumulator with Memory', 77, 'Absolute', 'N-----Z-', 3, None),
+    ('LSR addr', None, 'Logical Shift Memory or Accumulator Right', 78, 'Absolute', 'N-----ZC', 3, None),
+    ('EOR long', None, 'Exclusive-OR Accumulator with Memory', 79, 'Absolute Long', 'N-----Z-', 4, None),
+    ('BVC nearlabel', None, 'Branch if Overflow Clear', 80, 'Program Counter Relative', '', 2, None),
+    ('EOR (dp),Y', None, 'Exclusive-OR Accumulator with Memory', 81, 'DP Indirect Indexed, Y', 'N-----Z-', 2, None),
+    ('EOR (dp)', None, 'Exclusive-OR Accumulator with Memory', 82, 'DP Indirect', 'N-----Z-', 2, None),
+    ('EOR (sr,S),Y', None, 'Exclusive-OR Accumulator with Memory', 83, 'SR Indirect Indexed,Y', 'N-----Z-', 2, None),
+    ('MVN srcbk,destbk', None, 'Block Move Negative', 84, 'Block Move', '', 3, None),
+    ('EOR dp,X', None, 'Exclusive-OR Accumulator with Memory', 85, 'DP Indexed,X', 'N-----Z-', 2, None),
+    ('LSR dp,X', None, 'Logical Shift Memory or Accumulator Right', 86, 'DP Indexed,X', 'N-----ZC', 2, None),
+    ('EOR [dp],Y', None, 'Exclusive-OR Accumulator with Memory', 87, 'DP Indirect Long Indexed, Y', 'N-----Z-', 2, None),
+    ('CLI', None, 'Clear Interrupt Disable Flag', 88, 'Implied', '-----I--', 1, None),
+    ('EOR addr,Y', None, 'Exclusive-OR Accumulator with Memory', 89, 'Absolute Indexed,Y', 'N-----Z-', 3, None),
+    ('PHY', None, 'Push Index Register Y', 90, 'Stack (Push)', '', 1, None),
+    ('TCD', None, 'Transfer 16-bit Accumulator to Direct Page Register', 91, 'Implied', 'N-----Z-', 1, None),
+    ('JMP long', 'JML', 'Jump', 92, 'Absolute Long', '', 4, None),
+    ('EOR addr,X', None, 'Exclusive-OR Accumulator with Memory', 93, 'Absolute Indexed,X', 'N-----Z-', 3, None),
+    ('LSR addr,X', None, 'Logical Shift Memory or Accumulator Right', 94, 'Absolute Indexed,X', 'N-----ZC', 3, None),
+    ('EOR long,X', None, 'Exclusive-OR Accumulator with Memory', 95, 'Absolute Long Indexed,X', 'N-----Z-', 4, None),
+    ('RTS', None, 'Return from Subroutine', 96, 'Stack (RTS)', '', 1, None),
+    ('ADC (dp,X)', None, 'Add With Carry', 97, 'DP Indexed Indirect,X', 'NV----ZC', 2, None),
+    ('PER label', None, 'Push Effective PC Relative Indirect Address', 98, 'Stack (PC Relative Long)', '', 3, None),
+    ('ADC sr,S', None, 'Add With Carry', 99, 'Stack Relative', 'NV----ZC', 2, None),
+    ('STZ dp', None, 'Store Zero to Memory', 100, 'Direct Page', '', 2, None),
+    ('ADC dp', None, 'Add With Carry', 101, 'Direct Page', 'NV----ZC', 2, None),
+    ('ROR dp', None, 'Rotate Memory or Accumulator Right', 102, 'Direct Page', 'N-----ZC', 2, None),
+    ('ADC [dp]', None, 'Add With Carry', 103, 'DP Indirect Long', 'NV----ZC', 2, None),
+    ('PLA', None, 'Pull Accumulator', 104, 'Stack (Pull)', 'N-----Z-', 1, None),
+    ('ADC #const', None, 'Add With Carry', 105, 'Immediate', 'NV----ZC', 2, 32),
+    ('ROR A', None, 'Rotate Memory or Accumulator Right', 106, 'Accumulator', 'N-----ZC', 1, None),
+    ('RTL', None, 'Return from Subroutine Long', 107, 'Stack (RTL)', '', 1, None),
+    ('JMP (addr)', None, 'Jump', 108, 'Absolute Indirect', '', 3, None),
+    ('ADC addr', None, 'Add With Carry', 109, 'Absolute', 'NV----ZC', 3, None),
+    ('ROR addr', None, 'Rotate Memory or Accumulator Right', 110, 'Absolute', 'N-----ZC', 3, None),
+    ('ADC long', None, 'Add With Carry', 111, 'Absolute Long', 'NV----ZC', 4, None),
+    ('BVS nearlabel', None, 'Branch if Overflow Set', 112, 'Program Counter Relative', '', 2, None),
+    ('ADC ( dp),Y', None, 'Add With Carry', 113, 'DP Indirect Indexed, Y', 'NV----ZC', 2, None),
+    ('ADC (dp)', None, 'Add With Carry', 114, 'DP Indirect', 'NV----ZC', 2, None),
+    ('ADC (sr,S),Y', None, 'Add With Carry', 115, 'SR Indirect Indexed,Y', 'NV----ZC', 2, None),
+    ('STZ dp,X', None, 'Store Zero to Memory', 116, 'DP Indexed,X', '', 2, None),
+    ('ADC dp,X', None, 'Add With Carry', 117, 'DP Indexed,X', 'NV----ZC', 2, None),
+    ('ROR dp,X', None, 'Rotate Memory or Accumulator Right', 118, 'DP Indexed,X', 'N-----ZC', 2, None),
+    ('ADC [dp],Y', None, 'Add With Carry', 119, 'DP Indirect Long Indexed, Y', 'NV----ZC', 2, None),
+    ('SEI', None, 'Set Interrupt Disable Flag', 120, 'Implied', '-----I--', 1, None),
+    ('ADC addr,Y', None, 'Add With Carry', 121, 'Absolute Indexed,Y', 'NV----ZC', 3, None),
+    ('PLY', None, 'Pull Index Register Y', 122, 'Stack (Pull)', 'N-----Z-', 1, None),
+    ('TDC', None, 'Transfer Direct Page Register to 16-bit Accumulator', 123, 'Implied', 'N-----Z-', 1, None),
+    ('JMP (addr,X)', None, 'Jump', 124, 'Absolute Indexed Indirect', '', 3, None),
+    ('ADC addr,X', None, 'Add With Carry', 125, 'Absolute Indexed,X', 'NV----ZC', 3, None),
+    ('ROR addr,X', None, 'Rotate Memory or Accumulator Right', 126, 'Absolute Indexed,X', 'N-----ZC', 3, None),
+    ('ADC long,X', None, 'Add With Carry', 127, 'Absolute Long Indexed,X', 'NV----ZC', 4, None),
+    ('BRA nearlabel', None, 'Branch Always', 128, 'Program Counter Relative', '', 2, None),
+    ('STA (dp,X)', None, 'Store Accumulator to Memory', 129, 'DP Indexed Indirect,X', '', 2, None),
+    ('BRL label', None, 'Branch Long Always', 130, 'Program Counter Relative Long', '', 3, None),
+    ('STA sr,S', None, 'Store Accumulator to Memory', 131, 'Stack Relative', '', 2, None),
+    ('STY dp', None, 'Store Index Register Y to Memory', 132, 'Direct Page', '', 2, None),
+    ('STA dp', None, 'Store Accumulator to Memory', 133, 'Direct Page', '', 2, None),
+    ('STX dp', None, 'Store Index Register X to Memory', 134, 'Direct Page', '', 2, None),
+    ('STA [dp]', None, 'Store Accumulator to Memory', 135, 'DP Indirect Long', '', 2, None),
+    ('DEY', None, 'Decrement Index Register Y', 136, 'Implied', 'N-----Z-', 1, None),
+    ('BIT #const', None, 'Test Bits', 137, 'Immediate', '------Z-', 2, 32),
+    ('TXA', None, 'Transfer Index Register X to Accumulator', 138, 'Implied', 'N-----Z-', 1, None),
+    ('PHB', None, 'Push Data Bank Register', 139, 'Stack (Push)', '', 1, None),
+    ('STY addr', None, 'Store Index Register Y to Memory', 140, 'Absolute', '', 3, None),
+    ('STA addr', None, 'Store Accumulator to Memory', 141, 'Absolute', '', 3, None),
+    ('STX addr', None, 'Store Index Register X to Memory', 142, 'Absolute', '', 3, None),
+    ('STA long', None, 'Store Accumulator to Memory', 143, 'Absolute Long', '', 4, None),
+    ('BCC nearlabel', 'BLT', 'Branch if Carry Clear', 144, 'Program Counter Relative', '', 2, None),
+    ('STA (dp),Y', None, 'Store Accumulator to Memory', 145, 'DP Indirect Indexed, Y', '', 2, None),
+    ('STA (dp)', None, 'Store Accumulator to Memory', 146, 'DP Indirect', '', 2, None),
+    ('STA (sr,S),Y', None, 'Store Accumulator to Memory', 147, 'SR Indirect Indexed,Y', '', 2, None),
+    ('STY dp,X', None, 'Store Index Register Y to Memory', 148, 'DP Indexed,X', '', 2, None),
+    ('STA _dp_X', None, 'Store Accumulator to Memory', 149, 'DP Indexed,X', '', 2, None),
+    ('STX dp,Y', None, 'Store Index Register X to Memory', 150, 'DP Indexed,Y', '', 2, None),
+    ('STA [dp],Y', None, 'Store Accumulator to Memory', 151, 'DP Indirect Long Indexed, Y', '', 2, None),
+    ('TYA', None, 'Transfer Index Register Y to Accumulator', 152, 'Implied', 'N-----Z-', 1, None),
+    ('STA addr,Y', None, 'Store Accumulator to Memory', 153, 'Absolute Indexed,Y', '', 3, None),
+    ('TXS', None, 'Transfer Index Register X to Stack Pointer', 154, 'Implied', '', 1, None),
+    ('TXY', None, 'Transfer Index Register X to Index Register Y', 155, 'Implied', 'N-----Z-', 1, None),
+    ('STZ addr', None, 'Store Zero to Memory', 156, 'Absolute', '', 3, None),
+    ('STA addr,X', None, 'Store Accumulator to Memory', 157, 'Absolute Indexed,X', '', 3, None),
+    ('STZ addr,X', None, 'Store Zero to Memory', 158, 'Absolute Indexed,X', '', 3, None),
+    ('STA long,X', None, 'Store Accumulator to Memory', 159, 'Absolute Long Indexed,X', '', 4, None),
+    ('LDY #const', None, 'Load Index Register Y from Memory', 160, 'Immediate', 'N-----Z-', 2, 16),
+    ('LDA (dp,X)', None, 'Load Accumulator from Memory', 161, 'DP Indexed Indirect,X', 'N-----Z-', 2, None),
+    ('LDX #const', None, 'Load Index Register X from Memory', 162, 'Immediate', 'N-----Z-', 2, 16),
+    ('LDA sr,S', None, 'Load Accumulator from Memory', 163, 'Stack Relative', 'N-----Z-', 2, None),
+    ('LDY dp', None, 'Load Index Register Y from Memory', 164, 'Direct Page', 'N-----Z-', 2, None),
+    ('LDA dp', None, 'Load Accumulator from Memory', 165, 'Direct Page', 'N-----Z-', 2, None),
+    ('LDX dp', None, 'Load Index Register X from Memory', 166, 'Direct Page', 'N-----Z-', 2, None),
+    ('LDA [dp]', None, 'Load Accumulator from Memory', 167, 'DP Indirect Long', 'N-----Z-', 2, None),
+    ('TAY', None, 'Transfer Accumulator to Index Register Y', 168, 'Implied', 'N-----Z-', 1, None),
+    ('LDA #const', None, 'Load Accumulator from Memory', 169, 'Immediate', 'N-----Z-', 2, 32),
+    ('TAX', None, 'Transfer Accumulator to Index Register X', 170, 'Implied', 'N-----Z-', 1, None),
+    ('PLB', None, 'Pull Data Bank Register', 171, 'Stack (Pull)', 'N-----Z-', 1, None),
+    ('LDY addr', None, 'Load Index Register Y from Memory', 172, 'Absolute', 'N-----Z-', 3, None),
+    ('LDA addr', None, 'Load Accumulator from Memory', 173, 'Absolute', 'N-----Z-', 3, None),
+    ('LDX addr', None, 'Load Index Register X from Memory', 174, 'Absolute', 'N-----Z-', 3, None),
+    ('LDA long', None, 'Load Accumulator from Memory', 175, 'Absolute Long', 'N-----Z-', 4, None),
+    ('BCS nearlabel', 'BGE', 'Branch if Carry Set', 176, 'Program Counter Relative', '', 2, None),
+    ('LDA (dp),Y', None, 'Load Accumulator from Memory', 177, 'DP Indirect Indexed, Y', 'N-----Z-', 2, None),
+    ('LDA (dp)', None, 'Load Accumulator from Memory', 178, 'DP Indirect', 'N-----Z-', 2, None),
+    ('LDA (sr,S),Y', None, 'Load Accumulator from Memory', 179, 'SR Indirect Indexed,Y', 'N-----Z-', 2, None),
+    ('LDY dp,X', None, 'Load Index Register Y from Memory', 180, 'DP Indexed,X', 'N-----Z-', 2, None),
+    ('LDA dp,X', None, 'Load Accumulator from Memory', 181, 'DP Indexed,X', 'N-----Z-', 2, None),
+    ('LDX dp,Y', None, 'Load Index Register X from Memory', 182, 'DP Indexed,Y', 'N-----Z-', 2, None),
+    ('LDA [dp],Y', None, 'Load Accumulator from Memory', 183, 'DP Indirect Long Indexed, Y', 'N-----Z-', 2, None),
+    ('CLV', None, 'Clear Overflow Flag', 184, 'Implied', '-V------', 1, None),
+    ('LDA addr,Y', None, 'Load Accumulator from Memory', 185, 'Absolute Indexed,Y', 'N-----Z-', 3, None),
+    ('TSX', None, 'Transfer Stack Pointer to Index Register X', 186, 'Implied', 'N-----Z-', 1, None),
+    ('TYX', None, 'Transfer Index Register Y to Index Register X', 187, 'Implied', 'N-----Z-', 1, None),
+    ('LDY addr,X', None, 'Load Index Register Y from Memory', 188, 'Absolute Indexed,X', 'N-----Z-', 3, None),
+    ('LDA addr,X', None, 'Load Accumulator from Memory', 189, 'Absolute Indexed,X', 'N-----Z-', 3, None),
+    ('LDX addr,Y', None, 'Load Index Register X from Memory', 190, 'Absolute Indexed,Y', 'N-----Z-', 3, None),
+    ('LDA long,X', None, 'Load Accumulator from Memory', 191, 'Absolute Long Indexed,X', 'N-----Z-', 4, None),
+    ('CPY #const', None, 'Compare Index Register Y with Memory', 192, 'Immediate', 'N-----ZC', 2, 16),
+    ('CMP (dp,X)', None, 'Compare Accumulator with Memory', 193, 'DP Indexed Indirect,X', 'N-----ZC', 2, None),
+    ('REP #const', None, 'Reset Processor Status Bits', 194, 'Immediate', 'NVMXDIZC', 2, None),
+    ('CMP sr,S', None, 'Compare Accumulator with Memory', 195, 'Stack Relative', 'N-----ZC', 2, None),
+    ('CPY dp', None, 'Compare Index Register Y with Memory', 196, 'Direct Page', 'N-----ZC', 2, None),
+    ('CMP dp', None, 'Compare Accumulator with Memory', 197, 'Direct Page', 'N-----ZC', 2, None),
+    ('DEC dp', None, 'Decrement', 198, 'Direct Page', 'N-----Z-', 2, None),
+    ('CMP [dp]', None, 'Compare Accumulator with Memory', 199, 'DP Indirect Long', 'N-----ZC', 2, None),
+    ('INY', None, 'Increment Index Register Y', 200, 'Implied', 'N-----Z-', 1, None),
+    ('CMP #const', None, 'Compare Accumulator with Memory', 201, 'Immediate', 'N-----ZC', 2, 32),
+    ('DEX', None, 'Decrement Index Register X', 202, 'Implied', 'N-----Z-', 1, None),
+    ('WAI', None, 'Wait for Interrupt', 203, 'Implied', '', 1, None),
+    ('CPY addr', None, 'Compare Index Register Y with Memory', 204, 'Absolute', 'N-----ZC', 3, None),
+    ('CMP addr', None, 'Compare Accumulator with Memory', 205, 'Absolute', 'N-----ZC', 3, None),
+    ('DEC addr', None, 'Decrement', 206, 'Absolute', 'N-----Z-', 3, None),
+    ('CMP long', None, 'Compare Accumulator with Memory', 207, 'Absolute Long', 'N-----ZC', 4, None),
+    ('BNE nearlabel', None, 'Branch if Not Equal', 208, 'Program Counter Relative', '', 2, None),
+    ('CMP (dp),Y', None, 'Compare Accumulator with Memory', 209, 'DP Indirect Indexed, Y', 'N-----ZC', 2, None),
+    ('CMP (dp)', None, 'Compare Accumulator with Memory', 210, 'DP Indirect', 'N-----ZC', 2, None),
+    ('CMP (sr,S),Y', None, 'Compare Accumulator with Memory', 211, 'SR Indirect Indexed,Y', 'N-----ZC', 2, None),
+    ('PEI (dp)', None, 'Push Effective Indirect Address', 212, 'Stack (DP Indirect)', '', 2, None),
+    ('CMP dp,X', None, 'Compare Accumulator with Memory', 213, 'DP Indexed,X', 'N-----ZC', 2, None),
+    ('DEC dp,X', None, 'Decrement', 214, 'DP Indexed,X', 'N-----Z-', 2, None),
+    ('CMP [dp],Y', None, 'Compare Accumulator with Memory', 215, 'DP Indirect Long Indexed, Y', 'N-----ZC', 2, None),
+    ('CLD', None, 'Clear Decimal Mode Flag', 216, 'Implied', '----D---', 1, None),
+    ('CMP addr,Y', None, 'Compare Accumulator with Memory', 217, 'Absolute Indexed,Y', 'N-----ZC', 3, None),
+    ('PHX', None, 'Push Index Register X', 218, 'Stack (Push)', '', 1, None),
+    ('STP', None, 'Stop Processor', 219, 'Implied', '', 1, None),
+    ('JMP [addr]', 'JML', 'Jump', 220, 'Absolute Indirect Long', '', 3, None),
+    ('CMP addr,X', None, 'Compare Accumulator with Memory', 221, 'Absolute Indexed,X', 'N-----ZC', 3, None),
+    ('DEC addr,X', None, 'Decrement', 222, 'Absolute Indexed,X', 'N-----Z-', 3, None),
+    ('CMP long,X', None, 'Compare Accumulator with Memory', 223, 'Absolute Long Indexed,X', 'N-----ZC', 4, None),
+    ('CPX #const', None, 'Compare Index Register X with Memory', 224, 'Immediate', 'N-----ZC', 2, 16),
+    ('SBC (dp,X)', None, 'Subtract with Borrow from Accumulator', 225, 'DP Indexed Indirect,X', 'NV----ZC', 2, None),
+    ('SEP #const', None, 'Set Processor Status Bits', 226, 'Immediate', 'NVMXDIZC', 2, None),
+    ('SBC sr,S', None, 'Subtract with Borrow from Accumulator', 227, 'Stack Relative', 'NV----ZC', 2, None),
+    ('CPX dp', None, 'Compare Index Register X with Memory', 228, 'Direct Page', 'N-----ZC', 2, None),
+    ('SBC dp', None, 'Subtract with Borrow from Accumulator', 229, 'Direct Page', 'NV----ZC', 2, None),
+    ('INC dp', None, 'Increment', 230, 'Direct Page', 'N-----Z-', 2, None),
+    ('SBC [dp]', None, 'Subtract with Borrow from Accumulator', 231, 'DP Indirect Long', 'NV----ZC', 2, None),
+    ('INX', None, 'Increment Index Register X', 232, 'Implied', 'N-----Z-', 1, None),
+    ('SBC #const', None, 'Subtract with Borrow from Accumulator', 233, 'Immediate', 'NV----ZC', 2, 32),
+    ('NOP', None, 'No Operation', 234, 'Implied', '', 1, None),
+    ('XBA', None, 'Exchange B and A 8-bit Accumulators', 235, 'Implied', 'N-----Z-', 1, None),
+    ('CPX addr', None, 'Compare Index Register X with Memory', 236, 'Absolute', 'N-----ZC', 3, None),
+    ('SBC addr', None, 'Subtract with Borrow from Accumulator', 237, 'Absolute', 'NV----ZC', 3, None),
+    ('INC addr', None, 'Increment', 238, 'Absolute', 'N-----Z-', 3, None),
+    ('SBC long', None, 'Subtract with Borrow from Accumulator', 239, 'Absolute Long', 'NV----ZC', 4, None),
+    ('BEQ nearlabel', None, 'Branch if Equal', 240, 'Program Counter Relative', '', 2, None),
+    ('SBC (dp),Y', None, 'Subtract with Borrow from Accumulator', 241, 'DP Indirect Indexed, Y', 'NV----ZC', 2, None),
+    ('SBC (dp)', None, 'Subtract with Borrow from Accumulator', 242, 'DP Indirect', 'NV----ZC', 2, None),
+    ('SBC (sr,S),Y', None, 'Subtract with Borrow from Accumulator', 243, 'SR Indirect Indexed,Y', 'NV----ZC', 2, None),
+    ('PEA addr', None, 'Push Effective Absolute Address', 244, 'Stack (Absolute)', '', 3, None),
+    ('SBC dp,X', None, 'Subtract with Borrow from Accumulator', 245, 'DP Indexed,X', 'NV----ZC', 2, None),
+    ('INC dp,X', None, 'Increment', 246, 'DP Indexed,X', 'N-----Z-', 2, None),
+    ('SBC [dp],Y', None, 'Subtract with Borrow from Accumulator', 247, 'DP Indirect Long Indexed, Y', 'NV----ZC', 2, None),
+    ('SED', None, 'Set Decimal Flag', 248, 'Implied', '----D---', 1, None),
+    ('SBC addr,Y', None, 'Subtract with Borrow from Accumulator', 249, 'Absolute Indexed,Y', 'NV----ZC', 3, None),
+    ('PLX', None, 'Pull Index Register X', 250, 'Stack (Pull)', 'N-----Z-', 1, None),
+    ('XCE', None, 'Exchange Carry and Emulation Flags', 251, 'Implied', '--MX---CE', 1, None),
+    ('JSR (addr,X))', None, 'Jump to Subroutine', 252, 'Absolute Indexed Indirect', '', 3, None),
+    ('SBC addr,X', None, 'Subtract with Borrow from Accumulator', 253, 'Absolute Indexed,X', 'NV----ZC', 3, None),
+    ('INC addr,X', None, 'Increment', 254, 'Absolute Indexed,X', 'N-----Z-', 3, None),
+    ('SBC long,X', None, 'Subtract with Borrow from Accumulator', 255, 'Absolute Long Indexed,X', 'NV----ZC', 4, None),
+)
@@ -0,0 +1,312 @@
+"""
+A two-pass 65816 assembler.
+"""
+import re
+import ast
+import operator
+
+import logging
+log = logging.getLogger()
+
+from . import opcodes
+from .cfg import HiROM, LoROM
+
+# Fix up the operand templates from the opcode reference which don't follow the
+# others
+_TEMPLATE_FIXES = {"( dp),Y": "(dp),Y", "(addr,X))": "(addr,X)", "_dp_X": "dp,X"}
+
+# Alternate mnemonics, mapped to (mnemonic, template if it implies one)
+_ALIASES = {"JSL": ("JSR", "long"), "JML": ("JMP", "long"),
+            "BLT": ("BCC", None), "BGE": ("BCS", None),
+            "INA": ("INC", "A"), "DEA": ("DEC", "A")}
+
+_DATA_WIDTH = {"DB": 1, "DW": 2, "DL": 3}
+
+_BINOPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+           ast.FloorDiv: operator.floordiv, ast.Div: operator.floordiv,
+           ast.Mod: operator.mod, ast.LShift: operator.lshift,
+           ast.RShift: operator.rshift, ast.BitAnd: operator.and_,
+           ast.BitOr: operator.or_, ast.BitXor: operator.xor}
+_UNOPS = {ast.USub: operator.neg, ast.UAdd: operator.pos, ast.Invert: operator.invert}
+
+_NUMBER = re.compile(r"\$([0-9A-Fa-f]+)|%([01]+)")
+_LABEL = re.compile(r"^[A-Za-z_.][\w.]*$")
+
+# operand syntax -> (templates to try in order, expression)
+_OPERAND_FORMS = [
+    (re.compile(r"^#(?P<expr>.+)$"), ("#const",)),
+    (re.compile(r"^\((?P<expr>.+),\s*[sS]\s*\)\s*,\s*[yY]$"), ("(sr,S),Y",)),
+    (re.compile(r"^\((?P<expr>.+),\s*[xX]\s*\)$"), ("(dp,X)", "(addr,X)")),
+    (re.compile(r"^\((?P<expr>.+)\)\s*,\s*[yY]$"), ("(dp),Y",)),
+    (re.compile(r"^\((?P<expr>[^()]+)\)$"), ("(dp)", "(addr)")),
+    (re.compile(r"^\[(?P<expr>.+)\]\s*,\s*[yY]$"), ("[dp],Y",)),
+    (re.compile(r"^\[(?P<expr>.+)\]$"), ("[dp]", "[addr]")),
+    (re.compile(r"^(?P<expr>.+),\s*[sS]$"), ("sr,S",)),
+    (re.compile(r"^(?P<expr>.+),\s*[xX]$"), ("dp,X", "addr,X", "long,X")),
+    (re.compile(r"^(?P<expr>.+),\s*[yY]$"), ("dp,Y", "addr,Y")),
+    (re.compile(r"^(?P<expr>.+)$"), ("dp", "addr", "long", "nearlabel", "label")),
+]
+
+# operand bytes for the templates which come in several sizes
+_TEMPLATE_SIZE = {"dp": 1, "addr": 2, "long": 3,
+                  "dp,X": 1, "addr,X": 2, "long,X": 3, "dp,Y": 1, "addr,Y": 2,
+                  "(dp,X)": 1, "(addr,X)": 2, "(dp)": 1, "(addr)": 2,
+                  "[dp]": 1, "[addr]": 2}
+
+class Assembler:
+    """
+    A two-pass assembler for a subset of xkas / asar style 65816 assembly: `hirom` / `lorom`, `org`, labels (`name:`), `db` / `dw` / `dl`, and the instruction set from the opcode table, with integer expressions over labels.
+    The first pass lays out every statement and assigns label addresses, the second evaluates operands and encodes. Operand sizes are decided in the first pass: from a `.b` / `.w` / `.l` suffix on the mnemonic, then the number of digits in a bare literal, otherwise labels are taken as 16 bit addresses. Immediate widths follow the M / X flags through `rep` / `sep`.
+    Statements may be separated by `:`. Addresses are output as ROM offsets once a mapping (`hirom` / `lorom`) is declared, otherwise as written.
+    """
+    _INDEX = None
+
+    def __init__(self, m=True, x=True, comment=";"):
+        self._m, self._x = m, x
+        self._comment = comment
+
+    @classmethod
+    def _index(cls):
+        """
+        (mnemonic, operand template) -> `Opcode`
+        """
+        if cls._INDEX is None:
+            index = {}
+            for op in opcodes.table():
+                mnemonic, _, template = op.ext_name.partition(" ")
+                template = _TEMPLATE_FIXES.get(template, template)
+                index[(mnemonic, template)] = op
+            Assembler._INDEX = index
+        return cls._INDEX
+
+    #
+    # Expressions
+    #
+    @classmethod
+    def _parse_expr(cls, text):
+        text = _NUMBER.sub(lambda m: f"0x{m[1]}" if m[1] else f"0b{m[2]}", text.strip())
+        try:
+            return ast.parse(text, mode="eval").body
+        except SyntaxError:
+            raise SyntaxError(f"Could not parse expression: {text}")
+
+    @classmethod
+    def _eval(cls, node, labels):
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return node.value
+        elif isinstance(node, ast.Name) or isinstance(node, ast.Attribute):
+            name = ast.unparse(node)
+            if name not in labels:
+                raise SyntaxError(f"Undefined label: {name}")
+            return labels[name]
+        elif isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+            return _BINOPS[type(node.op)](cls._eval(node.left, labels),
+                                          cls._eval(node.right, labels))
+        elif isinstance(node, ast.UnaryOp) and type(node.op) in _UNOPS:
+            return _UNOPS[type(node.op)](cls._eval(node.operand, labels))
+        raise SyntaxError(f"Unsupported expression: {ast.unparse(node)}")
+
+    @classmethod
+    def _has_labels(cls, node):
+        return any(isinstance(n, (ast.Name, ast.Attribute)) for n in ast.walk(node))
+
+    @classmethod
+    def _literal_size(cls, text):
+        """
+        Operand size implied by a bare hex literal, e.g. $12 / $1234 / $123456.
+        """
+        m = re.fullmatch(r"\s*\$([0-9A-Fa-f]+)\s*", text)
+        if m is None:
+            return None
+        return min((len(m[1]) + 1) // 2, 3)
+
+    #
+    # Pass 1
+    #
+    def _statements(self, text):
+        """
+        Yield (line number, label or None, statement) for each statement.
+        """
+        mnemonics = {mnemonic for mnemonic, _ in self._index()} | set(_ALIASES)
+        for lineno, line in enumerate(text.splitlines(), start=1):
+            line = line.split(self._comment)[0].strip()
+            stmts = line.split(":")
+            # a leading `name:` is a label, unless it's a bare instruction
+            label = stmts[0].strip()
+            if len(stmts) > 1 and _LABEL.match(label) \
+                    and label.split(".")[0].upper() not in mnemonics:
+                yield lineno, label, None
+                stmts = stmts[1:]
+
+            for stmt in stmts:
+                stmt = stmt.strip()
+                if stmt:
+                    yield lineno, None, stmt
+
+    def _choose(self, mnemonic, operand, size):
+        """
+        Pick the opcode and operand expression for an instruction.
+        """
+        index = self._index()
+        mnemonic, forced = _ALIASES.get(mnemonic, (mnemonic, None))
+
+        if operand == "":
+            candidates, expr = [forced or "", "A"], None
+        elif operand.upper() == "A" and (mnemonic, "A") in index:
+            candidates, expr = ["A"], None
+        elif mnemonic in {"MVN", "MVP"}:
+            return index[(mnemonic, "srcbk,destbk")], operand
+        else:
+            for form, templates in _OPERAND_FORMS:
+                match = form.match(operand)
+                if match:
+                    candidates, expr = [*templates], match["expr"]
+                    break
+            if forced is not None:
+                candidates = [t for t in candidates if t == forced] or candidates
+
+        available = [t for t in candidates if (mnemonic, t) in index]
+        if len(available) == 0:
+            raise SyntaxError(f"No addressing mode for {mnemonic} {operand}")
+
+        # branches only take one operand form
+        relative = [t for t in available if t in {"nearlabel", "label"}]
+        if relative:
+            return index[(mnemonic, relative[0])], expr
+
+        if size is None and expr is not None:
+            size = self._literal_size(expr)
+        if size is None and expr is not None:
+            node = self._parse_expr(expr)
+            if self._has_labels(node):
+                size = 2
+            else:
+                value = self._eval(node, {})
+                size = 1 if value < 0x100 else 2 if value < 0x10000 else 3
+
+        sized = [t for t in available if t in _TEMPLATE_SIZE]
+        if size is not None and sized:
+            # the exact size, or else the smallest one which holds it
+            fits = sorted([t for t in sized if _TEMPLATE_SIZE[t] >= size],
+                          key=_TEMPLATE_SIZE.get)
+            return index[(mnemonic, fits[0] if fits else sized[-1])], expr
+
+        return index[(mnemonic, available[0])], expr
+
+    def _layout(self, text):
+        """
+        First pass: split into org chunks of (pc, kind, payload) statements, and find the label addresses.
+        """
+        labels, chunks = {}, []
+        mapper, pc, m, x = None, None, self._m, self._x
+
+        for lineno, label, stmt in self._statements(text):
+            if label is not None:
+                if label in labels:
+                    raise SyntaxError(f"line {lineno}: label {label} redefined")
+                labels[label] = pc
+                continue
+
+            head, _, rest = stmt.partition(" ")
+            keyword, rest = head.upper(), rest.strip()
+            try:
+                if keyword in {"HIROM", "LOROM"}:
+                    mapper = HiROM if keyword == "HIROM" else LoROM
+                    continue
+
+                if keyword == "ORG":
+                    pc = self._eval(self._parse_expr(rest), labels)
+                    offset = mapper.to_offset(pc) if mapper else pc
+                    chunks.append((offset, []))
+                    continue
+
+                if pc is None:
+                    raise SyntaxError("Code or data before the first org")
+
+                if keyword in _DATA_WIDTH:
+                    exprs = [self._parse_expr(e) for e in rest.split(",")]
+                    chunks[-1][1].append((lineno, pc, "data", (_DATA_WIDTH[keyword], exprs)))
+                    pc += _DATA_WIDTH[keyword] * len(exprs)
+                    continue
+
+                mnemonic, _, suffix = keyword.partition(".")
+                size = {"B": 1, "W": 2, "L": 3}.get(suffix)
+                op, expr = self._choose(mnemonic, rest, size)
+
+                length = op.length
+                if op.width is not None and expr is not None:
+                    wide = not (m if op.width == opcodes.M_FLAG else x)
+                    length += wide if size is None else size - 1
+
+                # keep track of the register widths through rep / sep
+                if mnemonic in {"REP", "SEP"}:
+                    bits = self._eval(self._parse_expr(expr), labels)
+                    if bits & opcodes.M_FLAG:
+                        m = mnemonic == "SEP"
+                    if bits & opcodes.X_FLAG:
+                        x = mnemonic == "SEP"
+
+                expr = None if expr is None else \
+                       [self._parse_expr(e) for e in expr.split(",")]
+                chunks[-1][1].append((lineno, pc, "instr", (op, expr, length)))
+                pc += length
+            except SyntaxError as e:
+                raise SyntaxError(f"line {lineno}: {stmt}: {e}") from None
+
+        return labels, chunks
+
+    #
+    # Pass 2
+    #
+    def _encode(self, pc, op, exprs, length, labels):
+        data = bytearray([op.opcode])
+        if exprs is None:
+            # e.g. BRK, which carries a signature byte
+            return data + bytes(length - 1)
+
+        values = [self._eval(e, labels) for e in exprs]
+        template = op.ext_name.partition(" ")[-1]
+        if template == "nearlabel":
+            rel = values[0] - (pc + length)
+            if not -0x80 <= rel < 0x80:
+                raise SyntaxError(f"Branch target out of range ({rel})")
+            return data + (rel & 0xFF).to_bytes(1, "little")
+        if template == "label":
+            rel = values[0] - (pc + length)
+            return data + (rel & 0xFFFF).to_bytes(2, "little")
+        if template == "srcbk,destbk":
+            # the destination bank comes first in the machine code
+            src, dst = values
+            return data + bytes([dst & 0xFF, src & 0xFF])
+
+        size = length - 1
+        return data + (values[0] & ((1 << (8 * size)) - 1)).to_bytes(size, "little")
+
+    def assemble(self, text):
+        """
+        Assemble `text` into a list of (address, bytes), one per `org`.
+        """
+        labels, chunks = self._layout(text)
+        self.labels = labels
+
+        output = []
+        for offset, stmts in chunks:
+            data = bytearray()
+            for lineno, pc, kind, payload in stmts:
+                try:
+                    if kind == "data":
+                        width, exprs = payload
+                        for e in exprs:
+                            val = self._eval(e, labels) & ((1 << (8 * width)) - 1)
+                            data += val.to_bytes(width, "little")
+                    else:
+                        data += self._encode(pc, *payload, labels)
+                except SyntaxError as e:
+                    raise SyntaxError(f"line {lineno}: {e}") from None
+            output.append((offset, bytes(data)))
+
+        return output
+
+    def assemble_file(self, asm_file):
+        with open(asm_file, "r") as fin:
+            return self.assemble(fin.read())
@@ -1,53 +1,15 @@
-import csv
+import os
 import functools
 from dataclasses import dataclass
 
 import logging
 log = logging.getLogger()
 
-from . import MemoryStructure
-
-def _int_from_asm_not(val, prefix="$"):
-    return int(val.replace(prefix, "0x"), base=16)
-
-def detect_header(text):
-    return any([kw in text for kw in {"hirom", "lorom"}])
-
-def strip_comments(text, comment=";"):
-    try:
-        idx = text.index(comment)
-        text = text[:idx].strip()
-    except ValueError:
-        pass
-    return text
-
-def parse_chunks(text, separators):
-    tok = [text]
-    for sep in separators:
-        for _ in range(len(tok)):
-            t = tok.pop(0)
-            if detect_header(t):
-                continue
-            tok.append(t.split(sep))
-        tok = functools.reduce(list.__add__, tok, [])
-
-    return tok
-
-def handle_org(tok):
-    return _int_from_asm_not(tok.replace("org", ""))
-
-def handle_db(tok, seps=","):
-    tok = tok.replace("db", "").strip()
-    return handle_data(tok, seps)
-
-def handle_data(text, sep=","):
-    return bytes(map(_int_from_asm_not, text.strip().split(sep)))
+from . import MemoryStructure, opcodes
 
 class AssemblyObject(MemoryStructure):
-    OP_REF = {}
-    with open("etc/snes_op_code_ref.csv", "r") as fin:
-        OP_REF = {int(item[3], base=16): (item[0], int(item[-2][0]))
-                  for item in csv.reader(fin.readlines())}
+    # REP / SEP, which clear / set processor status bits from their operand
+    _REP, _SEP = 0xC2, 0xE2
 
     @classmethod
     def _from_mem_structure(cls, memstruct):
@@ -55,29 +17,49 @@ class AssemblyObject(MemoryStructure):
                    memstruct.name, memstruct.descr)
 
     @classmethod
-    def _annotate(cls, bindata):
-        prg = ""
-        pad = max([len(op[0]) for op in cls.OP_REF.values()])
-        for op, args in cls._disassemble(bindata):
-            op_name = cls.OP_REF[op][0]
+    def _iter_annotate(cls, bindata, **kwargs):
+        optable = opcodes.table()
+        pad = max([len(op.ext_name) for op in optable])
+        for _, op, args in cls.disassemble(bindata, **kwargs):
+            op_name = optable[op].ext_name
             args = " ".join([f"{arg:02x}".rjust(3) for arg in args])
-            prg += f"{op_name.ljust(pad)} {args}\n"
-        return prg
+            yield f"{op_name.ljust(pad)} {args}\n"
 
     @classmethod
-    def _disassemble(cls, prg_bytes):
-        disassembly = []
-        prg_bytes = [*prg_bytes]
-        while len(prg_bytes) > 0:
-            op = prg_bytes.pop(0)
-            oplen = cls.OP_REF[op][-1]
-            args, prg_bytes = prg_bytes[:oplen], prg_bytes[oplen:]
-            disassembly.append([op, args])
+    def _annotate(cls, bindata, **kwargs):
+        return "".join(cls._iter_annotate(bindata, **kwargs))
 
-        return disassembly
+    @classmethod
+    def disassemble(cls, prg_bytes, m=True, x=True):
+        """
+        Lazily decode `prg_bytes` into (offset, opcode, operand bytes), tracking the accumulator (`m`) and index (`x`) widths through REP / SEP. `m` / `x` are the status bits, so True means 8 bit registers.
+        NOTE: the width is only tracked linearly, status changes from PLP / RTI or from code jumping in with other widths are not seen.
+        """
+        optable = opcodes.table()
+        prg, ptr = memoryview(prg_bytes).cast("B"), 0
+        # status bits which are currently set
+        status = (opcodes.M_FLAG if m else 0) | (opcodes.X_FLAG if x else 0)
+        while ptr < len(prg):
+            op = prg[ptr]
+            length, width = optable[op].length, optable[op].width
+            if width is not None and not status & width:
+                length += 1
+
+            args = bytes(prg[ptr + 1:ptr + length])
+            if op == cls._REP and args:
+                status &= ~args[0]
+            elif op == cls._SEP and args:
+                status |= args[0]
+
+            yield ptr, op, args
+            ptr += length
 
-    def annotate(self, bindata):
-        return self._annotate(self.read(bindata))
+    @classmethod
+    def _disassemble(cls, prg_bytes, **kwargs):
+        return [[op, [*args]] for _, op, args in cls.disassemble(prg_bytes, **kwargs)]
+
+    def annotate(self, bindata, **kwargs):
+        return self._annotate(self.read(bindata), **kwargs)
 
 class Assembly:
 
@@ -90,31 +72,22 @@ class Assembly:
         flags: str
         args: int
 
-        FLOW_OPS = {"JSR", "JSL", "RTS", "RTL", "JMP", "JML",
+        FLOW_OPS = {"JSR", "JSL", "RTS", "RTL", "RTI", "JMP", "JML",
                     "BEQ", "BNE", "BMI", "BPL", "BCS", "BCC",
                     "BVS", "BVC", "BRA", "BRL"}
 
-        OP_REF = {}
-        with open("etc/snes_op_code_ref.csv", "r") as fin:
-            OP_REF = {int(item[3], base=16): {
-                    "ext_name": item[0],
-                    "descr": item[1],
-                    "opcode": int(item[3], base=16),
-                    "mode": item[4],
-                    "flags": item[5],
-                    "args": int(item[6][0]),
-                }
-                for item in csv.reader(fin.readlines())
-            }
-        _BY_NAME = {instr.ext_name: instr for instr in OP_REF.values()}
+        @classmethod
+        def _from_opcode(cls, op):
+            return cls(ext_name=op.ext_name, descr=op.descr, opcode=op.opcode,
+                       mode=op.mode, flags=op.flags, args=op.length - 1)
 
         @classmethod
         def from_int(cls, opcode):
-            return cls(**cls.OP_REF[opcode])
+            return cls._from_opcode(opcodes.table()[opcode])
 
         @classmethod
         def from_text(cls, text):
-            return cls(**cls._BY_NAME[text])
+            return cls._from_opcode(opcodes.by_name()[text])
 
         @property
         def name(self):
@@ -161,26 +134,42 @@ class Assembly:
 
 
 class AssemblyEditor(AssemblyObject):
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _assemble_file(cls, asm_file, mtime, comment=";"):
+        from .assembler import Assembler
+        return tuple(Assembler(comment=comment).assemble_file(asm_file))
+
+    @classmethod
+    def assemble(cls, asm_file, comment=";"):
+        """
+        Assemble `asm_file` into a list of (address, bytes), one per `org`. The result is cached until the file changes.
+        """
+        return cls._assemble_file(asm_file, os.path.getmtime(asm_file), comment)
+
     @classmethod
     def from_asm(cls, asm_file, seps="\n:", db_sep=",", comment=";"):
-        with open(asm_file, "r") as fin:
-            asm = fin.readlines()
-
-        addr, data = None, b""
-        for _ in range(len(asm)):
-            line = strip_comments(asm.pop(0).strip(), comment=comment)
-            tokens = parse_chunks(line, separators=seps)
-
-            for tok in tokens:
-                if tok == "":
-                    continue
-                if "org" in tok:
-                    if addr is not None:
-                        obj = cls(addr, len(data), name="", descr="")
-                        yield obj, data
-                    addr = handle_org(tok)
-                    data = b""
-                elif "db" in tok:
-                    data += handle_db(tok, seps=db_sep)
-                else:
-                    raise SyntaxError(f"Unparsed token: {tok}")
\ No newline at end of file
+        # FIXME: seps / db_sep are fixed by the assembler syntax now, drop them
+        if (seps, db_sep) != ("\n:", ","):
+            raise ValueError("Custom statement / data separators are no longer supported.")
+        for addr, data in cls.assemble(asm_file, comment=comment):
+            obj = cls(addr, len(data), name=f"asm_{addr:x}",
+                      descr=f"Assembled from {asm_file} @ {addr:x}")
+            yield obj, data
+
+    @classmethod
+    def to_writes(cls, asm_file, comment=";"):
+        """
+        A `WriteBytes` task for each `org` in `asm_file`.
+        """
+        from ..tasks import WriteBytes
+        return [WriteBytes(obj, data)
+                for obj, data in cls.from_asm(asm_file, comment=comment)]
+
+    @classmethod
+    def to_patchset(cls, asm_file, comment=";"):
+        """
+        All of `asm_file` as a single `PatchSet`.
+        """
+        from .patchset import PatchSet
+        return PatchSet.from_hunks(cls.assemble(asm_file, comment=comment))
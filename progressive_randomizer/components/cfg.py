@@ -0,0 +1,233 @@
+"""
+Control flow over program blocks.
+"""
+import os
+import json
+import bisect
+import hashlib
+from collections import defaultdict
+
+import logging
+log = logging.getLogger()
+
+from . import opcodes
+from .assembly import AssemblyObject, Assembly
+
+class HiROM:
+    """
+    HiROM mapping between SNES addresses and ROM offsets.
+    """
+    @staticmethod
+    def to_offset(addr):
+        return addr & 0x3FFFFF
+
+    @staticmethod
+    def to_address(offset):
+        return 0xC00000 | offset
+
+class LoROM:
+    """
+    LoROM mapping between SNES addresses and ROM offsets.
+    """
+    @staticmethod
+    def to_offset(addr):
+        return ((addr >> 16) & 0x7F) * 0x8000 + (addr & 0x7FFF)
+
+    @staticmethod
+    def to_address(offset):
+        return 0x800000 | (offset // 0x8000) << 16 | 0x8000 | (offset & 0x7FFF)
+
+class ControlFlowGraph:
+    """
+    Basic blocks and jump / call / branch edges for a set of program blocks, addressed by ROM offset.
+    Blocks end after a flow instruction (`Assembly.Instruction.FLOW_OPS`) or just before the target of one. Edges are (source instruction, target, kind), with kind one of "call", "jump", "branch", or "fall" (falling through into the next block).
+    Indirect jumps and calls have no known target and so produce no edge.
+    """
+    _CACHE_VERSION = 1
+
+    def __init__(self, mapper=HiROM):
+        self._mapper = mapper
+        # start offset -> end offset (exclusive)
+        self.blocks = {}
+        self.edges = []
+        self._invalidate()
+
+    def _invalidate(self):
+        # lookups built lazily from blocks / edges, reset whenever those change
+        self._starts = None
+        self._succ = None
+        self._callers = None
+
+    @classmethod
+    def _flow_kind(cls, op):
+        name = op.ext_name.split(" ")[0]
+        if op.alias not in Assembly.Instruction.FLOW_OPS \
+                and name not in Assembly.Instruction.FLOW_OPS:
+            return None
+        if name in {"JSR", "JSL"}:
+            return "call"
+        if name in {"JMP", "JML", "BRA", "BRL"}:
+            return "jump"
+        if name in {"RTS", "RTL", "RTI"}:
+            return "return"
+        return "branch"
+
+    def _target(self, offset, op, args):
+        """
+        ROM offset that the flow instruction at `offset` goes to, if known.
+        """
+        addr = self._mapper.to_address(offset)
+        operand = int.from_bytes(args, "little")
+        if op.mode == "Program Counter Relative":
+            rel = operand - 0x100 if operand & 0x80 else operand
+        elif op.mode == "Program Counter Relative Long":
+            rel = operand - 0x10000 if operand & 0x8000 else operand
+        elif op.mode == "Absolute":
+            return self._mapper.to_offset((addr & 0xFF0000) | operand)
+        elif op.mode == "Absolute Long":
+            return self._mapper.to_offset(operand)
+        else:
+            return None
+
+        # relative targets wrap within the bank
+        nxt = addr + 1 + len(args)
+        return self._mapper.to_offset((addr & 0xFF0000) | ((nxt + rel) & 0xFFFF))
+
+    def add_program(self, offset, prg_bytes, m=True, x=True):
+        """
+        Disassemble the code in `prg_bytes` (found at ROM `offset`) and add its basic blocks and edges.
+        """
+        optable = opcodes.table()
+        end = offset + len(prg_bytes)
+
+        instrs, leaders, edges = [], {offset}, []
+        # instructions which never continue on to the next one
+        terminal = set()
+        for ptr, opcode, args in AssemblyObject.disassemble(prg_bytes, m=m, x=x):
+            ptr += offset
+            op = optable[opcode]
+            instrs.append(ptr)
+
+            kind = self._flow_kind(op)
+            if kind is None:
+                continue
+
+            leaders.add(ptr + 1 + len(args))
+            if kind in {"jump", "return"}:
+                terminal.add(ptr)
+            target = self._target(ptr, op, args)
+            if target is not None and kind != "return":
+                edges.append((ptr, target, kind))
+                if offset <= target < end:
+                    leaders.add(target)
+
+        # partition the instructions at the leaders
+        starts = sorted(l for l in leaders if offset <= l < end)
+        for beg, _end in zip(starts, starts[1:] + [end]):
+            self.blocks[beg] = _end
+
+        # blocks not ending in an unconditional transfer fall through
+        for beg, _end in zip(starts, starts[1:]):
+            idx = bisect.bisect_left(instrs, _end) - 1
+            if idx >= 0 and instrs[idx] not in terminal:
+                edges.append((instrs[idx], _end, "fall"))
+
+        self.edges.extend(edges)
+        self._invalidate()
+        return self
+
+    @classmethod
+    def from_blocks(cls, blocks, bindata, mapper=HiROM, **kwargs):
+        """
+        Build the graph over the `MemoryStructure`s in `blocks`.
+        """
+        cfg = cls(mapper)
+        for blk in blocks:
+            cfg.add_program(blk.addr, blk << bindata, **kwargs)
+        return cfg
+
+    def block_of(self, offset):
+        """
+        Start of the basic block containing `offset`, or None.
+        """
+        if self._starts is None:
+            self._starts = sorted(self.blocks)
+        idx = bisect.bisect_right(self._starts, offset) - 1
+        if idx >= 0 and offset < self.blocks[self._starts[idx]]:
+            return self._starts[idx]
+        return None
+
+    def callers(self):
+        """
+        Reverse index of target -> sorted sources, for every call / jump / branch.
+        """
+        if self._callers is None:
+            callers = defaultdict(list)
+            for src, dst, kind in self.edges:
+                if kind != "fall":
+                    callers[dst].append(src)
+            self._callers = {dst: sorted(src) for dst, src in callers.items()}
+        return self._callers
+
+    def callers_of(self, offset):
+        return self.callers().get(offset, [])
+
+    def successors(self, start):
+        """
+        Starts of the basic blocks following the block at `start`.
+        """
+        if self._succ is None:
+            succ = defaultdict(set)
+            for src, dst, _ in self.edges:
+                beg = self.block_of(src)
+                if beg is not None:
+                    succ[beg].add(dst)
+            self._succ = {beg: sorted(dsts) for beg, dsts in succ.items()}
+        return self._succ.get(start, [])
+
+    #
+    # On-disk caching
+    #
+    def save(self, fname):
+        with open(fname, "w") as fout:
+            json.dump({"version": self._CACHE_VERSION,
+                       "blocks": sorted(self.blocks.items()),
+                       "edges": self.edges}, fout)
+
+    @classmethod
+    def load(cls, fname, mapper=HiROM):
+        with open(fname, "r") as fin:
+            data = json.load(fin)
+        if data.get("version") != cls._CACHE_VERSION:
+            raise ValueError(f"{fname} is from an older cache version")
+
+        cfg = cls(mapper)
+        cfg.blocks = {beg: end for beg, end in data["blocks"]}
+        cfg.edges = [tuple(edge) for edge in data["edges"]]
+        cfg._invalidate()
+        return cfg
+
+    @classmethod
+    def cached(cls, blocks, bindata, cache_dir=None, mapper=HiROM, **kwargs):
+        """
+        As `from_blocks`, but keep the graph on disk under a key made from the ROM hash and the set of blocks, so it is only built once per ROM.
+        """
+        cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".cache",
+                                              "progressive_randomizer")
+        blocks = sorted(blocks, key=lambda blk: blk.addr)
+
+        key = hashlib.sha1(bindata)
+        key.update(repr([(blk.addr, blk.length) for blk in blocks]).encode())
+        key.update(repr((mapper.__name__, sorted(kwargs.items()))).encode())
+        fname = os.path.join(cache_dir, f"cfg_{key.hexdigest()}.json")
+
+        if os.path.exists(fname):
+            try:
+                return cls.load(fname, mapper)
+            except ValueError as e:
+                log.warning(f"Rebuilding control flow cache: {e}")
+
+        cfg = cls.from_blocks(blocks, bindata, mapper, **kwargs)
+        os.makedirs(cache_dir, exist_ok=True)
+        cfg.save(fname)
+        return cfg
@@ -0,0 +1,117 @@
+"""
+ROM images, mutable and memory-mapped.
+"""
+import mmap
+import contextlib
+
+import logging
+log = logging.getLogger()
+
+def map_rom(filename):
+    """
+    Memory-map `filename` read-only. Only the pages actually touched are read from disk, and slices / views of the mapping never copy the whole file.
+    Write into a `RomImage` made from the mapping (e.g. `WriteQueue.flush`) to get a writable copy.
+    """
+    with open(filename, "rb") as fin:
+        # the mapping holds its own handle to the file, so it outlives fin
+        return mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+
+@contextlib.contextmanager
+def shared_rom(bindata):
+    """
+    Copy `bindata` into a new shared memory block, yielding its name for worker processes to `attach_rom`. The block is removed on exit.
+    """
+    from multiprocessing import shared_memory
+    shm = shared_memory.SharedMemory(create=True, size=max(len(bindata), 1))
+    try:
+        shm.buf[:len(bindata)] = bindata
+        yield shm.name
+    finally:
+        shm.close()
+        shm.unlink()
+
+def attach_rom(name, size):
+    """
+    Attach to the `shared_rom` block `name`, returning the block and a read-only view of its first `size` bytes. The block must be kept alive as long as the view.
+    """
+    from multiprocessing import shared_memory
+    try:
+        # the creator owns (and unlinks) the block
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # FIXME: before 3.13 attaching also registers the block with the
+        # resource tracker, this relies on pool workers sharing the creator's
+        shm = shared_memory.SharedMemory(name=name)
+    return shm, shm.buf[:size].toreadonly()
+
+class RomImage(bytearray):
+    """
+    A mutable ROM image. Writes happen in place and slice reads return `memoryview`s into the image rather than copies, so a chain of patches can be applied without reallocating the image for each one.
+    Anything needing an immutable copy (hashing for a cache, keeping a base image around, etc.) should ask for one explicitly with `freeze` or `snapshot`.
+    NOTE: resizing the image (e.g. `expand`) is not possible while views into it are still alive.
+    """
+    @classmethod
+    def wrap(cls, bindata):
+        """
+        Return `bindata` if it is already an image, otherwise copy it into a new one.
+        """
+        if isinstance(bindata, cls):
+            return bindata
+        return cls(bindata)
+
+    @classmethod
+    def from_file(cls, filename):
+        with open(filename, "rb") as fin:
+            return cls(fin.read())
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(0x{len(self):x} bytes)"
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return memoryview(self)[idx]
+        return super().__getitem__(idx)
+
+    def __setitem__(self, idx, value):
+        # a view into ourselves would be copied over itself with overlapping
+        # buffers, detach it first
+        if isinstance(value, memoryview) and value.obj is self:
+            value = value.tobytes()
+        super().__setitem__(idx, value)
+
+    def view(self, addr, length):
+        """
+        Zero-copy, read-only view of `length` bytes starting at `addr`.
+        """
+        return memoryview(self)[addr:addr + length].toreadonly()
+
+    def write(self, addr, payload):
+        """
+        Write `payload` over the image at `addr`. The write must not extend the image.
+        """
+        end = addr + len(payload)
+        if addr < 0 or end > len(self):
+            raise IndexError(f"Write of 0x{len(payload):x} bytes at 0x{addr:x} "
+                             f"is outside of image (0x{len(self):x} bytes)")
+        self[addr:end] = payload
+        return self
+
+    def expand(self, size, fill=b"\x00"):
+        """
+        Append `size` bytes of `fill` to the end of the image.
+        """
+        log.debug(f"Expanding image by 0x{size:x} bytes")
+        self.extend(fill * size)
+        return self
+
+    def freeze(self):
+        """
+        Immutable copy of the image contents.
+        """
+        return bytes(self)
+
+    def snapshot(self):
+        """
+        Independent, mutable copy of the image.
+        """
+        return self.__class__(self)
@@ -0,0 +1,197 @@
+"""
+Interval indexing for address lookups.
+"""
+import heapq
+
+def find_overlaps(spans):
+    """
+    Sweep line over a list of half-open `(beg, end)` spans, returning every pair of indices `(i, j)` whose spans overlap, in O(n log n + k).
+    The active set is a heap ordered by end address, so spans which finish before the current start are retired before it is compared against anything.
+    """
+    order = sorted(range(len(spans)), key=lambda i: spans[i])
+    active, pairs = [], []
+    for i in order:
+        beg, end = spans[i]
+        if end <= beg:
+            continue
+
+        while active and active[0][0] <= beg:
+            heapq.heappop(active)
+        # everything left started no later than us and ends after we start
+        pairs.extend((j, i) for _, j in active)
+        heapq.heappush(active, (end, i))
+
+    return pairs
+
+class IntervalIndex:
+    """
+    A centered interval tree over half-open address spans `[beg, end)`, keyed by an arbitrary hashable (e.g. block name).
+    Point, range-overlap, and innermost containment queries run in O(log n + k).
+    The tree is rebuilt lazily on the first query after `add` / `discard`, so bulk registration only pays for one build.
+    """
+    class _Node:
+        __slots__ = ("center", "by_beg", "by_end", "left", "right")
+
+        def __init__(self, center, spans):
+            self.center = center
+            # (beg, end, key) sorted by ascending start and descending end
+            self.by_beg = sorted(spans)
+            self.by_end = sorted(spans, key=lambda s: s[1], reverse=True)
+            self.left = self.right = None
+
+    def __init__(self, spans=None):
+        self._spans = {}
+        self._root = None
+        self._dirty = False
+
+        for key, (beg, end) in (spans or {}).items():
+            self.add(key, beg, end)
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __contains__(self, key):
+        return key in self._spans
+
+    def __iter__(self):
+        """
+        Iterate over (beg, end, key) in address order.
+        """
+        yield from sorted((beg, end, key) for key, (beg, end) in self._spans.items())
+
+    def __getitem__(self, key):
+        return self._spans[key]
+
+    def add(self, key, beg, end):
+        """
+        Index the span `[beg, end)` under `key`, replacing any previous span for that key.
+        """
+        if end < beg:
+            raise ValueError(f"Invalid span for {key}: [0x{beg:x}, 0x{end:x})")
+        self._spans[key] = (beg, end)
+        self._dirty = True
+
+    def discard(self, key):
+        """
+        Remove `key` from the index, returning its span (or None if not present).
+        """
+        span = self._spans.pop(key, None)
+        self._dirty |= span is not None
+        return span
+
+    @classmethod
+    def _build(cls, spans):
+        """
+        Build the tree iteratively. The center of each node is the start of the median span, so every node holds at least one span and each child gets at most half of the remainder.
+        """
+        if len(spans) == 0:
+            return None
+
+        root, stack = None, [(None, None, sorted(spans))]
+        while stack:
+            parent, side, _spans = stack.pop()
+            center = _spans[len(_spans) // 2][0]
+
+            here, left, right = [], [], []
+            for span in _spans:
+                if span[1] <= center:
+                    left.append(span)
+                elif span[0] > center:
+                    right.append(span)
+                else:
+                    here.append(span)
+
+            node = cls._Node(center, here)
+            if parent is None:
+                root = node
+            else:
+                setattr(parent, side, node)
+
+            if left:
+                stack.append((node, "left", left))
+            if right:
+                stack.append((node, "right", right))
+
+        return root
+
+    def _get_root(self):
+        if self._dirty:
+            # Empty spans can't contain or overlap anything, leave them out
+            self._root = self._build([(beg, end, key)
+                                      for key, (beg, end) in self._spans.items()
+                                      if end > beg])
+            self._dirty = False
+        return self._root
+
+    def at(self, addr):
+        """
+        Return the keys of all spans containing `addr`.
+        """
+        found, node = [], self._get_root()
+        while node is not None:
+            if addr < node.center:
+                # everything here ends after the center, check the start
+                for beg, _, key in node.by_beg:
+                    if beg > addr:
+                        break
+                    found.append(key)
+                node = node.left
+            else:
+                # everything here starts at or before the center, check the end
+                for _, end, key in node.by_end:
+                    if end <= addr:
+                        break
+                    found.append(key)
+                node = node.right
+        return found
+
+    def overlapping(self, beg, end):
+        """
+        Return the keys of all spans overlapping `[beg, end)`.
+        """
+        found, stack = [], [self._get_root()]
+        while stack:
+            node = stack.pop()
+            if node is None or end <= beg:
+                continue
+
+            if end <= node.center:
+                for _beg, _, key in node.by_beg:
+                    if _beg >= end:
+                        break
+                    found.append(key)
+                stack.append(node.left)
+            elif beg > node.center:
+                for _, _end, key in node.by_end:
+                    if _end <= beg:
+                        break
+                    found.append(key)
+                stack.append(node.right)
+            else:
+                # query straddles the center, so everything here overlaps it
+                found.extend(key for _, _, key in node.by_beg)
+                stack.extend((node.left, node.right))
+        return found
+
+    def innermost(self, addr):
+        """
+        Return the key of the smallest span containing `addr`, or None. Ties go to the span starting latest.
+        """
+        spans = [(self._spans[key], key) for key in self.at(addr)]
+        if len(spans) == 0:
+            return None
+        return min(spans, key=lambda s: (s[0][1] - s[0][0], -s[0][0]))[-1]
+
+    def gaps(self, beg=0, end=None):
+        """
+        Yield the `[beg, end)` stretches not covered by any span.
+        """
+        ptr = beg
+        for _beg, _end, _ in self:
+            if _beg > ptr:
+                yield ptr, min(_beg, end) if end is not None else _beg
+            ptr = max(ptr, _end)
+            if end is not None and ptr >= end:
+                return
+        if end is not None and ptr < end:
+            yield ptr, end
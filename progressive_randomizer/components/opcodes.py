@@ -0,0 +1,78 @@
+"""
+The 65816 opcode table.
+
+The table is generated from `etc/snes_op_code_ref.csv` into the `_op_table` module, which is imported (and so compiled to bytecode once) on first use instead of parsing the CSV from the working directory. Regenerate it after editing the CSV with:
+
+    python -m progressive_randomizer.components.opcodes etc/snes_op_code_ref.csv
+"""
+import csv
+import importlib
+from collections import namedtuple
+
+# Processor status bits for the accumulator and index register widths
+M_FLAG, X_FLAG = 0x20, 0x10
+
+# `length` includes the opcode itself, `width` is the status bit which adds a
+# byte to the (immediate) operand when it is clear
+Opcode = namedtuple("Opcode", ("ext_name", "alias", "descr", "opcode", "mode",
+                               "flags", "length", "width"))
+
+_OPCODES = None
+_BY_NAME = None
+
+def table():
+    """
+    The 256 `Opcode`s, indexed by opcode.
+    """
+    global _OPCODES
+    if _OPCODES is None:
+        rows = importlib.import_module("._op_table", __package__).OPCODES
+        _OPCODES = tuple(Opcode(*row) for row in rows)
+    return _OPCODES
+
+def by_name():
+    """
+    Map of extended name (e.g. "LDA #const") -> `Opcode`.
+    """
+    global _BY_NAME
+    if _BY_NAME is None:
+        _BY_NAME = {op.ext_name: op for op in table()}
+    return _BY_NAME
+
+def _parse_csv(csv_file):
+    with open(csv_file, "r") as fin:
+        rows = {}
+        for item in csv.reader(fin.readlines()):
+            # lengths are e.g. "2[12]", the footnote marks width dependence
+            length, width = int(item[6][0]), None
+            if "[12]" in item[6]:
+                width = M_FLAG
+            elif "[14]" in item[6]:
+                width = X_FLAG
+            opcode = int(item[3], base=16)
+            rows[opcode] = (item[0], item[1] or None, item[2], opcode,
+                            item[4], item[5], length, width)
+
+    missing = set(range(256)) - set(rows)
+    if missing:
+        raise ValueError(f"Opcode reference is missing {len(missing)} opcodes.")
+    return [rows[op] for op in range(256)]
+
+def build(csv_file, out_file=None):
+    """
+    Regenerate the `_op_table` module from the opcode reference CSV.
+    """
+    import os
+    out_file = out_file or os.path.join(os.path.dirname(__file__), "_op_table.py")
+    with open(out_file, "w") as fout:
+        print(f"# Generated from {os.path.basename(csv_file)} by opcodes.build, "
+              "do not edit.", file=fout)
+        print("OPCODES = (", file=fout)
+        for row in _parse_csv(csv_file):
+            print(f"    {row!r},", file=fout)
+        print(")", file=fout)
+    return out_file
+
+if __name__ == "__main__":
+    import sys
+    print(build(*sys.argv[1:]))
@@ -0,0 +1,155 @@
+"""
+Bulk patch storage and application.
+"""
+from array import array
+
+from .image import RomImage
+from .intervals import find_overlaps
+
+class PatchSet:
+    """
+    A collection of (address, payload) hunks, stored as flat address / length / offset arrays over a single payload buffer.
+    Hunks are applied in the order they were added (so later hunks win where they overlap, as in an IPS file), queries see them in address order.
+    """
+    def __init__(self):
+        self._addrs = array("Q")
+        self._lens = array("Q")
+        self._offs = array("Q")
+        self._buffer = bytearray()
+        # permutation of the above into address order, built on demand
+        self._order = None
+
+    @classmethod
+    def from_hunks(cls, hunks):
+        """
+        Build a patch set from an iterable of (address, payload) pairs.
+        """
+        patches = cls()
+        for addr, payload in hunks:
+            patches.add(addr, payload)
+        return patches
+
+    @classmethod
+    def from_dict(cls, writes):
+        """
+        Build a patch set from a mapping of address -> payload.
+        """
+        return cls.from_hunks(sorted(writes.items(), key=lambda kv: kv[0]))
+
+    @classmethod
+    def from_ips(cls, reader):
+        """
+        Build a patch set from the hunks of an `IPSReader`.
+        """
+        return cls.from_hunks(reader)
+
+    def __len__(self):
+        return len(self._addrs)
+
+    def __iter__(self):
+        """
+        Iterate over (address, payload view) in address order.
+        """
+        buffer = memoryview(self._buffer)
+        for i in self._sorted():
+            off = self._offs[i]
+            yield self._addrs[i], buffer[off:off + self._lens[i]]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self)} hunks, 0x{self.nbytes():x} bytes)"
+
+    def _sorted(self):
+        if self._order is None:
+            # stable, so hunks at the same address keep their insertion order
+            self._order = array("Q", sorted(range(len(self._addrs)),
+                                            key=self._addrs.__getitem__))
+        return self._order
+
+    def add(self, addr, payload):
+        """
+        Add `payload` to be written at `addr`.
+        """
+        self._addrs.append(addr)
+        self._lens.append(len(payload))
+        self._offs.append(len(self._buffer))
+        self._buffer += payload
+        self._order = None
+        return self
+
+    def nbytes(self):
+        """
+        Total payload size.
+        """
+        return len(self._buffer)
+
+    def span(self):
+        """
+        Lowest and highest (exclusive) address written to.
+        """
+        if len(self) == 0:
+            return (0, 0)
+        return min(self._addrs), max(a + l for a, l in zip(self._addrs, self._lens))
+
+    def overlapping(self):
+        """
+        Return the pairs of hunk addresses which overlap each other.
+        """
+        spans = [(a, a + l) for a, l in zip(self._addrs, self._lens)]
+        return sorted((min(self._addrs[i], self._addrs[j]), max(self._addrs[i], self._addrs[j]))
+                      for i, j in find_overlaps(spans))
+
+    def validate(self):
+        """
+        Raise a ValueError if any hunks overlap.
+        """
+        overlaps = self.overlapping()
+        if len(overlaps) > 0:
+            descr = ", ".join([f"0x{a:x} / 0x{b:x}" for a, b in overlaps[:8]])
+            raise ValueError(f"{len(overlaps)} overlapping hunks in patch set: {descr}"
+                             + (", ..." if len(overlaps) > 8 else ""))
+        return self
+
+    def coalesce(self):
+        """
+        Return a new patch set where touching or overlapping hunks are merged into single hunks.
+        Overlaps are resolved in insertion order, so the result applies identically to this one.
+        """
+        merged = self.__class__()
+        order, buffer = self._sorted(), memoryview(self._buffer)
+
+        run, run_beg, run_end = [], None, None
+        for i in [*order, None]:
+            if i is not None and run and self._addrs[i] <= run_end:
+                run.append(i)
+                run_end = max(run_end, self._addrs[i] + self._lens[i])
+                continue
+
+            if run:
+                data = bytearray(run_end - run_beg)
+                # re-apply the run in insertion order
+                for j in sorted(run):
+                    beg, off = self._addrs[j] - run_beg, self._offs[j]
+                    data[beg:beg + self._lens[j]] = buffer[off:off + self._lens[j]]
+                merged.add(run_beg, data)
+
+            if i is not None:
+                run, run_beg, run_end = [i], self._addrs[i], self._addrs[i] + self._lens[i]
+
+        return merged
+
+    def to_dict(self):
+        return {addr: bytes(payload) for addr, payload in self}
+
+    def apply(self, bindata, base=0):
+        """
+        Write every hunk into `bindata` in a single pass, with addresses taken relative to `base`.
+        If `bindata` is a `RomImage`, it is written to in place, otherwise it is copied into a new `RomImage` first.
+        """
+        bindata = RomImage.wrap(bindata)
+        buffer = memoryview(self._buffer)
+        for addr, length, off in zip(self._addrs, self._lens, self._offs):
+            bindata.write(addr - base, buffer[off:off + length])
+        return bindata
+
+    def __rshift__(self, bindata):
+        return self.apply(bindata)
@@ -25,19 +25,20 @@ class StaticRandomizer:
         return self._reg.register_block(addr=beg, length=end - beg,
                                         name=name, descr=descr)
 
+    def control_flow(self, bindata, tag="program", cache_dir=None):
+        """
+        Control flow graph (see `ControlFlowGraph`) over the blocks with `tag`, cached on disk per ROM.
+        """
+        from .cfg import ControlFlowGraph
+        blocks = [self._reg._blocks[name] for name in self._reg._tags.get(tag, set())]
+        return ControlFlowGraph.cached(blocks, bindata, cache_dir=cache_dir)
+
     def _register_non_documented_areas(self):
         undoc_reg = Registry()
-        i, ptr = 0, 0x0
-        blks = sorted(self._reg._tree.keys(), key=lambda t: t[0])
-        for b1, b2 in blks:
-            if b1 < ptr:
-                continue
-            ptr2 = b1
-
-            undoc_reg.register_block(ptr, ptr2 - ptr,
+        for i, (beg, end) in enumerate(self._reg._tree.gaps()):
+            undoc_reg.register_block(beg, end - beg,
                                      f"undoc_{i}",
                                      f"Undocumented Area {i}")
-            ptr = b2
 
         return undoc_reg
 
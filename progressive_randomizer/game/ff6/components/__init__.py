@@ -2,6 +2,7 @@
 FF6 specifics
 """
 import math
+import struct
 from dataclasses import dataclass
 
 from .. import data
@@ -12,6 +13,22 @@ from .ram import *
 
 REGISTER_DATA = {}
 
+def _sngl_byte(value):
+    """
+    The lowest non-zero byte of a (possibly shifted) flag value, as in `Status.as_sngl_byte`.
+    """
+    value = int(value)
+    for shift in range(0, 32, 8):
+        if (value >> shift) & 0xFF:
+            return (value >> shift) & 0xFF
+    return 0
+
+def _byte_flag(flag_cls, shift=0):
+    """
+    Lazily decoded one byte flag field, placed at byte `shift // 8` of `flag_cls`.
+    """
+    return lazy_field(lambda value: flag_cls(value << shift), _sngl_byte)
+
 class FF6EventFlags(FF6DataTable):
     @classmethod
     def parse(cls, filename):
@@ -40,11 +57,19 @@ class FF6CharacterTable(FF6DataTable):
     _N_ITEMS = 64
 
     @dataclass
-    class CharacterEntry:
+    class CharacterEntry(FF6Record):
+        _STRUCT = struct.Struct("<22B")
+        _COLUMNS = (("hp", "u1"), ("mp", "u1"), ("commands", "u1", (4,)),
+                    *[(name, "u1") for name in ("vigor", "speed", "stamina", "magic",
+                                                "attack", "defense", "mag_def", "evade",
+                                                "mag_evade", "right", "left", "body",
+                                                "head", "relic_1", "relic_2", "run")])
+
         idx: int
         hp: int
         mp: int
-        commands: list
+        commands: list = lazy_field(lambda value: [*map(data.Command, value)],
+                                    lambda value: [*map(int, value)])
         vigor: int
         speed: int
         stamina: int
@@ -73,27 +98,23 @@ class FF6CharacterTable(FF6DataTable):
             return [*map(data.Command, value)]
 
         @classmethod
-        def parse_from_bytes(cls, _data, **kwargs):
-            return cls(**{
-                "hp": _data[0], "mp": _data[1],
-                "commands": cls.parse_commands(_data[2:6]),
-                "vigor": _data[6], "speed": _data[7], "stamina": _data[8],
-                "magic": _data[9], "attack": _data[10], "defense": _data[11],
-                "mag_def": _data[12], "evade": _data[13], "mag_evade": _data[14],
-                "right": _data[15], "left": _data[16],
-                "body": _data[17], "head": _data[18],
-                "relic_1": _data[19], "relic_2": _data[20],
-                "run": _data[21],
-                **kwargs
-            })
-
-        def __bytes__(self):
-            return bytes([self.hp, self.mp,
-                          *self.commands,
-                          self.vigor, self.speed, self.stamina, self.magic,
-                          self.attack, self.defense, self.mag_def, self.evade,
-                          self.mag_evade, self.right, self.left, self.body,
-                          self.head, self.relic_1, self.relic_2])
+        def _unpack(cls, values):
+            return {
+                "hp": values[0], "mp": values[1],
+                "commands": values[2:6],
+                **dict(zip(("vigor", "speed", "stamina", "magic", "attack", "defense",
+                            "mag_def", "evade", "mag_evade", "right", "left", "body",
+                            "head", "relic_1", "relic_2", "run"), values[6:]))
+            }
+
+        def _pack(self):
+            return (self.hp, self.mp, *self._get_raw("commands"),
+                    self.vigor, self.speed, self.stamina, self.magic,
+                    self.attack, self.defense, self.mag_def, self.evade,
+                    self.mag_evade, self.right, self.left, self.body,
+                    self.head, self.relic_1, self.relic_2, self.run)
+
+    _RECORD = CharacterEntry
 
     @classmethod
     def _register(cls, datatypes):
@@ -107,8 +128,7 @@ class FF6CharacterTable(FF6DataTable):
                          **kwargs)
 
     def read(self, bindata):
-        return [self.CharacterEntry.parse_from_bytes(data, idx=i)
-                for i, data in enumerate(self.dereference(super().read(bindata)))]
+        return self.read_records(bindata, self._RECORD)
 REGISTER_DATA = FF6CharacterTable._register(REGISTER_DATA)
 
 class FF6BattleMessages(FF6Text):
@@ -136,12 +156,15 @@ class FF6CommandTable(FF6DataTable):
         return datatypes
 
     @dataclass
-    class CommandEntry:
+    class CommandEntry(FF6Record):
+        _STRUCT = struct.Struct("<2B")
+        _COLUMNS = (("preference", "u1"), ("targeting", "u1"))
+
         idx: int
         can_mimic: bool
         can_imp: bool
 
-        targeting: data.SpellTargeting
+        targeting: data.SpellTargeting = lazy_field(data.SpellTargeting)
 
         @classmethod
         def parse_preference(cls, value):
@@ -151,26 +174,22 @@ class FF6CommandTable(FF6DataTable):
             return bool(value & 0x2), bool(value & 0x4)
 
         @classmethod
-        def parse_from_bytes(cls, _data, **kwargs):
-            mimic, imp = cls.parse_preference(_data[0])
-            return cls(**{
-                "can_mimic": mimic,
-                "can_imp": imp,
-                "targeting": data.SpellTargeting(_data[1]),
-                **kwargs
-            })
-
-        def __bytes__(self):
+        def _unpack(cls, values):
+            mimic, imp = cls.parse_preference(values[0])
+            return {"can_mimic": mimic, "can_imp": imp, "targeting": values[1]}
+
+        def _pack(self):
             pref = int(self.can_mimic) << 1 | int(self.can_imp) << 2
-            return bytes([pref, self.targeting])
+            return pref, self._get_raw("targeting")
+
+    _RECORD = CommandEntry
 
     def __init__(self):
         super().__init__(0x2, addr=0xFFE00, length=0x40, name="command_table",
                          descr="Command Data")
 
     def read(self, bindata):
-        return [self.CommandEntry.parse_from_bytes(data, idx=i)
-                for i, data in enumerate(self.dereference(self << bindata))]
+        return self.read_records(bindata, self._RECORD)
 REGISTER_DATA = FF6CommandTable._register(REGISTER_DATA)
 
 class FF6SpellTable(FF6DataTable):
@@ -180,60 +199,46 @@ class FF6SpellTable(FF6DataTable):
         return datatypes
 
     @dataclass
-    class SpellEntry:
+    class SpellEntry(FF6Record):
+        _STRUCT = struct.Struct("<14B")
+
         idx: int
-        targeting: list
-        element: list
-        spell_flags_1: list
-        spell_flags_2: list
-        spell_flags_3: list
+        targeting: list = lazy_field(data.SpellTargeting)
+        element: list = lazy_field(data.Element)
+        spell_flags_1: list = _byte_flag(data.SpellSpecialFlags)
+        spell_flags_2: list = _byte_flag(data.SpellSpecialFlags, 8)
+        spell_flags_3: list = _byte_flag(data.SpellSpecialFlags, 16)
         mp_cost: int
         spell_power: int
-        spell_flags_4: list
+        spell_flags_4: list = _byte_flag(data.SpellSpecialFlags, 24)
         hit_rate: int
-        status_1: list
-        status_2: list
-        status_3: list
-        status_4: list
+        status_1: list = _byte_flag(data.Status)
+        status_2: list = _byte_flag(data.Status, 8)
+        status_3: list = _byte_flag(data.Status, 16)
+        status_4: list = _byte_flag(data.Status, 24)
+        special_effect: int = 0
+
+        _FIELDS = ("targeting", "element", "spell_flags_1", "spell_flags_2",
+                   "spell_flags_3", "mp_cost", "spell_power", "spell_flags_4",
+                   "hit_rate", "special_effect",
+                   "status_1", "status_2", "status_3", "status_4")
+        _COLUMNS = tuple((name, "u1") for name in _FIELDS)
 
         @classmethod
-        def parse_from_bytes(cls, _data, **kwargs):
-            return cls(**{
-                "targeting": data.SpellTargeting(_data[0]),
-                "element": data.Element(_data[1]),
-                # FIXME: CHECK ORDER
-                "spell_flags_1": data.SpellSpecialFlags(_data[2]),
-                "spell_flags_2": data.SpellSpecialFlags(_data[3] << 8),
-                "spell_flags_3": data.SpellSpecialFlags(_data[4] << 16),
-                "mp_cost": _data[5],
-                "spell_power": _data[6],
-                "spell_flags_4": data.SpellSpecialFlags(_data[7] << 24),
-                "hit_rate": _data[8],
-                "status_1": data.Status(_data[8]),
-                "status_2": data.Status(_data[8] << 8),
-                "status_3": data.Status(_data[8] << 16),
-                "status_4": data.Status(_data[8] << 24),
-                # Use kwargs to override initializations from bytes
-                **kwargs
-            })
-
-        def __bytes__(self):
-            return bytes([self.targeting, self.element,
-                          self.spell_flags_1, self.spell_flags_2,
-                          self.spell_flags_3,
-                          self.mp_cost, self.spell_power,
-                          self.spell_flags_4,
-                          self.hit_rate,
-                          self.status_1, self.status_2,
-                          self.status_3, self.status_4])
+        def _unpack(cls, values):
+            return dict(zip(cls._FIELDS, values))
+
+        def _pack(self):
+            return [self._get_raw(name) for name in self._FIELDS]
+
+    _RECORD = SpellEntry
 
     def __init__(self):
         super().__init__(0xE, addr=0x46AC0, length=0xE00, name="spell_table",
                          descr="Spell Data")
 
     def read(self, bindata):
-        return [self.SpellEntry.parse_from_bytes(data, idx=i)
-            for i, data in enumerate(self.dereference(self << bindata))]
+        return self.read_records(bindata, self._RECORD)
 REGISTER_DATA = FF6SpellTable._register(REGISTER_DATA)
 
 class FF6ItemTable(FF6DataTable):
@@ -243,18 +248,35 @@ class FF6ItemTable(FF6DataTable):
         return datatypes
 
     @dataclass
-    class ItemEntry:
-        item_type: data.ItemType
-        equipped_by: data.EquipCharacter
+    class ItemEntry(FF6Record):
+        _STRUCT = struct.Struct("<BH6B5s14BH")
+        _COLUMNS = (("meta", "u1"), ("equipped_by", "<u2"),
+                    *[(name, "u1") for name in ("learn_rate", "learned_spell",
+                                                "field_effect", "status_1", "status_2",
+                                                "equip_status")],
+                    ("equip_flags", "u1", (5,)),
+                    *[(name, "u1") for name in ("targeting", "elemental_data",
+                                                "vigor_speed", "stamina_magic",
+                                                "weapon_spell", "special_flags", "power",
+                                                "actor_status_1", "actor_status_2",
+                                                "actor_status_3", "actor_status_4",
+                                                "_equipment_status", "evade",
+                                                "special_effect")],
+                    ("price", "<u2"))
+
+        item_type: data.ItemType = lazy_field(data.InventoryType)
+        equipped_by: data.EquipCharacter = lazy_field(data.EquipCharacter)
         learn_rate: int
-        learned_spell: data.Spell
+        learned_spell: data.Spell = lazy_field(data.Spell)
         field_effect: data.FieldEffects
-        status_1: data.Status
-        status_2: data.Status
-        equip_status: data.Status
-        equip_flags: data.EquipmentFlags
-        targeting: data.SpellTargeting
-        elemental_data: data.Element
+        status_1: data.Status = _byte_flag(data.Status)
+        status_2: data.Status = _byte_flag(data.Status, 8)
+        equip_status: data.Status = _byte_flag(data.Status, 16)
+        equip_flags: data.EquipmentFlags = lazy_field(
+            lambda value: data.EquipmentFlags.from_bytes(value, byteorder="little"),
+            lambda value: int(value).to_bytes(5, byteorder="little"))
+        targeting: data.SpellTargeting = lazy_field(data.SpellTargeting)
+        elemental_data: data.Element = lazy_field(data.Element)
         vigor: int
         speed: int
         stamina: int
@@ -263,15 +285,15 @@ class FF6ItemTable(FF6DataTable):
         special_flags: int
         power: int
         # actor status 1? also magdef
-        actor_status_1: int
+        actor_status_1: int = _byte_flag(data.Status)
         # actor status 2? also elem absorb
-        actor_status_2: int
+        actor_status_2: int = _byte_flag(data.Status, 8)
         # actor status 3? also elem null
-        actor_status_3: int
+        actor_status_3: int = _byte_flag(data.Status, 16)
         # actor status 4? also elem weak
-        actor_status_4: int
+        actor_status_4: int = _byte_flag(data.Status, 24)
         # ????
-        _equipment_status: int
+        _equipment_status: int = _byte_flag(data.Status, 8)
         evade: int
         magic_evade: int
         special_effect: int
@@ -282,7 +304,7 @@ class FF6ItemTable(FF6DataTable):
         battle_useable: bool
         menu_useable: bool
 
-        cast_spell: data.Spell
+        cast_spell: data.Spell = lazy_field(data.Spell)
         random_cast: bool
         inv_remove: bool
 
@@ -309,7 +331,7 @@ class FF6ItemTable(FF6DataTable):
 
         @classmethod
         def encode_item_meta(cls, item_type, throwability, bat_use, menu_use):
-            return menu_use << 7 | bat_use << 6 | throwability << 5 | item_type
+            return menu_use << 6 | bat_use << 5 | throwability << 4 | item_type
 
         @classmethod
         def decode_evd(cls, value):
@@ -318,7 +340,7 @@ class FF6ItemTable(FF6DataTable):
             :param value:
             :return:
             """
-            return value & 0xF, value & 0xF0 >> 4
+            return value & 0xF, (value & 0xF0) >> 4
 
         @classmethod
         def decode_dual(cls, value):
@@ -343,7 +365,7 @@ class FF6ItemTable(FF6DataTable):
             :param value: byte value
             :return: spell id, casts randomly, inventory removal
             """
-            return data.Spell(value & 0x3F), bool(value & 0x40 >> 6), bool(value & 0x80 >> 7)
+            return data.Spell(value & 0x3F), bool(value & 0x40), bool(value & 0x80)
 
         @classmethod
         def encode_wpn_spell_data(cls, spell, random_cast, inv_remove):
@@ -356,80 +378,72 @@ class FF6ItemTable(FF6DataTable):
             return (spell & 0x3F) + (int(random_cast) << 6) + (int(inv_remove) << 7)
 
         @classmethod
-        def parse_from_bytes(cls, _data):
-            args = dict(zip(["item_type", "throwable", "battle_useable", "menu_useable"],
-                             cls.decode_item_meta(_data[0])))
-            args.update(dict(zip(["vigor", "speed"], cls.decode_dual(_data[16]))))
-            args.update(dict(zip(["stamina", "magic"], cls.decode_dual(_data[17]))))
-            args.update(dict(zip(["evade", "magic_evade"], cls.decode_evd(_data[23]))))
-
-            # FIXME: need a switch on item type
-            args.update(dict(zip(["cast_spell", "random_cast", "inv_remove"],
-                                 cls.decode_wpn_spell_data(_data[18]))))
-
-            return cls(**{
-                "equipped_by": data.EquipCharacter.from_bytes(_data[1:3], byteorder="little"),
-                "learn_rate": _data[3],
-                "learned_spell": data.Spell(_data[4]),
-                "field_effect": _data[5],
-                "status_1": data.Status(_data[6]),
-                "status_2": data.Status(_data[7] << 8),
-                "equip_status": data.Status(_data[8] << 16),
-                "equip_flags": data.EquipmentFlags.from_bytes(_data[9:14], byteorder="little"),
-                "targeting": data.SpellTargeting(_data[14]),
-                "elemental_data": data.Element(_data[15]),
-                "special_flags": _data[19],
-                "power": _data[20],
-                "actor_status_1": data.Status(_data[21]),
-                "actor_status_2": data.Status(_data[22] << 8),
-                "actor_status_3": data.Status(_data[23] << 16),
-                "actor_status_4": data.Status(_data[24] << 24),
-                "_equipment_status": data.Status(_data[25] << 8),
-                "special_effect": _data[27],
-                "price": int.from_bytes(_data[28:30], byteorder="little"),
-                **args
-            })
-
-        def __bytes__(self):
-            meta = self.encode_item_meta(self.item_type, self.throwable,
-                                         self.battle_useable, self.menu_useable)
-            wpn_spell_data = self.encode_wpn_spell_data(self.cast_spell,
-                                                        self.random_cast,
-                                                        self.inv_remove)
-
-            # special treatment for the actor_status
-            if self.item_type == data.InventoryType.Item \
-               or self.name == " Empty".ljust(13):
-                status_blk = bytes([self.actor_status_1,
-                                    self.actor_status_2 >> 8,
-                                    self.actor_status_3 >> 16,
-                                    self.actor_status_4 >> 24])
-            else:
-                status_blk = bytes([self.actor_status_1, self.actor_status_2,
-                                    self.actor_status_3, self.actor_status_4])
-
-            return bytes([
-                meta,
-                *self.equipped_by.to_bytes(2, byteorder="little"),
-                self.learn_rate, self.learned_spell,
-                self.field_effect,
-                self.status_1 >> 8,
-                self.status_2 >> 16,
-                self.equip_status >> 16,
-                *self.equip_flags.to_bytes(5, byteorder="little"),
-                self.targeting,
-                self.elemental_data,
+        def _unpack(cls, values):
+            (meta, equipped_by, learn_rate, learned_spell, field_effect,
+             status_1, status_2, equip_status, equip_flags, targeting, element,
+             vig_spd, stm_mag, wpn_spell, special_flags, power,
+             act_1, act_2, act_3, act_4, eqp_status, evd, special_effect,
+             price) = values
+
+            vigor, speed = cls.decode_dual(vig_spd)
+            stamina, magic = cls.decode_dual(stm_mag)
+            evade, magic_evade = cls.decode_evd(evd)
+            return {
+                # the type is decoded lazily, the flags are cheap
+                "item_type": meta & 0x7,
+                "throwable": bool(meta & 0x10),
+                "battle_useable": bool(meta & 0x20),
+                "menu_useable": bool(meta & 0x40),
+                "equipped_by": equipped_by,
+                "learn_rate": learn_rate,
+                "learned_spell": learned_spell,
+                "field_effect": field_effect,
+                "status_1": status_1, "status_2": status_2,
+                "equip_status": equip_status,
+                "equip_flags": equip_flags,
+                "targeting": targeting,
+                "elemental_data": element,
+                "vigor": vigor, "speed": speed,
+                "stamina": stamina, "magic": magic,
+                # FIXME: need a switch on item type
+                "cast_spell": wpn_spell & 0x3F,
+                "random_cast": bool(wpn_spell & 0x40),
+                "inv_remove": bool(wpn_spell & 0x80),
+                "special_flags": special_flags,
+                "power": power,
+                "actor_status_1": act_1, "actor_status_2": act_2,
+                "actor_status_3": act_3, "actor_status_4": act_4,
+                "_equipment_status": eqp_status,
+                "evade": evade, "magic_evade": magic_evade,
+                "special_effect": special_effect,
+                "price": price,
+                "name": "", "descr": ""
+            }
+
+        def _pack(self):
+            raw = self._get_raw
+            return (
+                self.encode_item_meta(raw("item_type"), self.throwable,
+                                      self.battle_useable, self.menu_useable),
+                raw("equipped_by"),
+                self.learn_rate, raw("learned_spell"),
+                int(self.field_effect),
+                raw("status_1"), raw("status_2"), raw("equip_status"),
+                raw("equip_flags"),
+                raw("targeting"), raw("elemental_data"),
                 self.encode_dual(self.vigor, self.speed),
                 self.encode_dual(self.stamina, self.magic),
-                wpn_spell_data,
+                self.encode_wpn_spell_data(raw("cast_spell"), self.random_cast,
+                                           self.inv_remove),
                 self.special_flags,
                 self.power,
-                *status_blk,
-                self._equipment_status.as_sngl_byte(),
+                raw("actor_status_1"), raw("actor_status_2"),
+                raw("actor_status_3"), raw("actor_status_4"),
+                raw("_equipment_status"),
                 self.evade + (self.magic_evade << 4),
                 self.special_effect,
-                *self.price.to_bytes(2, byteorder="little")
-            ])
+                self.price
+            )
 
         def decode_special_flags(self):
             if self.item_type == data.InventoryType.Weapon:
@@ -534,63 +548,164 @@ In menu: {self.menu_useable} | In battle: {self.battle_useable} | Throwable: {se
 Price: {self.price}
 {table}""".strip()
 
+    _RECORD = ItemEntry
+
     def __init__(self):
         super().__init__(0x1E, addr=0x185000, length=0x1E00, name="item_table",
                          descr="Item Data")
 
     def read(self, bindata):
-        return [self.ItemEntry.parse_from_bytes(data)
-                for data in self.dereference(self << bindata)]
+        return self.read_records(bindata, self._RECORD)
 REGISTER_DATA = FF6ItemTable._register(REGISTER_DATA)
 
-# FIXME: DO NOT USE, IS INCOMPLETE: USE WC'S VERSION
 class FF6CompressionCodec(MemoryStructure):
-    def __init__(self):
-        pass
+    """
+    The LZ77 variant used for FF6 graphics, maps, and some program blocks.
 
-    def read(self, bindata):
-        """
-        https://datacrystal.romhacking.net/wiki/Final_Fantasy_VI:Compression_Format
+    https://datacrystal.romhacking.net/wiki/Final_Fantasy_VI:Compression_Format
+
+    The stream starts with its compressed size (including those two bytes), then groups of eight tokens, each group led by a flag byte read from the low bit up. A set bit is a literal byte, a clear bit a two byte reference to a 2 KB ring buffer: 11 bits of buffer position, and 5 bits of length less 3. The buffer is zero filled, and written from 0x7DE.
+    """
+    _BUF_SIZE = 0x800
+    _BUF_START = 0x7DE
+    _MIN_MATCH, _MAX_MATCH = 3, 34
 
-        https://en.wikipedia.org/wiki/LZ77_and_LZ78#LZ77
+    @classmethod
+    def from_super(cls, mem_struct):
+        return cls(mem_struct.addr, mem_struct.length,
+                   mem_struct.name, mem_struct.descr)
+
+    @classmethod
+    def decompress(cls, data):
+        data = memoryview(data).cast("B")
+        size = int.from_bytes(data[:2], byteorder="little")
+        buffer, mask = bytearray(cls._BUF_SIZE), cls._BUF_SIZE - 1
+        bptr, src = cls._BUF_START, 2
+
+        out = bytearray()
+        while src < size:
+            flags = data[src]
+            src += 1
+            for bit in range(8):
+                if src >= size:
+                    break
+                if flags & (1 << bit):
+                    out.append(data[src])
+                    buffer[bptr] = data[src]
+                    bptr = (bptr + 1) & mask
+                    src += 1
+                    continue
+
+                ptr = data[src] | (data[src + 1] & 0x7) << 8
+                nbytes = (data[src + 1] >> 3) + cls._MIN_MATCH
+                src += 2
+                # byte by byte, the copy can overlap what it is writing
+                for i in range(nbytes):
+                    val = buffer[(ptr + i) & mask]
+                    out.append(val)
+                    buffer[bptr] = val
+                    bptr = (bptr + 1) & mask
+
+        return bytes(out)
+
+    @classmethod
+    def compress(cls, data, effort=32):
+        """
+        Compress `data`, finding matches through hash chains of three byte prefixes. `effort` is the number of chain links followed per position, zero emits only literals.
         """
-        data = self << bindata
-        # This is zero for our emulated buffers
-        #start_f3 = self.addr
-        # Technically this is the destination in RAM, but we're emulating it
-        dst_f6 = 0
-        dsize = int.from_bytes(data[:2], byteorder="little")
-        data = data[2:]
-
-        buffer = bytearray([0] * 2048)
-        dst_buf = bytearray([0] * 2048)
-        bptr = 0
-
-        i = 0
-        while dsize >= 0:
-            if i % 8 == 0:
-                flags, data = data[0], data[1:]
-                continue
+        wsize, mask = cls._BUF_SIZE, cls._BUF_SIZE - 1
+        # positions are in the data prefixed by the (zero filled) buffer, so
+        # matches can also refer to the initial buffer contents
+        ext = bytes(wsize) + bytes(data)
+        size = len(ext)
+
+        head, prev = {}, [-1] * size
+        def insert(pos):
+            key = ext[pos:pos + cls._MIN_MATCH]
+            prev[pos] = head.get(key, -1)
+            head[key] = pos
+
+        for pos in range(min(wsize, size - cls._MIN_MATCH + 1)):
+            insert(pos)
+
+        out = bytearray(2)
+        cur, flag_at, bit = wsize, None, 8
+        while cur < size:
+            if bit == 8:
+                flag_at, bit = len(out), 0
+                out.append(0)
+
+            best_len, best_pos = 0, None
+            limit = min(cls._MAX_MATCH, size - cur)
+            if limit >= cls._MIN_MATCH:
+                cand, steps = head.get(ext[cur:cur + cls._MIN_MATCH], -1), effort
+                # distances must stay inside the buffer, the chains run backwards
+                while cand >= 0 and cur - cand < wsize and steps > 0:
+                    if ext[cand + best_len] == ext[cur + best_len]:
+                        length = cls._MIN_MATCH
+                        while length < limit and ext[cand + length] == ext[cur + length]:
+                            length += 1
+                        if length > best_len:
+                            best_len, best_pos = length, cand
+                            if length == limit:
+                                break
+                    cand, steps = prev[cand], steps - 1
+
+            if best_len >= cls._MIN_MATCH:
+                ptr = (best_pos - wsize + cls._BUF_START) & mask
+                out += bytes([ptr & 0xFF, ptr >> 8 | (best_len - cls._MIN_MATCH) << 3])
+                for pos in range(cur, min(cur + best_len, size - cls._MIN_MATCH + 1)):
+                    insert(pos)
+                cur += best_len
             else:
-                bit = 1 << ((i % 8) + 1)
-            i += 1
+                out[flag_at] |= 1 << bit
+                out.append(ext[cur])
+                if cur <= size - cls._MIN_MATCH:
+                    insert(cur)
+                cur += 1
+            bit += 1
+
+        if len(out) > 0xFFFF:
+            raise ValueError(f"Compressed size 0x{len(out):x} does not fit the size header.")
+        out[:2] = len(out).to_bytes(2, byteorder="little")
+        return bytes(out)
+
+    def read(self, bindata):
+        return self.decompress(self << bindata)
 
-            if flags & bit == bit:
-                dst_buf[dst_f6] = buffer[bptr] = data[0]
-                data = data[1:]
+    def patch(self, data, bindata=None, effort=32):
+        """
+        Compress `data` into this block, padding the remainder.
+        """
+        data = self.compress(data, effort)
+        if len(data) > self.length:
+            raise ValueError(f"{self.name}: compressed size 0x{len(data):x} "
+                             f"exceeds block length 0x{self.length:x}")
+        return super().patch(data.ljust(self.length, b"\xff"), bindata)
 
-                bptr += 1
-                dsize -= 1
-            else:
-                cpy = int.from_bytes(data[:2], byteorder="little")
-                data = data[2:]
-                # FIXME: check shift
-                ptr = cpy & (1 << 12 - 1)
-                nbytes = cpy & (1 << 6 - 1) << 16 + 3
-                # Is this copying the data or the bindata?
-                # data crystal claims it goes into both buffers?
-                #buffer[ptr:ptr + nbytes] = data[:nbytes]
-                dst_buf[dst_f6:dst_f6 + nbytes] = buffer[ptr:ptr + nbytes]
-                data = data[nbytes:]
-                bptr += nbytes
-                dsize -= nbytes + 2
+    @classmethod
+    def benchmark(cls, blocks, bindata, effort=32):
+        """
+        Decompress and recompress every block in `blocks`, checking the round trip and timing both directions.
+        """
+        import time
+        stats = {}
+        for blk in blocks:
+            data = blk << bindata
+            start = time.perf_counter()
+            raw = cls.decompress(data)
+            dtime = time.perf_counter() - start
+
+            start = time.perf_counter()
+            comp = cls.compress(raw, effort)
+            ctime = time.perf_counter() - start
+
+            stats[blk.name] = {
+                "orig_size": int.from_bytes(data[:2], byteorder="little"),
+                "raw_size": len(raw),
+                "new_size": len(comp),
+                "round_trip": cls.decompress(comp) == raw,
+                "decompress_time": dtime,
+                "compress_time": ctime
+            }
+        return stats
@@ -34,7 +34,100 @@ class FF6PointerTable(MemoryStructure):
         return struct.unpack("<" + "H" * (len(raw_data) // self.ptr_size),
                              raw_data)
 
+class lazy_field:
+    """
+    Record attribute which keeps the raw value it was unpacked from, and only builds (and caches) the decoded value, e.g. a flag enum, when it is first accessed. `encode` turns a decoded value back into the raw one.
+    """
+    def __init__(self, decode, encode=int):
+        self._decode = decode
+        self._encode = encode
+
+    def __set_name__(self, owner, name):
+        self._name, self._raw = name, "_raw_" + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            # no class level default, so dataclasses treat the field as required
+            raise AttributeError(self._name)
+        try:
+            return obj.__dict__[self._name]
+        except KeyError:
+            value = obj.__dict__[self._name] = self._decode(obj.__dict__[self._raw])
+            del obj.__dict__[self._raw]
+            return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self._name] = value
+        obj.__dict__.pop(self._raw, None)
+
+    def raw(self, obj):
+        try:
+            return obj.__dict__[self._raw]
+        except KeyError:
+            return self._encode(obj.__dict__[self._name])
+
+class FF6Record:
+    """
+    Fixed size table record, declared by a precompiled `struct.Struct` (`_STRUCT`) and a pair of methods every record defines: the classmethod `_unpack`, mapping the unpacked values to a dict of attributes, and `_pack`, returning the record's values in `_STRUCT` order.
+    Records are built without running `__init__`, and `lazy_field` attributes are left undecoded until used.
+    """
+    _STRUCT = None
+    # (name, numpy format) of each raw column, laid out as in `_STRUCT`
+    _COLUMNS = None
+
+    @classmethod
+    def dtype(cls):
+        """
+        NumPy record dtype of the raw columns.
+        """
+        dtype = cls.__dict__.get("_DTYPE")
+        if dtype is None:
+            import numpy
+            dtype = numpy.dtype(list(cls._COLUMNS))
+            assert dtype.itemsize == cls._STRUCT.size, cls.__name__
+            cls._DTYPE = dtype
+        return dtype
+
+    @classmethod
+    def _lazy_fields(cls):
+        # NOTE: looked up in the class dicts, as getattr on the class raises
+        fields = cls.__dict__.get("_LAZY_FIELDS")
+        if fields is None:
+            fields = {name: attr for klass in cls.__mro__
+                      for name, attr in vars(klass).items() if isinstance(attr, lazy_field)}
+            cls._LAZY_FIELDS = fields
+        return fields
+
+    def _get_raw(self, name):
+        """
+        Raw value of an attribute, without decoding it if it is a `lazy_field`.
+        """
+        attr = self._lazy_fields().get(name)
+        if attr is not None:
+            return attr.raw(self)
+        return getattr(self, name)
+
+    @classmethod
+    def from_values(cls, values, **kwargs):
+        obj, fields = cls.__new__(cls), cls._lazy_fields()
+        # lazy fields store their raw value under another name
+        obj.__dict__.update({fields[name]._raw if name in fields else name: value
+                             for name, value in cls._unpack(values).items()})
+        for name, value in kwargs.items():
+            setattr(obj, name, value)
+        return obj
+
+    @classmethod
+    def parse_from_bytes(cls, _data, **kwargs):
+        return cls.from_values(cls._STRUCT.unpack_from(_data), **kwargs)
+
+    def __bytes__(self):
+        return self._STRUCT.pack(*self._pack())
+
 class FF6DataTable(MemoryStructure):
+    # FF6Record type of the entries, if the table has one
+    _RECORD = None
+
     def __init__(self, item_size=None, **kwargs):
         super().__init__(**kwargs)
         self.item_size = item_size
@@ -59,16 +152,169 @@ class FF6DataTable(MemoryStructure):
         tbl_length = self.length // self.item_size
         return FF6PointerTable(addr=addr, length=tbl_length, name="", descr="")
 
+    def read_records(self, bindata, record, **kwargs):
+        """
+        Decode the whole table as `FF6Record`s of type `record` in one pass over the image, without copying out each item. `kwargs` are set on every record, along with its index as `idx` if the record has one.
+        """
+        view = memoryview(bindata)[self.addr:self.addr + self.length]
+        view = view[:len(view) - len(view) % record._STRUCT.size]
+        has_idx = "idx" in getattr(record, "__dataclass_fields__", {})
+        return [record.from_values(values, **({"idx": i} if has_idx else {}), **kwargs)
+                for i, values in enumerate(record._STRUCT.iter_unpack(view))]
+
+    def pack_records(self, records):
+        """
+        Encode `records` into a buffer the size of the table.
+        """
+        buf = bytearray(self.length)
+        for i, rec in enumerate(records):
+            rec._STRUCT.pack_into(buf, i * rec._STRUCT.size, *rec._pack())
+        return bytes(buf)
+
+    def view(self, bindata, record=None, copy=False):
+        """
+        Columnar, zero copy view of the table as a `TableView` over `bindata`. `record` defaults to the table's own record type. With `copy`, the view is over a copy of the table instead.
+        """
+        return TableView(self, record or self._RECORD, bindata, copy=copy)
+
     def dereference(self, bindata, ptr_tbl=None, offset=None):
         assert self.item_size is not None or ptr_tbl is not None
 
         if self.item_size is not None:
             nitems = self.length // self.item_size
             itrs = [i * self.item_size for i in range(nitems + 1)]
+            return [bytes(bindata[i:j]) for i, j in zip(itrs[:-1], itrs[1:])]
+
+        # entries run up to the next entry in memory, since repacked tables can
+        # share entries and so their pointers are not in order
+        ptrs = [ptr + offset for ptr in ptr_tbl.read(bindata)]
+        bounds = sorted(set(ptrs)) + [self.addr + self.length]
+        ends = {beg: end for beg, end in zip(bounds[:-1], bounds[1:])}
+        return [bytes(bindata[ptr:ends[ptr]]) for ptr in ptrs]
+
+    @classmethod
+    def layout(cls, entries, addr, length, offset, ptr_size=2, dedup=True,
+               share_suffixes=True, bank_size=0x10000):
+        """
+        Pack variable length `entries` into `[addr, addr + length)`, returning the packed data and a pointer (relative to `offset`) for each entry.
+        Identical entries are stored once and, if `share_suffixes`, an entry which is the tail of another points into it. Both assume entries are read up to a terminator rather than up to the next pointer. No entry is placed across a bank boundary, and gaps left before a boundary are filled with later entries where they fit.
+        """
+        entries = [bytes(entry) for entry in entries]
+        uniq = list(dict.fromkeys(entries)) if dedup else entries
+
+        # entry -> (host entry, position in the host)
+        hosted = {}
+        if dedup and share_suffixes:
+            # a suffix reversed is a prefix, and sorts just before the first
+            # entry it is a prefix of, so only neighbors need checking
+            rev = sorted(entry[::-1] for entry in uniq)
+            host = rev[-1]
+            for this, nxt in zip(rev[-2::-1], rev[::-1]):
+                host = host if nxt.startswith(this) else this
+                if host != this:
+                    hosted[this[::-1]] = (host[::-1], len(host) - len(this))
+        stored = [entry for entry in uniq if entry not in hosted]
+
+        data, placed = bytearray(), {}
+        pending = list(range(len(stored)))
+        while pending:
+            ptr = addr + len(data)
+            room = bank_size - ptr % bank_size
+            # first entry which fits before the next bank boundary
+            idx = next((i for i, j in enumerate(pending) if len(stored[j]) <= room), None)
+            if idx is None:
+                if any(len(stored[j]) > bank_size for j in pending):
+                    raise ValueError("Entry larger than a bank.")
+                data += bytes(room)
+                continue
+
+            j = pending.pop(idx)
+            placed.setdefault(stored[j], []).append(ptr)
+            data += stored[j]
+
+        if len(data) > length:
+            raise ValueError(f"Packed entries need 0x{len(data):x} bytes, "
+                             f"but only 0x{length:x} are available.")
+
+        # without deduplication identical entries are placed in order
+        ptrs = []
+        for entry in entries:
+            host, pos = hosted.get(entry, (entry, 0))
+            where = placed[host]
+            ptrs.append((where.pop(0) if not dedup else where[0]) + pos - offset)
+
+        if max(ptrs, default=0) >> (8 * ptr_size) or min(ptrs, default=0) < 0:
+            raise ValueError("Packed entries are not addressable from the pointer offset.")
+        return bytes(data), ptrs
+
+    def repack(self, entries, ptr_tbl, offset=None, pad=b"\xff", **kwargs):
+        """
+        Lay out `entries` in this table (see `layout`) and return the data and pointer table writes together. Unused pointer slots point at the end of the data.
+        """
+        from ....tasks import WriteBytes
+        offset = self.addr & ~0xFFFF if offset is None else offset
+        ptr_size = getattr(ptr_tbl, "ptr_size", 2)
+
+        nslots = ptr_tbl.length // ptr_size
+        if len(entries) > nslots:
+            raise ValueError(f"{len(entries)} entries do not fit in the "
+                             f"{nslots} pointers of {ptr_tbl.name}")
+
+        data, ptrs = self.layout(entries, self.addr, self.length, offset,
+                                 ptr_size=ptr_size, **kwargs)
+        ptrs += [self.addr + len(data) - offset] * (nslots - len(ptrs))
+
+        ptr_data = b"".join([p.to_bytes(ptr_size, byteorder="little") for p in ptrs])
+        return [WriteBytes(self, data.ljust(self.length, pad)),
+                WriteBytes(ptr_tbl, ptr_data.ljust(ptr_tbl.length, b"\x00"))]
+
+class TableView:
+    """
+    NumPy structured array over the raw records of a data table, sharing memory with the image. Indexing goes to the array, e.g.
+
+    view = items.view(bindata)
+    strong = (view["power"] > 150) & (view["equipped_by"] & EquipCharacter.Terra != 0)
+    view["price"][strong] //= 2
+
+    Writes go straight into the image, unless `copy` is given or `bindata` is read-only, in which case the view is over a copy of just the table. Either way, `writes` returns them as `WriteBytes` tasks.
+    """
+    def __init__(self, table, record, bindata, copy=False):
+        import numpy
+        self._table = table
+
+        nitems = table.length // record._STRUCT.size
+        if copy or memoryview(bindata).readonly:
+            end = table.addr + nitems * record._STRUCT.size
+            bindata, offset = bytearray(memoryview(bindata)[table.addr:end]), 0
         else:
-            itrs = [ptr + offset for ptr in ptr_tbl << bindata] + [self.length + offset]
+            offset = table.addr
+        self.array = numpy.frombuffer(bindata, dtype=record.dtype(),
+                                      count=nitems, offset=offset)
+        self._orig = self.array.tobytes()
+
+    def __getitem__(self, item):
+        return self.array[item]
+
+    def __setitem__(self, item, value):
+        self.array[item] = value
+
+    def __len__(self):
+        return len(self.array)
+
+    def writes(self):
+        """
+        A `WriteBytes` for each changed stretch of the table since the view was made.
+        """
+        from ....tasks import WriteBytes
+        from ....utils.diff import changed_ranges
 
-        return [bytes(bindata[i:j]) for i, j in zip(itrs[:-1], itrs[1:])]
+        tbl = self._table
+        data = self.array.tobytes()
+        return [WriteBytes(MemoryStructure(addr=tbl.addr + beg, length=end - beg,
+                                           name=f"{tbl.name}_0x{beg:x}",
+                                           descr=f"Changed in {tbl.descr}"),
+                           data[beg:end])
+                for beg, end in changed_ranges(self._orig, data)]
 
 class FF6MemoryManager(Registry):
     def __init__(self):
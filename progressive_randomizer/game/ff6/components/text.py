@@ -1,3 +1,6 @@
+import codecs
+from collections import Counter, defaultdict
+
 from ....components import MemoryStructure
 from .structures import FF6DataTable
 
@@ -70,6 +73,150 @@ CONTROL_SEQUENCES = {
 }
 _CTL_TO_SEQ = {v: k for k, v in CONTROL_SEQUENCES.items()}
 
+# Precomputed codec tables, so that decoding is a few C level passes over the
+# whole word (bytes.translate / replace, then a charmap decode) rather than a
+# dictionary lookup per byte
+_MAGIC_CHRS = b"\xe8\xe9\xea"
+# only the multi byte control sequences need replacing, the single byte ones
+# are folded into the decoding table
+_MULTI_SEQS = [(k, v) for k, v in CONTROL_SEQUENCES.items() if len(k) > 1]
+_SEQ_LEAD = bytes({k[0] for k, _ in _MULTI_SEQS})
+# deleting every byte we know how to decode leaves the unknown ones
+_KNOWN = bytes(i for i in range(256) if i in _CHARS)
+# glyphs start at 0x80 and control codes end below 0x20, nothing in the
+# charmap lives in between, so those are free for dictionary codes
+_DTE_CODES = bytes(i for i in range(0x20, 0x80) if i not in _CHARS)
+
+def _decoding_table(replace_ctl_seq):
+    # charmap tables are one character per byte, the ellipsis is expanded after
+    tbl = [_CHARS.get(i, "_") for i in range(256)]
+    if replace_ctl_seq:
+        for seq, ctl in CONTROL_SEQUENCES.items():
+            if len(seq) == 1:
+                tbl[seq[0]] = tbl[ctl[0]]
+    return "".join("\u2026" if c == "..." else c for c in tbl)
+
+_DECODE_TBL = {True: _decoding_table(True), False: _decoding_table(False)}
+
+# character -> encoded byte (as a latin-1 character), others encode as themselves
+_ENCODE_TBL = {ord(c): chr(b) for c, b in _CHARS.items()
+               if isinstance(c, str) and len(c) == 1}
+_CTL_TO_SEQ_STR = [(k.decode("latin-1"), v.decode("latin-1"))
+                   for k, v in _CTL_TO_SEQ.items()]
+
+class DTECompressor:
+    """
+    Byte pair (dual tile encoding) dictionary for encoded text.
+    Each entry maps a byte value unused by the text to a pair of bytes. Pairs can contain earlier entries, so common substrings collapse into a single byte. Entries are applied in the order they were chosen, and the table must be installed in the game's text decoder for compressed text to display.
+    """
+    def __init__(self, entries=None):
+        # code -> pair, in the order they are applied
+        self.entries = dict(entries or {})
+        self._expand = None
+
+    @staticmethod
+    def _pair_counts(msg):
+        cnt = Counter([msg[i:i + 2] for i in range(len(msg) - 1)])
+        # runs of one byte overlap, bytes.replace only substitutes every other one
+        for pair in [pair for pair in cnt if pair[0] == pair[1]]:
+            cnt[pair] = msg.count(pair)
+        return cnt
+
+    @classmethod
+    def fit(cls, corpus, max_entries=None, codes=None, reserved=b"", min_count=3):
+        """
+        Greedily choose the most frequent pair in the (encoded) `corpus` until the codes run out or no pair occurs `min_count` times. An entry saves a byte per occurrence and costs two in the table, so the default only keeps pairs which pay for themselves.
+        Codes default to the byte values between the control codes and the glyphs, less any which occur in the corpus or `reserved`.
+        """
+        corpus = [bytes(msg) for msg in corpus]
+        if codes is None:
+            used = set(reserved).union(*corpus)
+            codes = [c for c in _DTE_CODES if c not in used]
+        codes = list(codes)[:max_entries]
+
+        counts = [cls._pair_counts(msg) for msg in corpus]
+        total, where = Counter(), defaultdict(set)
+        for i, cnt in enumerate(counts):
+            total.update(cnt)
+            for pair in cnt:
+                where[pair].add(i)
+
+        entries = {}
+        for code in codes:
+            if not total:
+                break
+            pair, n = max(total.items(), key=lambda kv: kv[1])
+            if n < min_count:
+                break
+            entries[code] = pair
+
+            # only the messages containing the pair need recounting
+            sub = bytes([code])
+            for i in where.pop(pair):
+                corpus[i] = corpus[i].replace(pair, sub)
+                old, counts[i] = counts[i], cls._pair_counts(corpus[i])
+                total.subtract(old)
+                total.update(counts[i])
+                for _pair in old.keys() - counts[i].keys():
+                    where[_pair].discard(i)
+                    if total[_pair] <= 0:
+                        del total[_pair]
+                for _pair in counts[i]:
+                    where[_pair].add(i)
+
+        return cls(entries)
+
+    def encode(self, data):
+        # a code already in the input would be expanded to its pair on decoding
+        clash = set(self.entries).intersection(data)
+        if clash:
+            raise ValueError(f"Input contains dictionary codes {sorted(clash)}, "
+                             "it cannot be compressed with this dictionary.")
+        for code, pair in self.entries.items():
+            data = data.replace(pair, bytes([code]))
+        return data
+
+    def decode(self, data):
+        if self._expand is None:
+            # pairs only refer to earlier entries, so these are fully expanded
+            self._expand = [bytes([i]) for i in range(256)]
+            for code, pair in self.entries.items():
+                self._expand[code] = self._expand[pair[0]] + self._expand[pair[1]]
+        return b"".join([self._expand[c] for c in data])
+
+    def to_table(self):
+        """
+        The dictionary as a flat table of pairs, indexed from the lowest code. Unused codes in between are zero filled.
+        """
+        if not self.entries:
+            return b""
+        base = min(self.entries)
+        table = bytearray(2 * (max(self.entries) - base + 1))
+        for code, pair in self.entries.items():
+            table[2 * (code - base):2 * (code - base) + 2] = pair
+        return bytes(table)
+
+    def report(self, corpus):
+        """
+        Sizes of the (encoded) `corpus` before and after compression, the table cost, and how often each entry is used.
+        """
+        corpus = [bytes(msg) for msg in corpus]
+        packed = [self.encode(msg) for msg in corpus]
+        orig, comp = sum(map(len, corpus)), sum(map(len, packed))
+        usage = Counter()
+        for msg in packed:
+            usage.update(c for c in msg if c in self.entries)
+
+        return {
+            "entries": len(self.entries),
+            "original": orig,
+            "compressed": comp,
+            "table": 2 * len(self.entries),
+            "saved": orig - comp - 2 * len(self.entries),
+            "ratio": comp / orig if orig else 1.,
+            "usage": {self.decode(bytes([code])): usage[code] for code in self.entries}
+        }
+
 class FF6Text(MemoryStructure):
 
     @classmethod
@@ -79,45 +226,61 @@ class FF6Text(MemoryStructure):
 
     @classmethod
     def _decode(cls, word, length=None, replace_ctl_seq=True, strip_mag_chr=True,
-                strict=False):
+                strict=False, dictionary=None):
         if length is None:
-            return cls._decode_single(word, replace_ctl_seq, strip_mag_chr, strict)
+            return cls._decode_single(word, replace_ctl_seq, strip_mag_chr, strict,
+                                      dictionary)
 
         assert len(word) % length == 0
-        nitems = len(word) // length
-        itrs = [i * length for i in range(nitems + 1)]
-        data = [word[i:j] for i, j in zip(itrs[:-1], itrs[1:])]
+        word = memoryview(word).cast("B")
+        items = range(0, len(word), length)
+
+        # fixed length tables rarely have anything to strip or replace, if so
+        # decode the table in one go and cut the items from the string
+        data = word.tobytes()
+        if dictionary is None and not any(c in data for c in _MAGIC_CHRS + _SEQ_LEAD):
+            text = codecs.charmap_decode(data, "strict", _DECODE_TBL[True])[0]
+            return [text[i:i + length].replace("\u2026", "...") for i in items]
 
-        return [cls._decode_single(item) for item in data]
+        return [cls._decode_single(word[i:i + length], dictionary=dictionary)
+                for i in items]
 
     @classmethod
-    def _decode_single(cls, word, replace_ctl_seq=True, strip_mag_chr=True, strict=False):
-        _word = bytes(word[:])
-        if strip_mag_chr == True:
-            word = word.replace(b"\xe8", b"").replace(b"\xe9", b"").replace(b"\xea", b"")
+    def _decode_single(cls, word, replace_ctl_seq=True, strip_mag_chr=True, strict=False,
+                       dictionary=None):
+        _word = word = bytes(word)
+        if dictionary is not None:
+            word = dictionary.decode(word)
+        if strip_mag_chr:
+            word = word.translate(None, _MAGIC_CHRS)
         if replace_ctl_seq:
-            for key, replace in CONTROL_SEQUENCES.items():
+            for key, replace in _MULTI_SEQS:
                 word = word.replace(key, replace)
-        try:
-            return "".join([_CHARS[i] for i in word])
-        except KeyError as e:
-            if strict:
-                print(_word)
-                print(cls._decode(_word, replace_ctl_seq, strict=False))
-                raise e
-        return "".join([_CHARS.get(i, "_") for i in word])
+
+        unknown = strict and word.translate(None, _KNOWN)
+        if unknown:
+            print(_word)
+            print(cls._decode_single(_word, replace_ctl_seq, strip_mag_chr,
+                                     dictionary=dictionary))
+            raise KeyError(unknown[0])
+
+        text = codecs.charmap_decode(word, "strict", _DECODE_TBL[bool(replace_ctl_seq)])[0]
+        return text.replace("\u2026", "...")
 
     @classmethod
-    def _encode(cls, word, compress=True, replace_ctl_seq=False):
+    def _encode(cls, word, compress=True, replace_ctl_seq=False, dictionary=None):
         # Right now, there's only one multi-char compression to account for
         if compress:
             word = word.replace("...", "\x11")
 
-        word = bytes([_CHARS.get(char, ord(char)) for char in word])
+        word = word.translate(_ENCODE_TBL)
         if replace_ctl_seq:
-            for key, replace in _CTL_TO_SEQ.items():
+            for key, replace in _CTL_TO_SEQ_STR:
                 word = word.replace(key, replace)
 
+        word = word.encode("latin-1")
+        if compress and dictionary is not None:
+            word = dictionary.encode(word)
         return word
 
     @classmethod
@@ -292,7 +292,7 @@ class FF6CharacterManager(FF6StaticRandomizer):
 
     def randomize_commands(self, invalid, cmd_mgr, shuffle_cmds=False, replace_cmds=False,
                            unique_xmagic=True, force_only_cmd=None, force_skill_cmd=None,
-                           **kwargs):
+                           rng=None, **kwargs):
         # populate pool
         cmd_pool = {Command(c.idx) for n, c in cmd_mgr.cmd_data.items() if c.idx not in invalid}
         xmagic_used = False
@@ -326,7 +326,7 @@ class FF6CharacterManager(FF6StaticRandomizer):
                 if not (xmagic_used and unique_xmagic) else 0
             char.commands[1:] = cmd_mgr._get_random_commands(cmd_pool,
                                                              xmagic_prob=xmagic_prob,
-                                                             **kwargs)
+                                                             rng=rng, **kwargs)
             xmagic_used |= Command.X_Magic
 
             log.info(f"New commands for {str(Character(char.idx))}: {char.commands}")
@@ -282,7 +282,8 @@ class FF6CommandManager(FF6StaticRandomizer):
 
     # From BC, based in part on manage_commands_new
     def randomize_commands(self, bindata, no_combos=True, replace_everything=False,
-                           desperations=False, plays_itself=False):
+                           desperations=False, plays_itself=False, rng=None):
+        rng = rng or random
 
         cmds, cmd_installs = self.populate(bindata), []
 
@@ -294,13 +295,14 @@ class FF6CommandManager(FF6StaticRandomizer):
             new_cmd = copy.deepcopy(old_cmd)
 
             skill_choices = [*Spell]
-            choice = random.choice([
-                (new_cmd.use_skill, [0, random.choice(skill_choices)]),
-                (new_cmd.use_dual_skill, [0] + choice_without_replacement(skill_choices, k=2)),
-                (new_cmd.use_chain_skill, [0, random.choice(skill_choices)]),
+            choice = rng.choice([
+                (new_cmd.use_skill, [0, rng.choice(skill_choices)]),
+                (new_cmd.use_dual_skill, [0] + choice_without_replacement(skill_choices, k=2,
+                                                                          rng=rng)),
+                (new_cmd.use_chain_skill, [0, rng.choice(skill_choices)]),
                 # FIXME: generate rskill categories
                 #(new_cmd.use_rskill, None),
-                (new_cmd.use_wskill, [0, random.choice(skill_choices)]),
+                (new_cmd.use_wskill, [0, rng.choice(skill_choices)]),
                 None
             ])
 
@@ -376,15 +378,15 @@ class FF6CommandManager(FF6StaticRandomizer):
     # BC style
     def _get_random_commands(self, cmd_pool, only_unique=True,
                              item_prob=0.5, magic_prob=0.5,
-                             xmagic_prob=0.5, n=3):
+                             xmagic_prob=0.5, n=3, rng=None):
         commands = []
         # determine if x-magic is part of the menu
-        if random_prob(xmagic_prob):
+        if random_prob(xmagic_prob, rng=rng):
             commands.append(Command.X_Magic)
-        elif random_prob(magic_prob):
+        elif random_prob(magic_prob, rng=rng):
             commands.append(Command.Magic)
         # determine if item is part of the menu
-        if random_prob(item_prob):
+        if random_prob(item_prob, rng=rng):
             commands.append(Command.Item)
 
         n -= len(commands)
@@ -396,7 +398,7 @@ class FF6CommandManager(FF6StaticRandomizer):
         if len(cmd_pool) < n and not allow_pad:
             log.warning("Attempting draw a commands from pool without enough "
                         "left.\nThis will probably fail.")
-        new_cmds = choice_without_replacement(list(cmd_pool), k=n)
+        new_cmds = choice_without_replacement(sorted(cmd_pool), k=n, rng=rng)
 
         if only_unique:
             cmd_pool -= set(new_cmds)
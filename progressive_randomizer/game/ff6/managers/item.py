@@ -20,6 +20,7 @@ from ..data import (
     Item,
     InventoryType,
     EquipmentFlags,
+    Status,
 )
 
 from . import BoundedQuantity
@@ -104,17 +105,21 @@ class InventoryManager(FF6ProgressiveRandomizer):
 class FF6ItemManager(FF6StaticRandomizer):
     _BASE_ITEM_TMPLT = FF6ItemTable.ItemEntry
 
-    def handle_spell_proc(self, item, spell=None, random_cast=None, inv_remove=None):
-        item["cast_spell"] = spell or AttributeRandomizer.spells(skillsets={"magic"})
-        item["random_cast"] = random_cast or bool(random.randint(0, 1))
-        item["inv_remove"] = inv_remove or bool(random.randint(0, 1))
+    def handle_spell_proc(self, item, spell=None, random_cast=None, inv_remove=None,
+                          rng=None):
+        rng = rng or random
+        item["cast_spell"] = spell or AttributeRandomizer.spells(skillsets={"magic"}, rng=rng)
+        item["random_cast"] = random_cast or bool(rng.randint(0, 1))
+        item["inv_remove"] = inv_remove or bool(rng.randint(0, 1))
         return item
 
-    def handle_spell_learning(self, item, spell=None, closeness=50):
+    def handle_spell_learning(self, item, spell=None, closeness=50, rng=None):
         # TODO: handle tiering
-        item["learned_spell"] = spell or AttributeRandomizer.spells(skillsets={"magic"})
+        item["learned_spell"] = spell or AttributeRandomizer.spells(skillsets={"magic"},
+                                                                    rng=rng)
         lr = max(1, item["learn_rate"])
-        item["learn_rate"] = AttributeRandomizer.spells.gen_learning_rate(lr, closeness)
+        item["learn_rate"] = AttributeRandomizer.spells.gen_learning_rate(lr, closeness,
+                                                                          rng=rng)
         return item
 
     def handle_weapon_flags(self, item):
@@ -128,8 +133,9 @@ class FF6ItemManager(FF6StaticRandomizer):
 
     def generate(self, base, tmplt=None, mixing_ratio=0.1, closeness=100, keep=set(),
                  element_gen=0.1, status_gen=0.1, field_effect_gen=0.1, equip_effect_gen=0.1,
-                 learn_spell_prob=0.01, gen_proc_prob=0.05):
+                 learn_spell_prob=0.01, gen_proc_prob=0.05, rng=None):
         assert tmplt is None or base.item_type == tmplt.item_type
+        rng = rng or random
 
         base_item = asdict(base)
         new_item = base_item.copy()
@@ -138,95 +144,231 @@ class FF6ItemManager(FF6StaticRandomizer):
                 log.info(f"base {base.name} | attr {attr}: {base_item[attr]} -> NO CHANGE")
                 continue
 
-            if tmplt is not None and random.uniform(0, 1) < mixing_ratio:
+            if tmplt is not None and rng.uniform(0, 1) < mixing_ratio:
                 new_item[attr] = tmplt[attr]
 
             # FIXME: for both spells, we can modify rates / flags independently
             # if they are valid
             if attr == "learned_spell" \
-                    and (new_item["learn_rate"] > 0 or learn_spell_prob < random.uniform(0, 1)):
-                self.handle_spell_learning(new_item, closeness=closeness)
+                    and (new_item["learn_rate"] > 0 or learn_spell_prob < rng.uniform(0, 1)):
+                self.handle_spell_learning(new_item, closeness=closeness, rng=rng)
             elif attr == "cast_spell" \
                     and (new_item["random_cast"] > 0 or new_item["inv_remove"]
-                         or learn_spell_prob < random.uniform(0, 1)):
-                self.handle_spell_learning(new_item, closeness=closeness)
+                         or learn_spell_prob < rng.uniform(0, 1)):
+                self.handle_spell_learning(new_item, closeness=closeness, rng=rng)
             elif attr == "equipped_by":
                 new_item[attr] = AttributeRandomizer.equipchar.shuffle(new_item[attr],
                                                                        mix_ratio=0.5,
-                                                                       fuzzy=True)
+                                                                       fuzzy=True,
+                                                                       rng=rng)
             elif attr == "field_effect":
                 new_item[attr] = AttributeRandomizer.fieldeffect.shuffle(new_item[attr],
                                                                          fuzzy=True,
-                                                                         generate=field_effect_gen)
+                                                                         generate=field_effect_gen,
+                                                                         rng=rng)
             elif attr == "equip_flags":
                 exclude = {EquipmentFlags.UNKNOWN, EquipmentFlags.UNKNOWN_2,
                            EquipmentFlags.UNKNOWN_3, EquipmentFlags.UNKNOWN_4}
                 new_item[attr] = AttributeRandomizer.equipflags.shuffle(new_item[attr],
                                                                         fuzzy=True,
                                                                         exclude=exclude,
-                                                                        generate=equip_effect_gen)
+                                                                        generate=equip_effect_gen,
+                                                                        rng=rng)
             elif attr == "status_1":
                 new_item[attr] = AttributeRandomizer.status.shuffle(new_item[attr],
                                                                     fuzzy=True,
                                                                     generate=status_gen,
-                                                                    only_bytes={0})
+                                                                    only_bytes={0},
+                                                                    rng=rng)
             elif attr in "status_2":
                 new_item[attr] = AttributeRandomizer.status.shuffle(new_item[attr],
                                                                     fuzzy=True,
                                                                     generate=status_gen,
-                                                                    only_bytes={1})
+                                                                    only_bytes={1},
+                                                                    rng=rng)
             elif attr in "equip_status":
                 new_item[attr] = AttributeRandomizer.status.shuffle(new_item[attr],
                                                                     fuzzy=True,
                                                                     generate=status_gen,
-                                                                    only_bytes={2})
+                                                                    only_bytes={2},
+                                                                    rng=rng)
             elif attr in "_equipment_status":
                 new_item[attr] = AttributeRandomizer.status.shuffle(new_item[attr],
                                                                     fuzzy=True,
                                                                     generate=status_gen,
-                                                                    only_bytes={1})
+                                                                    only_bytes={1},
+                                                                    rng=rng)
             elif attr == "elemental_data":
                 new_item[attr] = AttributeRandomizer.element.shuffle(new_item[attr],
                                                                      fuzzy=True,
-                                                                     generate=element_gen)
+                                                                     generate=element_gen,
+                                                                     rng=rng)
             elif attr == "targeting":
-                new_item[attr] = AttributeRandomizer.spelltargeting(new_item[attr])
+                new_item[attr] = AttributeRandomizer.spelltargeting(new_item[attr], rng=rng)
             elif attr in {"vigor", "speed", "stamina", "magic"}:
-                new_item[attr] = StatRandomizer(-7, 7)(new_item[attr], closeness)
+                new_item[attr] = StatRandomizer(-7, 7)(new_item[attr], closeness, rng=rng)
             elif attr in {"evade", "magic_evade"}:
-                new_item[attr] = StatRandomizer(0, 15)(new_item[attr], closeness)
+                new_item[attr] = StatRandomizer(0, 15)(new_item[attr], closeness, rng=rng)
             elif attr == "power":
                 # This wpn pwr / armor def / item heal
-                new_item[attr] = StatRandomizer(0, 255)(new_item[attr], closeness)
+                new_item[attr] = StatRandomizer(0, 255)(new_item[attr], closeness, rng=rng)
             elif attr == "actor_status_1":
                 # This wpn hit rate / armor mag def / item status
                 if base.item_type == InventoryType.Item:
                     new_item[attr] = AttributeRandomizer.status.shuffle(new_item[attr],
                                                                         fuzzy=True,
-                                                                        only_bytes={0})
+                                                                        only_bytes={0},
+                                                                        rng=rng)
                 else:
-                    new_item[attr] = StatRandomizer(0, 255)(new_item[attr], closeness)
+                    new_item[attr] = StatRandomizer(0, 255)(new_item[attr], closeness, rng=rng)
             elif attr in {"actor_status_2", "actor_status_3", "actor_status_4"}:
                 # This wpn and armor elem {absorb,null,weak} / item status
                 if base.item_type == InventoryType.Item:
                     new_item[attr] = AttributeRandomizer.status.shuffle(new_item[attr],
                                                                         fuzzy=True,
-                                                                        only_bytes={0})
+                                                                        only_bytes={0},
+                                                                        rng=rng)
                 else:
-                    new_item[attr] = AttributeRandomizer.element.shuffle(new_item[attr],
+                    # decoded as a shifted status, the elements are the raw byte
+                    elem = Status(new_item[attr]).as_sngl_byte()
+                    new_item[attr] = AttributeRandomizer.element.shuffle(elem,
                                                                          fuzzy=True,
-                                                                         generate=element_gen)
+                                                                         generate=element_gen,
+                                                                         rng=rng)
             elif attr == "price":
-                new_item[attr] = StatRandomizer(0, 2**16 - 1)(new_item[attr], closeness)
+                new_item[attr] = StatRandomizer(0, 2**16 - 1)(new_item[attr], closeness, rng=rng)
 
             log.debug(f"base {base.name} | {attr}: {base_item[attr]} -> {new_item[attr]}")
 
         return self._BASE_ITEM_TMPLT(**new_item)
 
+    @staticmethod
+    def _decode_dual(col):
+        # sign / magnitude nibbles, see `ItemEntry.decode_dual`
+        import numpy
+        low, high = col & 0x7, (col >> 4) & 0x7
+        return (numpy.where(col & 0x8, -low, low),
+                numpy.where(col & 0x80, -high, high))
+
+    @staticmethod
+    def _encode_dual(low, high):
+        import numpy
+        return numpy.abs(low) | (low < 0).astype(int) << 3 \
+                | numpy.abs(high) << 4 | (high < 0).astype(int) << 7
+
+    def generate_table(self, items, rows=None, closeness=100, keep=set(), element_gen=0.1,
+                       status_gen=0.1, field_effect_gen=0.1, equip_effect_gen=0.1,
+                       learn_spell_prob=0.01, rng=None):
+        """
+        Columnar counterpart of `generate` (without templates), over a structured array of raw item records (e.g. `FF6ItemTable.view`). Each column is drawn in one go, so the items are randomized as in `generate`, but not with the same draws. `rows` restricts which items are changed, and `rng` is a NumPy `Generator`.
+        """
+        import numpy
+        rng = rng or numpy.random.default_rng()
+        rows = numpy.arange(len(items)) if rows is None else rows
+        arr = items[rows]
+        n = len(arr)
+        is_item = (arr["meta"] & 0x7) == InventoryType.Item
+
+        def _learn(mask):
+            # FIXME: as in `generate`, both spell branches go to spell learning
+            arr["learned_spell"][mask] = AttributeRandomizer.spells.sample(
+                                            mask.sum(), skillsets={"magic"}, rng=rng)
+            lr = numpy.maximum(1, arr["learn_rate"][mask])
+            arr["learn_rate"][mask] = AttributeRandomizer.spells._LR_GENERATOR.sample(
+                                            lr, closeness, rng=rng)
+
+        def _flags(col, rndmzr, shift=0, **kwargs):
+            vals = arr[col].astype(numpy.uint64) << numpy.uint64(shift)
+            vals = rndmzr.shuffle_array(vals, fuzzy=True, rng=rng, **kwargs)
+            return (vals >> numpy.uint64(shift)) & 0xFF
+
+        if "learned_spell" not in keep:
+            _learn((arr["learn_rate"] > 0) | (learn_spell_prob < rng.random(n)))
+        if "cast_spell" not in keep:
+            wpn_spell = arr["weapon_spell"]
+            _learn(((wpn_spell & 0xC0) != 0) | (learn_spell_prob < rng.random(n)))
+
+        if "equipped_by" not in keep:
+            arr["equipped_by"] = AttributeRandomizer.equipchar.shuffle_array(
+                                    arr["equipped_by"], mix_ratio=0.5, fuzzy=True, rng=rng)
+        if "field_effect" not in keep:
+            arr["field_effect"] = _flags("field_effect", AttributeRandomizer.fieldeffect,
+                                         generate=field_effect_gen)
+        if "equip_flags" not in keep:
+            shifts = numpy.arange(5, dtype=numpy.uint64) * numpy.uint64(8)
+            flags = (arr["equip_flags"].astype(numpy.uint64) << shifts).sum(axis=1)
+            exclude = {EquipmentFlags.UNKNOWN, EquipmentFlags.UNKNOWN_2,
+                       EquipmentFlags.UNKNOWN_3, EquipmentFlags.UNKNOWN_4}
+            flags = AttributeRandomizer.equipflags.shuffle_array(
+                        flags, fuzzy=True, exclude=exclude, generate=equip_effect_gen, rng=rng)
+            arr["equip_flags"] = (flags[:, None] >> shifts) & 0xFF
+
+        for col, byte in [("status_1", 0), ("status_2", 1), ("equip_status", 2),
+                          ("_equipment_status", 1)]:
+            if col not in keep:
+                arr[col] = _flags(col, AttributeRandomizer.status, 8 * byte,
+                                  generate=status_gen, only_bytes={byte})
+
+        if "elemental_data" not in keep:
+            arr["elemental_data"] = _flags("elemental_data", AttributeRandomizer.element,
+                                           generate=element_gen)
+        if "targeting" not in keep:
+            arr["targeting"] = AttributeRandomizer.spelltargeting.sample(arr["targeting"],
+                                                                         rng=rng)
+
+        # nibble packed stats
+        for col, (lo, hi), stat in [("vigor_speed", ("vigor", "speed"), StatRandomizer(-7, 7)),
+                                    ("stamina_magic", ("stamina", "magic"), StatRandomizer(-7, 7))]:
+            low, high = self._decode_dual(arr[col].astype(int))
+            low = low if lo in keep else stat.sample(low, closeness, rng=rng)
+            high = high if hi in keep else stat.sample(high, closeness, rng=rng)
+            arr[col] = self._encode_dual(low, high)
+        evade, mevade = arr["evade"] & 0xF, arr["evade"] >> 4
+        evade = evade if "evade" in keep else StatRandomizer(0, 15).sample(evade, closeness, rng=rng)
+        mevade = mevade if "magic_evade" in keep \
+                    else StatRandomizer(0, 15).sample(mevade, closeness, rng=rng)
+        arr["evade"] = evade | mevade << 4
+
+        if "power" not in keep:
+            arr["power"] = StatRandomizer(0, 255).sample(arr["power"], closeness, rng=rng)
+        if "price" not in keep:
+            arr["price"] = StatRandomizer(0, 2**16 - 1).sample(arr["price"], closeness, rng=rng)
+
+        # items use these for statuses, weapons and armor for stats and elements
+        if "actor_status_1" not in keep:
+            stat = StatRandomizer(0, 255).sample(arr["actor_status_1"], closeness, rng=rng)
+            status = _flags("actor_status_1", AttributeRandomizer.status, only_bytes={0})
+            arr["actor_status_1"] = numpy.where(is_item, status, stat)
+        for i, col in enumerate(["actor_status_2", "actor_status_3", "actor_status_4"]):
+            if col in keep:
+                continue
+            status = _flags(col, AttributeRandomizer.status, 8 * (i + 1), only_bytes={0})
+            elem = _flags(col, AttributeRandomizer.element, generate=element_gen)
+            arr[col] = numpy.where(is_item, status, elem)
+
+        items[rows] = arr
+        return items
+
+    def randomize_item_table(self, bindata, seeds=None, ignore_empty=True, **kwargs):
+        """
+        As `randomize_items`, but with `generate_table`, and only the item data is written. With a `SeedTree` as `seeds`, the draws come from its "item_table" generator.
+        """
+        # tasks are returned, so the input is left alone
+        view = self["itm_dt"].view(bindata, copy=True)
+        rows = None
+        if ignore_empty:
+            # Don't randomize Empty, as it has invalid values
+            rows = [i for i in range(len(view)) if i != 255]
+
+        rng = None if seeds is None else seeds.generator("item_table")
+        self.generate_table(view.array, rows=rows, rng=rng, **kwargs)
+        # nearly every record changes, so the table is written as a whole
+        return [WriteBytes(self["itm_dt"], view.array.tobytes())]
+
     def read(self, bindata):
         item_names = FF6Text._decode(self["itm_nms"] << bindata, 13)
         item_descr = self["itm_dscrp"].from_ptr_table(self["pntrs_t_itm_dscrp"], bindata)
-        item_data = dict(zip(item_names, self["itm_dt"] << bindata))
+        item_data = dict(zip(item_names, self["itm_dt"].read(bindata)))
 
         # FIXME: maybe the item object should know where to retrieve its own name / data?
         for name, descr, key in zip(item_names, item_descr, item_data):
@@ -239,28 +381,36 @@ class FF6ItemManager(FF6StaticRandomizer):
         # FIXME: these aren't writing the item icons and such
         item_names = [FF6Text._encode(item.name) for item in items.values()]
         item_descr = [FF6Text._encode(item.descr) for item in items.values()]
-        item_data = map(bytes, items.values())
+        item_data = self["itm_dt"].pack_records(items.values())
 
         return [
-            WriteBytes(self["itm_dt"], b''.join(item_data)),
+            WriteBytes(self["itm_dt"], item_data),
             WriteBytes(self["itm_dscrp"], b''.join(item_descr)),
             WriteBytes(self["itm_nms"], b''.join(item_names))
         ]
 
-    def randomize_items(self, bindata, **kwargs):
+    def randomize_items(self, bindata, seeds=None, spoiler=None, **kwargs):
+        """
+        Regenerate every item. With a `SeedTree` as `seeds`, each item draws from its own stream (keyed by its index), so the result does not depend on which items are generated, or in what order.
+        The spoiler lines are appended to the list `spoiler` if given, otherwise printed.
+        """
         item_data = self.read(bindata)
         log.info(f"Decoded {len(item_data)} items")
 
         ignore_empty = kwargs.pop("ignore_empty", True)
 
-        for name in item_data:
+        for i, name in enumerate(item_data):
             # Don't randomize Empty, as it has invalid values
             if ignore_empty and name == " Empty".ljust(13, " "):
                 continue
-            item_data[name] = self.generate(item_data[name], **kwargs)
-
-        print("\n".join(self.write_spoiler(item_data.values(),
-                                           ignore_empty=ignore_empty)))
+            rng = None if seeds is None else seeds.stream("item", i)
+            item_data[name] = self.generate(item_data[name], rng=rng, **kwargs)
+
+        lines = self.write_spoiler(item_data.values(), ignore_empty=ignore_empty)
+        if spoiler is None:
+            print("\n".join(lines))
+        else:
+            spoiler.extend(lines)
         return self.write(item_data)
 
     def write_spoiler(self, items, ignore_empty=True):
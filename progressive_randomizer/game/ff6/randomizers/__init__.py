@@ -22,6 +22,7 @@ from ..components import (
     FF6PointerTable,
     FF6DataTable,
     FF6Text,
+    FF6CompressionCodec,
     FF6SRAM,
     FF6EventFlags,
     FF6MemoryManager
@@ -38,11 +39,21 @@ class StatRandomizer:
         self._upper = upper
         self._range = upper - lower
 
-    def __call__(self, targ, inv_width=1):
+    def __call__(self, targ, inv_width=1, rng=None):
         from ....utils import randomization
         return self._lower + randomization.discrete_beta(self._range,
                                                          targ - self._lower,
-                                                         inv_width)
+                                                         inv_width, rng=rng)
+
+    def sample(self, targ, inv_width=1, rng=None):
+        """
+        As calling the randomizer, for an array of targets at once. `rng` is a NumPy `Generator`.
+        """
+        import numpy
+        from ....utils import randomization
+        return self._lower + randomization.discrete_beta_array(self._range,
+                                                               numpy.asarray(targ) - self._lower,
+                                                               inv_width, rng=rng)
 
 class AttributeRandomizer:
 
@@ -50,59 +61,133 @@ class AttributeRandomizer:
         self._enum = attr_enum
         self._null = None or null
 
-    def __call__(self, attrs=None, n=1, exclude=None, reset=False):
+        # Compiled once: everything internal works on plain ints, and only the
+        # results are converted back to the enum
+        self._null_mask = int(self._null or 0)
+        # member values, in enum order, and the pool to draw from (sorted, so
+        # the draws don't depend on set ordering)
+        self._members = tuple(int(e) for e in attr_enum)
+        self._pool = tuple(sorted(m for m in self._members if m != self._null_mask))
+        self._np_pool = None
+
+    @staticmethod
+    def _mask(flags):
+        """
+        A set of members (or an int mask) as an int mask.
+        """
+        if not flags:
+            return 0
+        if isinstance(flags, int):
+            return int(flags)
+        mask = 0
+        for e in flags:
+            mask |= int(e)
+        return mask
+
+    def _draw(self, attrs, n, exclude, reset, rng):
         from ....utils import randomization
         if n < 0:
-            n = randomization.poisson(abs(n))
+            n = randomization.poisson(abs(n), rng=rng)
 
-        pool = {a for a in self._enum} - {self._null}
-        attrs = self._null if reset or attrs is None else attrs
         if reset:
-            attrs = self._null
+            attrs, pool = self._null_mask, self._pool
         else:
-            pool -= {e for e in self._enum if e & attrs} or set()
-            pool -= exclude or set()
+            pool = [m for m in self._pool if not m & (attrs | exclude)]
 
         if len(pool) <= 0:
             log.warning("Insufficient remaining attributes left to add")
-            return
-
-        for e in randomization.choice_without_replacement(list(pool), n):
-            attrs |= e
-            pool -= {e}
+            return None
 
+        for m in randomization.choice_without_replacement(pool, n, rng=rng):
+            attrs |= m
         return attrs
 
-    def shuffle(self, to_shuffle, mix_ratio=1, fuzzy=False, generate=0, exclude=None):
-        keep = {e for e in self._enum
-                if e & to_shuffle and random.uniform(0, 1) < mix_ratio}
-        n = len([e for e in self._enum if e & to_shuffle])
-        draw = max(generate, n - len(keep))
+    def __call__(self, attrs=None, n=1, exclude=None, reset=False, rng=None):
+        attrs = self._null_mask if attrs is None else int(attrs)
+        attrs = self._draw(attrs, n, self._mask(exclude), reset, rng)
+        return None if attrs is None else self._enum(attrs)
+
+    def _shuffle(self, to_shuffle, mix_ratio, fuzzy, generate, exclude, rng):
+        rng = rng or random
+        keep, n = 0, 0
+        for m in self._members:
+            if m & to_shuffle:
+                n += 1
+                if rng.uniform(0, 1) < mix_ratio:
+                    keep |= m
+        draw = max(generate, n - bin(keep).count("1"))
         draw *= -1 if fuzzy else 1
-        return self._enum(self(sum(keep), n=draw, exclude=exclude))
+        attrs = self._draw(keep, draw, exclude, False, rng)
+        # nothing left to add, so only the kept flags
+        return keep if attrs is None else attrs
+
+    def shuffle(self, to_shuffle, mix_ratio=1, fuzzy=False, generate=0, exclude=None,
+                rng=None):
+        return self._enum(self._shuffle(int(to_shuffle), mix_ratio, fuzzy, generate,
+                                        self._mask(exclude), rng))
+
+    def shuffle_array(self, to_shuffle, mix_ratio=1, fuzzy=False, generate=0, exclude=None,
+                      rng=None):
+        """
+        As `shuffle`, for an array of raw flag values at once. `rng` is a NumPy `Generator`.
+        Values with nothing left to add to are returned with only the kept flags.
+        """
+        import numpy
+        from ....utils import randomization
+        rng = rng or numpy.random.default_rng()
+        values = numpy.asarray(to_shuffle, dtype=numpy.uint64)
+        if self._np_pool is None:
+            self._np_pool = numpy.array(self._pool, dtype=numpy.uint64)
+        masks = self._np_pool
+        excluded = (masks & numpy.uint64(self._mask(exclude))) != 0
+
+        # (values, members) tables of which flags are set / kept
+        present = (values[:, None] & masks) != 0
+        keep = present & (rng.random(present.shape) < mix_ratio)
+        kept = numpy.bitwise_or.reduce(numpy.where(keep, masks, 0), axis=1)
+
+        draw = numpy.maximum(generate, present.sum(axis=1) - keep.sum(axis=1))
+        draw = randomization.poisson_array(draw, rng=rng) if fuzzy else draw.astype(int)
+
+        avail = ~((kept[:, None] & masks) != 0) & ~excluded
+        added = randomization.k_of_n(len(masks), draw, size=len(values), avail=avail, rng=rng)
+
+        return kept | numpy.bitwise_or.reduce(numpy.where(added, masks, 0), axis=1)
 
 class StatusRandomizer(AttributeRandomizer):
     _BY_BYTE = [{e for e in data.Status.bytes()[b]} for b in range(4)]
+    _BYTE_MASKS = [AttributeRandomizer._mask(stats) for stats in _BY_BYTE]
 
     def __init__(self):
         super().__init__(data.Status, null=data.Status.NoStatus)
 
-    def shuffle(self, to_shuffle, mix_ratio=1, fuzzy=False, generate=0,
-                exclude=None, only_bytes={0, 1, 2, 3}):
-        exclude = exclude or set()
-        for i, stats in enumerate(data.Status.bytes()):
+    def _exclude(self, exclude, only_bytes):
+        exclude = self._mask(exclude)
+        for i, mask in enumerate(self._BYTE_MASKS):
             if i not in only_bytes:
-                exclude |= stats
-        return super().shuffle(to_shuffle, mix_ratio=mix_ratio, fuzzy=fuzzy,
-                               generate=0, exclude=exclude)
+                exclude |= mask
+        return exclude
+
+    def shuffle(self, to_shuffle, mix_ratio=1, fuzzy=False, generate=0,
+                exclude=None, only_bytes={0, 1, 2, 3}, rng=None):
+        # FIXME: generate is dropped
+        return self._enum(self._shuffle(int(to_shuffle), mix_ratio, fuzzy, 0,
+                                        self._exclude(exclude, only_bytes), rng))
+
+    def shuffle_array(self, to_shuffle, mix_ratio=1, fuzzy=False, generate=0,
+                      exclude=None, only_bytes={0, 1, 2, 3}, rng=None):
+        # FIXME: generate is dropped, as in `shuffle`
+        return super().shuffle_array(to_shuffle, mix_ratio=mix_ratio, fuzzy=fuzzy,
+                                     generate=0, rng=rng,
+                                     exclude=self._exclude(exclude, only_bytes))
 
 class SpellRandomizer(AttributeRandomizer):
     def __init__(self):
         super().__init__(data.Spell, null=0)
 
     _LR_GENERATOR = StatRandomizer(1, 50)
-    def gen_learning_rate(self, lr=1, closeness=50):
-        return self._LR_GENERATOR(lr, closeness)
+    def gen_learning_rate(self, lr=1, closeness=50, rng=None):
+        return self._LR_GENERATOR(lr, closeness, rng=rng)
 
     def _retrieve_skills_by_type(self, magic=False, blitzes=False, swdtech=False,
                                  espers=False, slots=False, dance=False,
@@ -131,14 +216,26 @@ class SpellRandomizer(AttributeRandomizer):
 
         return set(map(data.Spell, pool))
 
-    def __call__(self, pool=None, skillsets={"all"}):
+    def __call__(self, pool=None, skillsets={"all"}, rng=None):
         if "all" in skillsets:
             # do not recommend
             pool = {*data.Spell}
         else:
             sets = {arg: True for arg in skillsets}
             pool = pool or self._retrieve_skills_by_type(**sets)
-        return random.choice(list(pool))
+        return (rng or random).choice(sorted(pool))
+
+    def sample(self, size, pool=None, skillsets={"all"}, rng=None):
+        """
+        `size` spells drawn as in calling the randomizer. `rng` is a NumPy `Generator`.
+        """
+        import numpy
+        rng = rng or numpy.random.default_rng()
+        if "all" in skillsets:
+            pool = {*data.Spell}
+        else:
+            pool = pool or self._retrieve_skills_by_type(**{arg: True for arg in skillsets})
+        return rng.choice(numpy.array(sorted(pool)), size=size)
 
 class TargetingRandomizer(AttributeRandomizer):
     # FIXME: These are all combinations in the game
@@ -155,18 +252,36 @@ class TargetingRandomizer(AttributeRandomizer):
         data.SpellTargeting.ENEMY_DEFAULT | data.SpellTargeting.MT_TARG | data.SpellTargeting.TARGET_GROUP | data.SpellTargeting.TARGET_ALL | data.SpellTargeting.NO_GROUP_SWITCH
     }
 
+    _ALLOWED = tuple(sorted(int(t) for t in ALLOWABLE_TARGETING))
+
     def __init__(self):
         super().__init__(data.SpellTargeting, null=data.SpellTargeting.NO_TARGETIING)
 
-    def __call__(self, attrs):
+    def __call__(self, attrs, rng=None):
         # The item isn't targetable, and we don't change that
         if attrs == data.SpellTargeting.NO_TARGETIING:
             return attrs
 
         # ensure *some* overlap
-        choices = [t for t in self.ALLOWABLE_TARGETING if t & attrs]
-
-        return random.choice(choices)
+        attrs = int(attrs)
+        choices = [t for t in self._ALLOWED if t & attrs]
+
+        return self._enum((rng or random).choice(choices))
+
+    def sample(self, attrs, rng=None):
+        """
+        As calling the randomizer, for an array of raw targeting values. `rng` is a NumPy `Generator`.
+        """
+        import numpy
+        rng = rng or numpy.random.default_rng()
+        attrs = numpy.asarray(attrs)
+        allowed = numpy.array(self._ALLOWED)
+
+        overlap = (attrs[:, None] & allowed) != 0
+        pick = allowed[numpy.where(overlap, rng.random(overlap.shape), -1.).argmax(axis=1)]
+        # untargetable values (or those matching nothing) are left alone
+        fixed = (attrs == data.SpellTargeting.NO_TARGETIING) | ~overlap.any(axis=1)
+        return numpy.where(fixed, attrs, pick)
 
 AttributeRandomizer.status = StatusRandomizer()
 AttributeRandomizer.spelltargeting = TargetingRandomizer()
@@ -184,6 +299,8 @@ class FF6StaticRandomizer(StaticRandomizer):
                                       apply_offset=0xC00000)
         self._reg = FF6MemoryManager.copy(self._reg)
         self._reg.mark_tag_as_free("unused")
+        # looked up on every block access, so found once up front
+        self._compressed = self._find_compressed_blocks()
 
     @classmethod
     def from_rom_map(cls, rommap, tags=set(), apply_offset=0):
@@ -220,8 +337,9 @@ class FF6StaticRandomizer(StaticRandomizer):
         bare = super().__getitem__(item)
         if item in self._reg._tags.get("pointers", set()):
             return FF6PointerTable.from_super(bare)
-        elif item in self._reg._tags.get("pointers", set()):
-            return FF6PointerTable.from_super(bare)
+        # compressed blocks can be anything, so they can only be read through the codec
+        elif item in self._compressed:
+            return FF6CompressionCodec.from_super(bare)
         elif item in self._reg._tags.get("data", set()):
             return FF6DataTable.from_super(bare)
         elif item in self._reg._tags.get("program", set()):
@@ -243,6 +361,18 @@ class FF6StaticRandomizer(StaticRandomizer):
         res.descr = descr or res.descr
         return res
 
+    def _find_compressed_blocks(self):
+        pointers = self._reg._tags.get("pointers", set())
+        return frozenset(name for name, blk in self._reg._blocks.items()
+                         if blk.descr.rstrip().endswith("(compressed)")
+                         and name not in pointers)
+
+    def compressed_blocks(self):
+        """
+        Names of the blocks holding a single compressed stream, i.e. those described as "... (compressed)". Tables of several compressed items, and the pointers to them, are not included.
+        """
+        return self._compressed
+
     # utils
     CHAR_NAME_LEN = 6
     def get_char_names(self, bindata, nbytes=CHAR_NAME_LEN):
@@ -254,9 +384,11 @@ class FF6StaticRandomizer(StaticRandomizer):
         return [self[k] for k in self._reg._tags.get("unused", [])]
 
     # Randomization functions
-    def replace_event_battle_msgs(self, bindata, fname=None, randomize=False):
-        from ....tasks import WriteBytes
-
+    def replace_event_battle_msgs(self, bindata, fname=None, randomize=False,
+                                  dictionary=None, rng=None):
+        """
+        Replace the short battle messages, from `fname` if given. A `DTECompressor` can be given as `dictionary` if the game's decoder has been patched to expand it.
+        """
         msgs = self["shrt_bttl_dlg"]
         ptrs = self["pntrs_t_shrt_bttl_dlg"]
 
@@ -281,23 +413,16 @@ class FF6StaticRandomizer(StaticRandomizer):
         new_msgs += [""] * (256 - len(new_msgs))
         # Randomize if requested
         if randomize:
-            new_msgs = [new_msgs[i] for i in randomization.shuffle_idx(256)]
+            new_msgs = [new_msgs[i] for i in randomization.shuffle_idx(256, rng=rng)]
 
-        msg_data = [FF6Text._encode(p, replace_ctl_seq=True) for p in new_msgs]
+        msg_data = [FF6Text._encode(p, replace_ctl_seq=True, dictionary=dictionary)
+                    for p in new_msgs]
 
         # FIXME: this should probably be handled by a component
         #_OFFSET = FF6PointerTable.maybe_parse_offset(ptrs.descr) or 0xF000
-        ptr_data = [msgs.addr - _OFFSET]
-        for msg in new_msgs[1:]:
-            ptr_data.append(ptr_data[-1] + len(msg))
-
-        ptr_data = b"".join([p.to_bytes(2, byteorder="little") for p in ptr_data])
-        msg_data = b"".join(msg_data).ljust(msgs.length, b"\xff")
-
-        # FIXME: Do we assert this?
-        #msg_data = msg_data[:msgs.length]
-
-        return [WriteBytes(msgs, msg_data), WriteBytes(ptrs, ptr_data)]
+        # suffix sharing would leave the table unreadable through `dereference`
+        return FF6DataTable.from_super(msgs).repack(msg_data, ptrs, offset=_OFFSET,
+                                                    share_suffixes=False)
 
 class FF6ProgressiveRandomizer(ProgressiveRandomizer):
     def __init__(self):
@@ -7,6 +7,7 @@ log = logging.getLogger()
 import random
 
 from .....utils.randomization import (
+    SeedTree,
     triangle,
     accum_n,
     match_n
@@ -80,6 +81,9 @@ class BeyondChaosRandomizer(FF6StaticRandomizer, _BeyondChaos):
         self.install_bc()
 
         self._seed = seed
+        # each randomization draws from its own stream, so the result
+        # doesn't depend on which others are run, or in what order
+        self.seeds = SeedTree(seed)
         self._flags = flags
         self._codes = []
 
@@ -136,6 +140,7 @@ class BeyondChaosRandomizer(FF6StaticRandomizer, _BeyondChaos):
         ]
 
     def manage_commands(self, bindata, metronome=False, **kwargs):
+        rng = self.seeds.stream("manage_commands")
         # Gather command data
         from ...managers import FF6CommandManager, FF6CharacterManager
         cmd_mgr = FF6CommandManager()
@@ -148,14 +153,14 @@ class BeyondChaosRandomizer(FF6StaticRandomizer, _BeyondChaos):
         # FIXME: handle this better
         invalid += [Command.UNUSED1, Command.UNUSED2]
         # ?
-        if match_n(n=4):
+        if match_n(n=4, rng=rng):
             invalid.append(Command.Magitek)
 
         # ?
         if kwargs.get("replace_commands", False):
             invalid.extend([Command.Leap, Command.Possess])
 
-        tasks = chr_mgr.randomize_commands(invalid, cmd_mgr)
+        tasks = chr_mgr.randomize_commands(invalid, cmd_mgr, rng=rng)
 
         # Some optional stuff to process
         subs = substitutions.manage_commands_writes.copy()
@@ -179,7 +184,7 @@ class BeyondChaosRandomizer(FF6StaticRandomizer, _BeyondChaos):
         tbl = self["rndm_nmbr_tbl"]
         if no_rng or "norng" in self._flags:
             return [WriteBytes(tbl, b"\x00" * tbl.length)]
-        return [ShuffleBytes(tbl)]
+        return [ShuffleBytes(tbl, seed=self.seeds.entropy("manage_rng"))]
 
     def death_abuse(self):
         """
@@ -188,13 +193,14 @@ class BeyondChaosRandomizer(FF6StaticRandomizer, _BeyondChaos):
         return [SubstitutionTask.sub_with_args(location=0xC515, bytestring=b"\x60",
                                                sub=bc_utils.Substitution)]
 
-    def randomize_slots(self, bindata, no_dupes=True):
+    def randomize_slots(self, bindata, no_dupes=True, rng=None):
         """
         Randomize the Slot command's attacks for each combination value.
 
         By default, duplications (other than where necessary) are disallowed. Set no_dupes to True to override.
         One can change the slots_pointer value if needed (not recommended).
         """
+        rng = rng or self.seeds.stream("randomize_slots")
         # Get the current slot spell ids
         slots_ids = self["slt_ids"]
         _slots_ids = [*map(data.Spell, slots_ids << bindata)]
@@ -219,15 +225,15 @@ class BeyondChaosRandomizer(FF6StaticRandomizer, _BeyondChaos):
         # detects duplicates
         while len(set(new_ids)) < 7:
             # Determine new Joker Doom
-            new_ids[0] = triangle(0, l_8, l_8 * 6) + random.randint(0, l) - (8 * l_8 - 1)
+            new_ids[0] = triangle(0, l_8, l_8 * 6, rng=rng) + rng.randint(0, l) - (8 * l_8 - 1)
             new_ids[1] = new_ids[0]
             # Replacement for bahamut / sun flare
-            new_ids[2] = random.randint(len(spells) // 3, len(spells) - 1)
+            new_ids[2] = rng.randint(len(spells) // 3, len(spells) - 1)
             # Replacement for airships / chocobos / gems
-            new_ids[4:7] = [triangle(0, len(spells) // 2) for _ in range(3)]
+            new_ids[4:7] = [triangle(0, len(spells) // 2, rng=rng) for _ in range(3)]
 
             # replacement for lagomorph
-            new_fail = accum_n(2, l_20, init=random.randint(0, l_20))
+            new_fail = accum_n(2, l_20, init=rng.randint(0, l_20), rng=rng)
             new_ids[7] = min(new_fail, len(spells) - 1)
 
             # we only iterate if dupes are not allowed
@@ -5,6 +5,7 @@ from .....tasks import WriteBytes
 
 from .....components import (
     AssemblyObject,
+    AssemblyEditor,
     MemoryStructure
 )
 
@@ -14,7 +15,7 @@ from BeyondChaos.beyondchaos import State
 
 def construct_substitution_function(asm_file, fcn_name, *fcn_args, **kwargs):
     code = f"def {fcn_name}({','.join(fcn_args)}):\n\n\tsub = Substitution()\n"
-    for asm_obj, data in AssemblyObject.from_asm(asm_file, **kwargs):
+    for asm_obj, data in AssemblyEditor.from_asm(asm_file, **kwargs):
         code += f"\tsub.set_location({hex(asm_obj.addr)})\n"
         data = repr(data)
         code += f"\tsub.bytestring = {repr(data)}\n\n"
@@ -27,10 +27,11 @@ class Action:
     def __call__(self, rando):
         pass
 
-def poisson(mean=1, exclude_zero=False, nmax=100):
+def poisson(mean=1, exclude_zero=False, nmax=100, rng=None):
+    rng = rng or random
     s = 0
     for n in range(1 if exclude_zero else 0, nmax):
-        s += random.expovariate(mean)
+        s += rng.expovariate(mean)
         if s > 1:
             break
     return n
@@ -51,10 +52,11 @@ class SetAttribute(Action):
         return cls(actor, attr, val)
 
     @classmethod
-    def generate_random_at_rank(cls, chr, attr=None, boost=None, rank=None):
+    def generate_random_at_rank(cls, chr, attr=None, boost=None, rank=None, rng=None):
+        rng = rng or random
         # pick an attribute
-        attr = attr or random.choice(asdict(chr))
-        boost = boost or poisson(1, exclude_zero=True)
+        attr = attr or rng.choice(list(asdict(chr)))
+        boost = boost or poisson(1, exclude_zero=True, rng=rng)
         old_value = getattr(chr, attr)
         return cls(chr.actor_id, attr, old_value + boost)
 
@@ -93,9 +95,10 @@ class GiveItem(Action):
         return cls(item, qty)
 
     @classmethod
-    def generate_random_at_rank(cls, item=None, qty=None, rank=None):
-        item = item or flag_data.Item(random.randint(0, 255))
-        qty = poisson(1, exclude_zero=True)
+    def generate_random_at_rank(cls, item=None, qty=None, rank=None, rng=None):
+        rng = rng or random
+        item = item or flag_data.Item(rng.randint(0, 255))
+        qty = qty or poisson(1, exclude_zero=True, rng=rng)
         return cls(item, qty)
 
     def __init__(self, item_id, quant=1):
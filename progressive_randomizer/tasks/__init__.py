@@ -6,7 +6,7 @@ import json
 import logging
 log = logging.getLogger()
 
-from ..components import MemoryStructure, AssemblyObject
+from ..components import MemoryStructure, AssemblyObject, RomImage, PatchSet
 from ..utils import (
     Utils,
     ips_patcher
@@ -30,6 +30,9 @@ class RandomizationTask:
         return self._memblk << bindata
 
     def __rshift__(self, bindata):
+        """
+        Apply this task to `bindata`. A `RomImage` is written to in place (and returned), other binary data is copied into a new `RomImage`.
+        """
         data = self(bindata)
         return self._memblk @ bytes(data) >> bindata
 
@@ -49,19 +52,17 @@ class RandomizationTask:
     def affected_blocks(self):
         return (self._memblk.addr, self._memblk.addr + self._memblk.length)
 
-    def to_ips(self, bindata):
-        max_len = 0xFFFF
-        start = self._memblk.addr
-
-        to_write = self(bindata)
-        buffer = b""
-        while len(to_write) > 0:
-            len_to_write = min(max_len, len(to_write))
-            start += len_to_write
-            buffer += start.to_bytes(3) + len_to_write.to_bytes(2) + to_write[:len_to_write]
-            to_write = to_write[len_to_write:]
+    def payloads(self, bindata):
+        """
+        The (address, bytes) hunks this task writes when applied to `bindata`.
+        """
+        return [(self._memblk.addr, bytes(self(bindata)))]
 
-        return buffer
+    def to_ips(self, bindata):
+        """
+        IPS hunk records (no header or end marker) for the bytes this task changes in `bindata`.
+        """
+        return ips_patcher.IPSWriter().records(self.payloads(bindata), base=bindata)
 
 class WriteBytes(RandomizationTask):
     def __init__(self, memblk, data):
@@ -77,6 +78,8 @@ class WriteBytes(RandomizationTask):
         return f"{self.__class__.__name__} -> Write {len(self._data)} bytes to {self._memblk}"
 
     def __add__(self, other):
+        if not isinstance(other, WriteBytes):
+            return NotImplemented
         lower, upper = min(self._memblk, other._memblk), \
                        max(self._memblk, other._memblk)
         try:
@@ -95,18 +98,31 @@ class ExpandImage(RandomizationTask):
         self._size = size
 
     def __str__(self):
-        return f"{self.__class__.__name__} -> Append {len(self._size)} bytes to {self._memblk}"
+        return f"{self.__class__.__name__} -> Append {self._size} bytes to {self._memblk}"
 
     def __call__(self, bindata):
         log.debug(f"Expand: appending {self._size} bytes to ROM")
         return bindata + b"\x00" * self._size
 
+    def __rshift__(self, bindata):
+        return RomImage.wrap(bindata).expand(self._size)
+
+    def payloads(self, bindata):
+        return [(self._memblk.addr, bytes(self._size))]
+
 class ShuffleBytes(RandomizationTask):
+    def __init__(self, memblk, seed=None):
+        super().__init__(memblk)
+        # with a seed, every application of the task gives the same shuffle
+        self._seed = seed
+
     def __call__(self, bindata):
         data = super().__call__(bindata)
         log.debug(f"ShuffleBytes: read {len(data)} bytes from ROM, shuffling...")
+        import random
         from ..utils.randomization import shuffle
-        return bytes(shuffle(data))
+        rng = None if self._seed is None else random.Random(self._seed)
+        return bytes(shuffle(data, rng=rng))
 
 class PatchFromJSON(RandomizationTask):
     def __init__(self, memblk, jsonf):
@@ -117,33 +133,52 @@ class PatchFromJSON(RandomizationTask):
     def __call__(self, bindata):
         return self._memblk.serialize(self._data)
 
-class PatchFromIPS(RandomizationTask, ips_patcher.IPSReader):
-    def __init__(self, ipsfile, memblk=None):
+class WritePatchSet(RandomizationTask):
+    def __init__(self, patches, memblk=None):
+        if memblk is None:
+            beg, end = patches.span()
+            memblk = MemoryStructure(addr=beg, length=end - beg,
+                                     name=f"patch_set_{beg:x}",
+                                     descr=f"{len(patches)} hunks in 0x{beg:x} - 0x{end:x}")
         super().__init__(memblk)
-        super(RandomizationTask, self).__init__(ipsfile)
+        self._patches = patches
 
     def __str__(self):
-        stats = "\n".join([f"\t0x{a:x} -> {d}" for a, d in self.contents.items()])
-        if stats:
-            stats = "\n" + stats
-        return f"{self.__class__.__name__} ->" + stats
+        return f"{self.__class__.__name__} -> Write {len(self._patches)} hunks to {self._memblk}"
 
-    # FIXME: this expects to return a blob of binary data
     def __call__(self, bindata):
-        return self.contents
+        # the spanned region, as it would look with every hunk applied
+        region = RomImage(self._memblk << bindata)
+        return self._patches.apply(region, base=self._memblk.addr)
 
     def __rshift__(self, bindata):
-        patch_writer = MemoryStructure.chain_write(self.contents)
-        return patch_writer >> bindata
+        return self._patches >> bindata
+
+    def payloads(self, bindata):
+        return [(addr, bytes(data)) for addr, data in self._patches]
 
     def affected_blocks(self):
         # FIXME: this will cause unnecessary conflicts
-        min_addr = min(self.contents)
-        max_addr = max([a + len(d) for a, d in self.contents.items()])
-        return (min_addr, max_addr)
+        return self._patches.span()
+
+class PatchFromIPS(WritePatchSet, ips_patcher.IPSReader):
+    def __init__(self, ipsfile, memblk=None):
+        ips_patcher.IPSReader.__init__(self, ipsfile)
+        super().__init__(PatchSet.from_ips(self), memblk)
+
+    def __rshift__(self, bindata):
+        # unlike a bare patch set, IPS patches may grow or truncate the image
+        return self._patch(iter(self.hunks), RomImage.wrap(bindata), self.trunc_length)
+
+    def __str__(self):
+        stats = "\n".join([f"\t0x{a:x} -> {d}" for a, d in self.contents.items()])
+        if stats:
+            stats = "\n" + stats
+        return f"{self.__class__.__name__} ->" + stats
 
 TASKS = {
     "shuffle_bytes": ShuffleBytes,
     "write_bytes": WriteBytes,
-    "patch_from_json": PatchFromJSON
+    "patch_from_json": PatchFromJSON,
+    "write_patch_set": WritePatchSet
 }
\ No newline at end of file
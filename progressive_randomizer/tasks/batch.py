@@ -0,0 +1,134 @@
+"""
+Generating many seeds from one base ROM.
+
+The base ROM is copied once into shared memory, and a pool of worker processes attach to it. Each worker builds its randomizers (registry, ROM map, managers) once when it starts, and every job restores them from that warm copy, so a job is only the randomization itself plus writing the result.
+A job is a (seed, flags) pair. The flags name the steps to run, either methods of the randomizer, or "<manager>.<method>" for one of the `managers`. Each step is called with the base ROM and its own random stream (see `SeedTree`), and returns tasks for the `WriteQueue`. Steps taking `seeds` get a subtree rather than a single stream. Steps taking `spoiler` get a list to append their spoiler lines to, which go in the seed's spoiler file. Since every stream is derived from the seed and the step name, the output for a seed does not depend on the number of workers or which one ran it.
+"""
+import os
+import time
+import pickle
+import inspect
+import multiprocessing
+
+import logging
+log = logging.getLogger()
+
+from .queues import WriteQueue
+from ..components.image import shared_rom, attach_rom
+
+def _parse_flags(flags):
+    """
+    Flags are either a mapping of step -> keyword arguments, or an iterable (or comma separated string) of steps.
+    """
+    if isinstance(flags, str):
+        flags = [f.strip() for f in flags.split(",") if f.strip()]
+    if isinstance(flags, dict):
+        return {step: dict(kwargs or {}) for step, kwargs in flags.items()}
+    return {step: {} for step in flags}
+
+class BatchWorker:
+    """
+    Per-process state: a read-only view of the base ROM and the warm randomizers.
+    """
+    def __init__(self, shm_name, size, rando_cls, managers=None):
+        self._shm, self.base = attach_rom(shm_name, size)
+
+        templates = {name: cls() for name, cls in (managers or {}).items()}
+        templates[None] = rando_cls()
+        # restoring from this is much cheaper than rebuilding, and keeps state
+        # (e.g. allocated space) from leaking between jobs
+        self._snapshot = pickle.dumps(templates)
+
+    def resolve(self, step, randos):
+        mgr, _, method = step.rpartition(".")
+        if (mgr or None) not in randos:
+            raise ValueError(f"Unknown manager for step {step}")
+        func = getattr(randos[mgr or None], method, None)
+        if not callable(func):
+            raise ValueError(f"{step} is not a randomization step")
+        return func
+
+    def run(self, seed, flags, out_dir=".", fmt="ips", prefix="seed"):
+        start = time.perf_counter()
+        randos = pickle.loads(self._snapshot)
+        queue = WriteQueue(seed)
+
+        spoiler = [f"seed: {seed}"]
+        for step, kwargs in _parse_flags(flags).items():
+            func = self.resolve(step, randos)
+            params = inspect.signature(func).parameters
+            if "seeds" in params:
+                kwargs.setdefault("seeds", queue.seeds.spawn(step))
+            elif "rng" in params:
+                kwargs.setdefault("rng", queue.seeds.stream(step))
+            lines = []
+            if "spoiler" in params:
+                # workers share stdout, so spoilers are collected rather than printed
+                kwargs.setdefault("spoiler", lines)
+
+            # steps may also yield their tasks
+            tasks = list(func(self.base, **kwargs) or [])
+            spoiler.append(f"--- {step} ({len(tasks)} writes) ---")
+            spoiler.extend(lines)
+            for task in tasks:
+                queue.queue_write(task)
+
+        fname = os.path.join(out_dir, f"{prefix}_{seed}")
+        if fmt == "ips":
+            fname += ".ips"
+            result = queue.to_ips(self.base)
+        elif fmt == "rom":
+            fname += ".smc"
+            result = queue.flush(self.base)
+        else:
+            raise ValueError(f"Unknown output format {fmt}")
+
+        with open(fname, "wb") as fout:
+            fout.write(result)
+        with open(os.path.join(out_dir, f"{prefix}_{seed}.spoiler.txt"), "w") as fout:
+            print("\n".join(spoiler), file=fout)
+
+        return {"seed": seed, "file": fname, "time": time.perf_counter() - start}
+
+# one per worker process, set by the pool initializer
+_WORKER = None
+
+def _init_worker(*args):
+    global _WORKER
+    _WORKER = BatchWorker(*args)
+
+def _run_job(job):
+    seed, flags, kwargs = job
+    return _WORKER.run(seed, flags, **kwargs)
+
+def batch_generate(bindata, jobs, rando_cls, managers=None, out_dir=".", fmt="ips",
+                   prefix="seed", workers=None, mp_context=None):
+    """
+    Generate a ROM (`fmt="rom"`) or IPS patch (`fmt="ips"`) and a spoiler file in `out_dir` for each (seed, flags) in `jobs`, from the base ROM `bindata`.
+    `rando_cls` and the classes in `managers` (name -> class) are built once in each of the `workers` processes (default: one per core).
+    Returns the per-job results, in the order of `jobs`, along with overall throughput.
+    """
+    jobs = [(seed, flags, {"out_dir": out_dir, "fmt": fmt, "prefix": prefix})
+            for seed, flags in jobs]
+    os.makedirs(out_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+
+    with shared_rom(bindata) as shm_name:
+        ctx = multiprocessing.get_context(mp_context)
+        start = time.perf_counter()
+        with ctx.Pool(workers, initializer=_init_worker,
+                      initargs=(shm_name, len(bindata), rando_cls, managers)) as pool:
+            # jobs are roughly the same size, hand them out a few at a time
+            chunksize = max(1, len(jobs) // (4 * workers))
+            results = pool.map(_run_job, jobs, chunksize=chunksize)
+        elapsed = time.perf_counter() - start
+
+    log.info(f"Generated {len(results)} seeds in {elapsed:.2f}s with {workers} workers "
+             f"({len(results) / elapsed:.2f} seeds / s)")
+    return {
+        "seeds": len(results),
+        "workers": workers,
+        "elapsed": elapsed,
+        "seeds_per_sec": len(results) / elapsed if elapsed else float("inf"),
+        "results": results,
+    }
@@ -5,25 +5,146 @@ log = logging.getLogger()
 import hashlib
 import itertools
 
-from . import ExpandImage
+from . import ExpandImage, WritePatchSet
+from ..components import RomImage, PatchSet
+from ..components.intervals import find_overlaps
+from ..utils.ips_patcher import IPSWriter
+from ..utils.randomization import SeedTree
+
+class CommutativityChecker:
+    """
+    Decides whether overlapping writes commute by only comparing their outputs over the window where they overlap.
+    Each task's output hunks are computed once and memoized, so checking a cluster of writes costs one evaluation per write rather than two image copies per pair.
+    NOTE: outputs are evaluated against `bindata` (zeros, if not given). A task which reads back data written by another will not be caught here.
+    """
+    def __init__(self, bindata=None):
+        self._bindata = bindata
+        self._zeros = b""
+        self._outputs = {}
+
+    def _input(self, task):
+        if self._bindata is not None:
+            return self._bindata
+
+        end = task.affected_blocks()[1]
+        if len(self._zeros) < end:
+            # calloc'd, so this is cheap even at full image size
+            self._zeros = bytes(max(end, 2 * len(self._zeros)))
+        return self._zeros
+
+    def output(self, task):
+        """
+        Memoized (address, bytes) hunks written by `task`.
+        """
+        if task not in self._outputs:
+            self._outputs[task] = task.payloads(self._input(task))
+        return self._outputs[task]
+
+    def commute(self, a, b):
+        """
+        True if applying `a` then `b` gives the same result as `b` then `a`, i.e. they agree wherever they both write.
+        """
+        hunks_a, hunks_b = self.output(a), self.output(b)
+        n = len(hunks_a)
+        spans = [(addr, addr + len(data)) for addr, data in hunks_a + hunks_b]
+        for i, j in find_overlaps(spans):
+            # only compare hunks across the two tasks
+            if (i < n) == (j < n):
+                continue
+            i, j = min(i, j), max(i, j) - n
+            (addr_a, data_a), (addr_b, data_b) = hunks_a[i], hunks_b[j]
+
+            lo = max(addr_a, addr_b)
+            hi = min(addr_a + len(data_a), addr_b + len(data_b))
+            if data_a[lo - addr_a:hi - addr_a] != data_b[lo - addr_b:hi - addr_b]:
+                return False
+        return True
+
+    def classify(self, writes):
+        """
+        Sort a cluster of writes into those which are identical, and the overlapping pairs among them which commute or truly conflict.
+        Returns (identical, commuting, conflicting): groups of writes with the exact same output, and lists of (a, b) pairs.
+        """
+        groups = collections.defaultdict(list)
+        for w in writes:
+            groups[tuple(self.output(w))].append(w)
+        identical = [grp for grp in groups.values() if len(grp) > 1]
+
+        commuting, conflicting = [], []
+        for i, j in find_overlaps([w.affected_blocks() for w in writes]):
+            a, b = writes[min(i, j)], writes[max(i, j)]
+            (commuting if self.commute(a, b) else conflicting).append((a, b))
+
+        return identical, commuting, conflicting
 
 def is_soft_conflict(p1, p2):
-    min_off = min(p1.affected_blocks()[0], p2.affected_blocks()[0])
-    max_off = max(p1.affected_blocks()[1], p2.affected_blocks()[1])
+    return CommutativityChecker().commute(p1, p2)
+
+class ConflictGraph:
+    """
+    Undirected graph of writes which overlap and do not commute, i.e. the result depends on the order they are applied in.
+    Connected components are the clusters of writes a conflict resolver has to consider together.
+    """
+    def __init__(self, writes=()):
+        # queue order, for reporting
+        self._order = {w: i for i, w in enumerate(writes)}
+        self._adj = collections.defaultdict(set)
+
+    def __len__(self):
+        """
+        Number of conflicting pairs.
+        """
+        return sum(map(len, self._adj.values())) // 2
+
+    def __contains__(self, write):
+        return write in self._adj
+
+    def add_conflict(self, a, b):
+        self._adj[a].add(b)
+        self._adj[b].add(a)
 
-    test_data = b"\xff" * max_off
-    left_test_data = p2 >> (p1 >> test_data)
-    test_data = b"\x00" * max_off
-    right_test_data = p1 >> (p2 >> test_data)
-    return left_test_data[min_off:max_off] == right_test_data[min_off:max_off]
+    def neighbors(self, write):
+        return self._adj.get(write, set())
+
+    def edges(self):
+        """
+        Conflicting pairs, each ordered and sorted by queue position.
+        """
+        return sorted([(a, b) for a in self._adj for b in self._adj[a]
+                       if self._order[a] < self._order[b]],
+                      key=lambda e: (self._order[e[0]], self._order[e[1]]))
+
+    def component(self, write):
+        """
+        All writes connected to `write` through conflicts (including itself), in queue order.
+        """
+        seen, stack = {write}, [write]
+        while stack:
+            for other in self.neighbors(stack.pop()) - seen:
+                seen.add(other)
+                stack.append(other)
+        return sorted(seen, key=self._order.get)
+
+    def components(self):
+        """
+        Connected components of conflicting writes, in queue order.
+        """
+        comps, seen = [], set()
+        for write in sorted(self._adj, key=self._order.get):
+            if write in seen:
+                continue
+            comps.append(self.component(write))
+            seen.update(comps[-1])
+        return comps
 
 class WriteQueue:
     def __init__(self, seed=0):
         self._write_queue = []
         self._history = {}
 
-        # TODO: make this consistent
         self._seed = seed
+        # root of the named random streams handed out to tasks / managers
+        self.seeds = SeedTree(seed)
 
     def __len__(self):
         return len(self._write_queue)
@@ -34,35 +155,30 @@ class WriteQueue:
                                       key=lambda w: w._memblk.name)
         return {lbl: list(grp) for lbl, grp in write_grp}
 
-    def check_overlaps(self, queue=None):
+    def check_overlaps(self, queue=None, bindata=None):
+        """
+        Find all pairs of writes in the queue which overlap and do not commute (see `CommutativityChecker`), and return them as a `ConflictGraph`.
+        """
         queue = queue or self._write_queue
-        conflicts, n = {}, len(queue)
-
-        # have to sort the queue first or else it goes to O(n^2)
-        _q = sorted(queue, key=lambda t: t.affected_blocks()[0])
-
-        conf_lookup = collections.defaultdict(list)
-        # still could be ~ O(n * (n - 1))   :/
-        for i in range(n - 1):
-            for j in range(i + 1, n):
-                a, b = _q[i], _q[j]
-                if a & b and not is_soft_conflict(a, b):
-                    conf_lookup[id(a)].append(id(b))
-                    conflicts[a.affected_blocks(), b.affected_blocks()] = (a._memblk.name, b._memblk.name)
-                else:
-                    # if they don't intersect, then no others in the list will
-                    # either
-                    break
-
-        log.info(f"Checked {n} writes: {len(conflicts)} conflicts found")
-        return conf_lookup
+        overlaps = find_overlaps([w.affected_blocks() for w in queue])
+
+        checker = CommutativityChecker(bindata)
+        conflicts = ConflictGraph(queue)
+        for i, j in overlaps:
+            a, b = queue[i], queue[j]
+            if not checker.commute(a, b):
+                conflicts.add_conflict(a, b)
+
+        log.info(f"Checked {len(queue)} writes: {len(overlaps)} overlaps, "
+                 f"{len(conflicts)} conflicts found")
+        return conflicts
 
     def describe_changes(self, bindata, queue=None):
         queue = queue or self._write_queue
         from ..game.ff6.randomizers import FF6StaticRandomizer
         _tmp = FF6StaticRandomizer()
         for i, write in enumerate(queue):
-            affected_blocks = _tmp._reg.find_blks_from_addr(write._memblk.addr)
+            affected_blocks = _tmp._reg.find_blks_in_range(*write.affected_blocks())
             print(f"--- Write #{i} ---\n"
                   f"affected blocks: {affected_blocks}\n"
                   f"memblk: {write._memblk}")
@@ -77,7 +193,8 @@ class WriteQueue:
             try:
                 cur_p += p
                 continue
-            except ValueError:
+            # TypeError: not a pair of byte writes
+            except (ValueError, TypeError):
                 queue.append(cur_p)
                 cur_p = p
 
@@ -95,40 +212,49 @@ class WriteQueue:
         log.info(f"{len(self._write_queue)} writes total after merging")
 
         # detect collisions
-        conflicts = self.check_overlaps()
-        #log.warning(f"all: {len(conflicts)} conflicts found")
-        #if len(conflicts) > 0:
-            #log.info("Summary of conflicts:")
-            #log.info("\n" + pprint.pformat(conflicts))
-
-        pos_conf = []
-        while len(self._write_queue) > 0:
-            patcher = self._write_queue.pop(0)
-            log.info(str(patcher))
-            log.info(f"Applying {patcher}, current conflicts in queue {len(pos_conf)}")
+        conflicts = self.check_overlaps(bindata=bindata)
+        for grp in conflicts.components():
+            log.warning(f"{len(grp)} mutually conflicting writes: "
+                        + ", ".join(w._memblk.name for w in grp))
+
+        # One copy of the base image, every patch after this writes in place
+        bindata = RomImage(bindata)
+
+        applied = set()
+        for patcher in self._write_queue:
+            log.info(f"Applying {patcher}")
 
             # does this patch conflict with anything else?
             # if so, take resolution step
             # FIXME: What to do if there are?
             # FIXME: use decompile / compile, e.g., JSON schematic
-            if id(patcher) in pos_conf:
+            if conflicts.neighbors(patcher) & applied:
                 log.info(f"{patcher} has been identified has conflicting with "
                          "an earlier write. Calling conflict resolver.")
-                #conf_resolver()
+                #conf_resolver(conflicts.component(patcher))
                 #self.checkpoint(bindata)
 
             # Apply patch
-            # TODO: merge long patchsets in a chain splice (use PatchFromIPS?)
             bindata = patcher >> bindata
+            applied.add(patcher)
             # TODO: annotate history
 
-            # Add our own conflicts
-            if id(patcher) in conflicts:
-                pos_conf.extend(conflicts[patcher])
-
+        self._write_queue = []
         return bindata
 
+    def to_ips(self, bindata, ips32=False):
+        """
+        Encode the queued writes as a patch against `bindata`, without applying them. The queue is left as is.
+        NOTE: each write is evaluated against `bindata`, as in `check_overlaps`.
+        """
+        hunks = [hunk for patcher in self._write_queue
+                      for hunk in patcher.payloads(bindata)]
+        return IPSWriter(ips32=ips32).encode(hunks, base=bindata)
+
     def queue_write(self, patcher):
+        # bare patch sets are written as a single task
+        if isinstance(patcher, PatchSet):
+            patcher = WritePatchSet(patcher)
         self._write_queue.append(patcher)
 
 from ..components import Registry
@@ -164,17 +290,15 @@ class Compiler(WriteQueue, Registry):
         uneditable -= editable or set(self._blocks)
 
         for write in self._write_queue:
-            blk = write._memblk
-            # FIXME: assumes writes are confined to a single block
-            affected_blks = {b.name
-                             for b in self.find_blks_from_addr(blk.addr)
-                             if b.name not in uneditable}
-
-            for blk in affected_blks:
-                log.info(f"Writing {write} to {blk.name}")
+            affected_blks = {name
+                             for name in self.find_blks_in_range(*write.affected_blocks())
+                             if name not in uneditable}
+
+            if len(affected_blks) > 0:
+                log.info(f"Writing {write} to {', '.join(sorted(affected_blks))}")
                 bindata = write >> bindata
                 #self.register_block(**vars(blk))
-                uneditable.add(blk.name)
+                uneditable |= affected_blks
 
             # No blocks will accept this patch at this time
             if len(affected_blks) == 0:
@@ -1,4 +1,6 @@
+import os
 import math
+import pprint
 import logging
 log = logging.getLogger()
 
@@ -32,41 +34,26 @@ class Utils:
 
     @classmethod
     def bindiff(cls, new, orig, addr, file1="src", file2="dst", outwidth=80):
-        diff = [i for i, (b1, b2) in enumerate(zip(orig, new))
-                if b1 != b2]
-        diff = " ".join(["^^" if i in diff else "  "
-                                    for i in range(len(orig))])
-        _d1 = " ".join([f"{b:02x}" for b in orig])
-        _d2 = " ".join([f"{b:02x}" for b in new])
-
-        pre1 = file1.ljust(15)[:15]
-        pre2 = file2.ljust(15)[:15]
-        prediff = " " * 25
-
-        n = math.ceil(len(_d1) / outwidth)
-        takelen = outwidth - 15
-        takelen -= takelen % 3
-
-        out = []
-        for i in range(n):
-            s, e = i * takelen, (i + 1) * takelen
-            out += ["\n".join((pre1 + f" {addr:08x} " + _d1[s:e],
-                               pre2 + f" {addr:08x} " + _d2[s:e],
-                               prediff + diff[s:e - 10])) + "\n"]
-
-        return "\n".join(out)
+        from .diff import BinDiff
+        # three characters per byte after the name and address
+        width = max((outwidth - 15) // 3, 1)
+        return BinDiff(orig, new).hexdump(width=width, names=(file1, file2), offset=addr)
 
     @classmethod
     def compare(cls, file1, file2, file3=None, suppress_same=False):
         # FIXME: have to refactor this to avoid the circular dependency
         from .autodetect import autodetect_and_load_game
+        from .diff import BinDiff
 
         g1, lhs = autodetect_and_load_game(file1)
         g2, rhs = autodetect_and_load_game(file2)
+        others, names = (), (file1, file2)
         if file3 is not None:
             g3, _ = autodetect_and_load_game(file3)
+            others, names = (g3,), (file1, file2, file3)
 
-        total_diff = 0
+        # one pass over the whole image, everything else is lookups
+        diff = BinDiff(g1, g2)
 
         # TODO: compare differences in block structure
         unknown_blks_1 = lhs._register_non_documented_areas()
@@ -77,57 +64,57 @@ class Utils:
             **unknown_blks_1._blocks,
             **unknown_blks_2._blocks
         }
+        stats = diff.block_stats(all_blks)
 
         for name, blk in all_blks.items():
-            data1 = blk << g1
-            data2 = blk << g2
-            if file3 is not None:
-                data3 = blk << g3
-            diff = sum([b1 != b2 for b1, b2 in zip(data1, data2)])
-            total_diff += diff
-            if not suppress_same and data1 == data2:
+            ndiff, length = stats[name]
+            if not suppress_same and ndiff == 0:
                 print(f"[{blk.addr:8x}+{blk.length:6x}] {name}: {blk.descr}"
                       f"\n\tmatches")
                 continue
-            elif data1 != data2:
+            elif ndiff > 0:
                 print(f"[{blk.addr:8x}+{blk.length:6x}] {name}: {blk.descr}"
-                      f"\n\tdoes not match {diff} / {len(data1)} bytes differ")
-
-            k = 0
-            addr = blk.addr
-            # while len(data1) > 0:
-            while k <= 3:
-                _d1, data1 = data1[:16], data1[16:]
-                _d2, data2 = data2[:16], data2[16:]
-                if file3 is not None:
-                    _d3, data3 = data3[:16], data3[16:]
-                if len(_d1) == 0:
-                    break
-                if _d1 == _d2:
-                    addr += 16
-                    continue
-                k += 1
-
-                diff = [i for i, (b1, b2) in enumerate(zip(_d1, _d2))
-                        if b1 != b2]
-                diff = " " * 25 + " ".join(["^^" if i in diff else "  " for i in range(len(_d1))])
-                _d1 = file1.ljust(15)[:15] + f" {addr:08x} " \
-                      + " ".join([f"{b:02x}" for b in _d1])
-                _d2 = file2.ljust(15)[:15] + f" {addr:08x} " \
-                      + " ".join([f"{b:02x}" for b in _d2])
-                if file3 is not None:
-                    _d3 = file3.ljust(15)[:15] + f" {addr:08x} " \
-                          + " ".join([f"{b:02x}" for b in _d3])
-                    print(_d3)
-                print(_d1)
-                print(_d2)
-                print(diff)
-                print()
-
-                addr += 16
-
-        p = total_diff / len(g1) * 100
-        print(f"Total difference: {total_diff} / {len(g1)} bytes ({p:.3f}%) differ")
+                      f"\n\tdoes not match {ndiff} / {length} bytes differ")
+
+            dump = diff.hexdump(blk.addr, blk.addr + blk.length, names=names,
+                                others=others, max_rows=4)
+            if dump:
+                print(dump)
+
+        for tag, (ndiff, length) in sorted(diff.tag_stats(lhs._reg, stats).items()):
+            print(f"{tag}: {ndiff} / {length} bytes differ")
+
+        p = diff.nbytes / len(g1) * 100
+        print(f"Total difference: {diff.nbytes} / {len(g1)} bytes ({p:.3f}%) differ")
+
+    @classmethod
+    def compare_many(cls, base, *roms, out=None, workers=None, pairwise=False):
+        """
+        Compare every ROM in `roms` against `base`, block by block, in parallel, and with `pairwise` every ROM against each other. Writes the block x ROM matrix to `out` (JSON if it ends in `.json`, CSV otherwise, with the ROM x ROM totals in a `.pairwise.csv` next to it) and returns a per-tag summary.
+        """
+        # FIXME: have to refactor this to avoid the circular dependency
+        from .autodetect import autodetect_and_load_game
+        from .diff import compare_many
+
+        g1, lhs = autodetect_and_load_game(base)
+        all_blks = {
+            **lhs._reg._blocks,
+            **lhs._register_non_documented_areas()._blocks
+        }
+        matrix = compare_many(g1, roms, all_blks, lhs._reg._tags, workers=workers,
+                              pairwise=pairwise)
+
+        if out is not None and out.endswith(".json"):
+            matrix.to_json(out)
+        elif out is not None:
+            matrix.to_csv(out)
+            if pairwise:
+                matrix.to_csv(os.path.splitext(out)[0] + ".pairwise.csv", pairwise=True)
+
+        summary = {tag: list(counts.values()) for tag, counts in matrix.tag_rollup().items()}
+        if pairwise:
+            summary["_pairwise"] = matrix.pairwise()
+        return pprint.pformat(summary)
 
     @classmethod
     def merge(cls, file1, file2):
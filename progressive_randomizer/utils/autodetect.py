@@ -1,7 +1,7 @@
 import logging
 log = logging.getLogger()
 
-from ..components import SNESHeader
+from ..components import SNESHeader, map_rom
 from ..components.randomizers import StaticRandomizer
 from ..game import KNOWN_GAMES
 
@@ -10,14 +10,16 @@ NON_STD_GAMES = [
     detect_bc
 ]
 
-def _read_header(filename):
-    with open(filename, "rb") as fin:
-        romdata = fin.read(0x10000)
-
+def _read_header(romdata):
     return SNESHeader().read(romdata)
 
 def autodetect_and_load_game(filename):
-    header_data = _read_header(filename)
+    """
+    Map the ROM in `filename` and detect which randomizer handles it.
+    The returned ROM data is a read-only mapping, it is only copied into memory when written to (see `WriteQueue.flush`).
+    """
+    romdata = map_rom(filename)
+    header_data = _read_header(romdata)
     game_name = header_data["Game Title Registration"]
 
     # Get first registered non-standard game
@@ -32,8 +34,5 @@ def autodetect_and_load_game(filename):
         rando = KNOWN_GAMES.get(game_name, StaticRandomizer)
     log.info(f"Read header, game name: {game_name} -> {rando}")
 
-    with open(filename, "rb") as fin:
-        romdata = fin.read()
-
     return romdata, rando()
 
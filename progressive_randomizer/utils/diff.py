@@ -0,0 +1,310 @@
+"""
+Whole-image binary diffs.
+"""
+import bisect
+
+import logging
+log = logging.getLogger()
+
+def _changed_ranges_numpy(base, target, size):
+    import numpy
+    lhs = numpy.frombuffer(base, dtype=numpy.uint8, count=size)
+    rhs = numpy.frombuffer(target, dtype=numpy.uint8, count=size)
+
+    # pad with "unchanged" on both ends so every run has a rising and falling edge
+    changed = numpy.zeros(size + 2, dtype=numpy.int8)
+    changed[1:-1] = lhs != rhs
+    edges = numpy.flatnonzero(numpy.diff(changed))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+def _changed_ranges_chunked(base, target, size, chunk=256):
+    ranges, beg = [], None
+    for ptr in range(0, size, chunk):
+        end = min(ptr + chunk, size)
+        # most of an image is usually untouched, skip it a chunk at a time
+        if base[ptr:end] == target[ptr:end]:
+            if beg is not None:
+                ranges.append((beg, ptr))
+                beg = None
+            continue
+
+        for i in range(ptr, end):
+            if base[i] != target[i]:
+                if beg is None:
+                    beg = i
+            elif beg is not None:
+                ranges.append((beg, i))
+                beg = None
+
+    if beg is not None:
+        ranges.append((beg, size))
+    return ranges
+
+def changed_ranges(base, target):
+    """
+    Return the sorted `[beg, end)` ranges where `target` differs from `base`. Anything past the end of `base` counts as changed.
+    Uses numpy if it is available, otherwise falls back to a chunked comparison.
+    """
+    base, target = memoryview(base).cast("B"), memoryview(target).cast("B")
+    size = min(len(base), len(target))
+    try:
+        ranges = _changed_ranges_numpy(base, target, size)
+    except ImportError:
+        ranges = _changed_ranges_chunked(base, target, size)
+
+    if len(target) > size:
+        # extend a run touching the end of the base into the new space
+        if ranges and ranges[-1][1] == size:
+            ranges[-1] = (ranges[-1][0], len(target))
+        else:
+            ranges.append((size, len(target)))
+    return ranges
+
+class BinDiff:
+    """
+    The changed ranges between two images, with lookups of how much changed within any address range and summaries over `Registry` blocks and tags.
+    """
+    def __init__(self, base, target, ranges=None):
+        self._base = base
+        self._target = target
+        self._ranges = changed_ranges(base, target) if ranges is None else ranges
+
+        self._begs = [beg for beg, _ in self._ranges]
+        # number of changed bytes before each range
+        self._cumsum = [0]
+        for beg, end in self._ranges:
+            self._cumsum.append(self._cumsum[-1] + end - beg)
+
+    def __iter__(self):
+        yield from self._ranges
+
+    def __len__(self):
+        return len(self._ranges)
+
+    @property
+    def nbytes(self):
+        """
+        Total number of changed bytes.
+        """
+        return self._cumsum[-1]
+
+    def _changed_below(self, addr):
+        idx = bisect.bisect_right(self._begs, addr) - 1
+        if idx < 0:
+            return 0
+        beg, end = self._ranges[idx]
+        return self._cumsum[idx] + min(addr, end) - beg
+
+    def count(self, beg, end):
+        """
+        Number of changed bytes in `[beg, end)`.
+        """
+        return self._changed_below(end) - self._changed_below(beg)
+
+    def ranges_in(self, beg, end):
+        """
+        The changed ranges clipped to `[beg, end)`.
+        """
+        idx = max(bisect.bisect_right(self._begs, beg) - 1, 0)
+        for _beg, _end in self._ranges[idx:]:
+            if _beg >= end:
+                break
+            if _end > beg:
+                yield max(_beg, beg), min(_end, end)
+
+    def block_stats(self, blocks):
+        """
+        Map block name -> (changed bytes, block length) for every block in `blocks` (e.g. `Registry._blocks`).
+        """
+        return {name: (self.count(blk.addr, blk.addr + blk.length), blk.length)
+                for name, blk in blocks.items()}
+
+    def tag_stats(self, reg, block_stats=None):
+        """
+        Map tag -> (changed bytes, total length) summed over the blocks carrying that tag.
+        """
+        block_stats = block_stats or self.block_stats(reg._blocks)
+        stats = {}
+        for tag, names in reg._tags.items():
+            counts = [block_stats[name] for name in names if name in block_stats]
+            stats[tag] = (sum(c for c, _ in counts), sum(l for _, l in counts))
+        return stats
+
+    def changed_blocks(self, reg):
+        """
+        Names of the blocks in the `Registry` with any changes.
+        """
+        return {name for beg, end in self for name in reg._tree.overlapping(beg, end)}
+
+    def rows(self, beg=0, end=None, width=16):
+        """
+        Start addresses of the `width` byte rows in `[beg, end)` which have changes.
+        """
+        end = len(self._target) if end is None else end
+        last = None
+        for _beg, _end in self.ranges_in(beg, end):
+            first = beg + (_beg - beg) // width * width
+            for row in range(max(first, last + width if last is not None else first),
+                             _end, width):
+                yield row
+                last = row
+
+    def hexdump(self, beg=0, end=None, width=16, names=("src", "dst"), others=(),
+                max_rows=None, offset=0):
+        """
+        Render the rows of `[beg, end)` which have changes, base then target (then any `others` images), with a marker line under the changed bytes.
+        Only the changed rows are read. Displayed addresses are shifted by `offset`.
+        """
+        end = len(self._target) if end is None else end
+        images = (self._base, self._target, *others)
+
+        out = []
+        for i, row in enumerate(self.rows(beg, end, width)):
+            if max_rows is not None and i >= max_rows:
+                break
+            _end = min(row + width, end)
+            for name, img in zip(names, images):
+                data = img[row:_end]
+                out.append(name.ljust(15)[:15] + f" {row + offset:08x} "
+                           + " ".join([f"{b:02x}" for b in data]))
+
+            marks = ["  "] * (_end - row)
+            for _beg, __end in self.ranges_in(row, _end):
+                marks[_beg - row:__end - row] = ["^^"] * (__end - _beg)
+            out.append(" " * 25 + " ".join(marks))
+            out.append("")
+
+        return "\n".join(out)
+
+#
+# N-way comparison
+#
+
+# per-process state for the comparison workers
+_WORKER = {}
+
+def _init_worker(shm_name, size, spans):
+    from ..components.image import attach_rom
+    shm, base = attach_rom(shm_name, size)
+    _WORKER.update(shm=shm, base=base, spans=spans)
+
+def _total_changed(lhs, rhs, diff):
+    # anything past the end of the shorter image counts as changed, either way
+    return diff.nbytes + max(len(lhs) - len(rhs), 0)
+
+def _diff_rom(fname):
+    from ..components.image import map_rom
+    base = _WORKER["base"]
+    with map_rom(fname) as romdata:
+        diff = BinDiff(base, romdata)
+        counts = [diff.count(beg, end) for beg, end in _WORKER["spans"]]
+        return fname, counts, _total_changed(base, romdata, diff), len(romdata)
+
+def _diff_pair(pair):
+    from ..components.image import map_rom
+    lhs, rhs = pair
+    with map_rom(lhs) as ldata, map_rom(rhs) as rdata:
+        total = _total_changed(ldata, rdata, BinDiff(ldata, rdata))
+    return lhs, rhs, total
+
+class DiffMatrix:
+    """
+    Changed byte counts for a set of blocks (rows) across a set of ROMs (columns), all relative to the same base image. Optionally also the total changed bytes between each pair of ROMs.
+    """
+    def __init__(self, blocks, tags=None):
+        self._blocks = blocks
+        self._tags = tags or {}
+        self._columns = {}
+        self._totals = {}
+        self._pairs = {}
+
+    def add_column(self, rom, counts, total):
+        self._columns[rom] = counts
+        self._totals[rom] = total
+
+    def add_pair(self, lhs, rhs, total):
+        self._pairs[lhs, rhs] = self._pairs[rhs, lhs] = total
+
+    def pairwise(self):
+        """
+        Map ROM -> ROM -> changed bytes between them, empty if pairs were not compared.
+        """
+        if not self._pairs:
+            return {}
+        return {lhs: {rhs: 0 if lhs == rhs else self._pairs[lhs, rhs] for rhs in self.roms}
+                for lhs in self.roms}
+
+    @property
+    def roms(self):
+        return list(self._columns)
+
+    def tag_rollup(self):
+        """
+        Map tag -> per-ROM changed byte counts summed over the blocks carrying that tag.
+        """
+        idx = {name: i for i, name in enumerate(self._blocks)}
+        rollup = {}
+        for tag, names in sorted(self._tags.items()):
+            rows = [idx[name] for name in names if name in idx]
+            rollup[tag] = {rom: sum(counts[i] for i in rows)
+                           for rom, counts in self._columns.items()}
+        return rollup
+
+    def to_csv(self, fname, by_tag=False, pairwise=False):
+        import csv
+        with open(fname, "w", newline="") as fout:
+            writer = csv.writer(fout)
+            if pairwise:
+                writer.writerow(["rom", *self.roms])
+                for rom, totals in self.pairwise().items():
+                    writer.writerow([rom, *totals.values()])
+                return
+            if by_tag:
+                writer.writerow(["tag", *self.roms])
+                for tag, counts in self.tag_rollup().items():
+                    writer.writerow([tag, *counts.values()])
+                return
+
+            writer.writerow(["block", "addr", "length", *self.roms])
+            for i, (name, blk) in enumerate(self._blocks.items()):
+                writer.writerow([name, hex(blk.addr), blk.length,
+                                 *[counts[i] for counts in self._columns.values()]])
+            writer.writerow(["_total", "", "", *self._totals.values()])
+
+    def to_json(self, fname):
+        import json
+        with open(fname, "w") as fout:
+            json.dump({
+                "roms": self.roms,
+                "totals": self._totals,
+                "blocks": {name: {"addr": blk.addr, "length": blk.length,
+                                  "diff": [counts[i] for counts in self._columns.values()]}
+                           for i, (name, blk) in enumerate(self._blocks.items())},
+                "tags": self.tag_rollup(),
+                "pairwise": self.pairwise()
+            }, fout, indent=2)
+
+def compare_many(base, roms, blocks, tags=None, workers=None, pairwise=False):
+    """
+    Count the changed bytes per block of every ROM file in `roms` relative to `base`, in a process pool. With `pairwise`, also count the changed bytes between every pair of ROMs.
+    The base image is placed in shared memory once, and each worker maps one ROM (two for a pair) at a time.
+    """
+    import itertools
+    from concurrent.futures import ProcessPoolExecutor
+    from ..components.image import shared_rom
+
+    matrix = DiffMatrix(blocks, tags)
+    spans = [(blk.addr, blk.addr + blk.length) for blk in blocks.values()]
+
+    with shared_rom(base) as shm_name, \
+            ProcessPoolExecutor(workers, initializer=_init_worker,
+                                initargs=(shm_name, len(base), spans)) as pool:
+        for fname, counts, total, size in pool.map(_diff_rom, roms):
+            log.info(f"{fname}: {total} / {size} bytes differ")
+            matrix.add_column(fname, counts, total)
+        if pairwise:
+            for lhs, rhs, total in pool.map(_diff_pair, itertools.combinations(roms, 2),
+                                            chunksize=16):
+                matrix.add_pair(lhs, rhs, total)
+
+    return matrix
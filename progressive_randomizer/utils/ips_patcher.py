@@ -1,64 +1,108 @@
+import bisect
+import mmap
+from collections import namedtuple
+
+from .diff import changed_ranges
+
+class Hunk(namedtuple("Hunk", ("offset", "length", "payload", "rle"))):
+    """
+    A single IPS hunk. `payload` is a view into the patch data; for RLE hunks it is the one byte to be repeated `length` times, and is only expanded when asked for.
+    """
+    __slots__ = ()
+
+    def data(self):
+        if self.rle:
+            return bytes(self.payload) * self.length
+        return self.payload
+
+    def write(self, image):
+        """
+        Write this hunk into the bytearray `image` in place, growing it if the hunk runs past the end.
+        """
+        end = self.offset + self.length
+        if end > len(image):
+            image.extend(bytes(end - len(image)))
+        image[self.offset:end] = self.data()
+
 class IPSReader:
     _HEADER = bytearray([0x50, 0x41, 0x54, 0x43, 0x48])
     _EOF = bytearray([0x45, 0x4F, 0x46])
+    # IPS32 uses four byte offsets, and a correspondingly longer end marker
+    _HEADER32 = bytearray([0x49, 0x50, 0x53, 0x33, 0x32])
+    _EOF32 = bytearray([0x45, 0x45, 0x4F, 0x46])
 
     def __init__(self, fname=None):
         self.trunc_length = 0
-        self.contents = {}
+        self.hunks = []
+        self._contents = {}
 
         if fname is not None:
             self.decode(fname)
 
+    @property
+    def contents(self):
+        """
+        Mapping of offset -> payload, with RLE hunks expanded. Built on first access.
+        NOTE: later hunks at the same offset replace earlier ones here, `hunks` keeps them all.
+        """
+        if self._contents is None:
+            self._contents = {hunk.offset: bytes(hunk.data()) for hunk in self.hunks}
+        return self._contents
+
+    @contents.setter
+    def contents(self, contents):
+        self._contents = dict(contents)
+        self.hunks = [Hunk(offset, len(payload), memoryview(bytes(payload)), False)
+                      for offset, payload in self._contents.items()]
+
     @classmethod
-    def _encode_from_patches(cls, patches):
-        return cls._HEADER + b"".join([p.to_ips() for p in patches]) + cls._EOF
+    def _encode_from_patches(cls, patches, bindata):
+        return cls._HEADER + b"".join([p.to_ips(bindata) for p in patches]) + cls._EOF
 
     @classmethod
     def _encode_from_dict(cls, content):
-        return b"".join([addr.to_bytes(3) + len(payload).to_bytes(2) + bytes(payload)
-                         for addr, payload in content.items()])
+        return IPSWriter().records(content.items())
 
-    def encode(self):
-        return self._HEADER + self._encode_from_dict(self.content) + self._EOF
+    def encode(self, ips32=False):
+        return IPSWriter(ips32=ips32).encode(self, trunc_length=self.trunc_length)
 
-    def decode(self, fname):
+    @classmethod
+    def _map(cls, fname):
         with open(fname, "rb") as patch_file:
-            _contents = patch_file.read()
-        self._decode(_contents)
-
-    def _decode(self, _contents):
-        # As an extension, the end-of-file marker may be followed
-        # by a three-byte length to which the resulting file should be truncated.
-        # Not every patching program will implement this extension, however.
-        try:
-            idx = _contents.rindex(b"EOF") + 3
-            assert len(_contents) - idx <= 3
-
-            self.trunc_length = int.from_bytes(_contents[idx:], 'big')
-            _contents = _contents[:idx]
-        except ValueError:
-            raise ValueError("end bytes invalid")
+            # the mapping outlives the handle, and any hunk views keep it alive
+            return mmap.mmap(patch_file.fileno(), 0, access=mmap.ACCESS_READ)
 
+    @classmethod
+    def iter_hunks(cls, _contents):
+        """
+        Lazily walk the hunks of the IPS patch in `_contents`, yielding `Hunk`s which view into it. Nothing is copied, RLE hunks included.
+        The generator's return value is the truncation length (0 if not present).
+        """
         # An IPS file starts with the magic number "PATCH" (50 41 54 43 48),
         # followed by a series of hunks and an end-of-file marker "EOF" (45 4f 46).
         # All numerical values are unsigned and stored big-endian.
-        try:
-            header = _contents[:5]
-            eof = _contents[-3:]
-            assert header.decode() == "PATCH"
-            assert eof.decode() == "EOF"
-        except UnicodeDecodeError:
-            raise ValueError("header / end bytes invalid")
-
-        _contents = _contents[5:-3]
-
-        # Regular hunks consist of a three-byte offset
-        # followed by a two-byte length of the payload and the payload itself.
-        # Applying the hunk is done by writing the payload at the specified offset.
-        while len(_contents) > 0:
-            offset, length = int.from_bytes(_contents[:3], "big"), \
-                             int.from_bytes(_contents[3:5], "big")
-            _contents = _contents[5:]
+        data = memoryview(_contents)
+        if data[:5] == cls._HEADER:
+            width, eof = 3, cls._EOF
+        elif data[:5] == cls._HEADER32:
+            width, eof = 4, cls._EOF32
+        else:
+            raise ValueError("header bytes invalid")
+
+        ptr, size = 5, len(data)
+        while ptr + width <= size:
+            # the end marker is read where an offset would be
+            if data[ptr:ptr + width] == eof:
+                break
+
+            # Regular hunks consist of a three-byte offset
+            # followed by a two-byte length of the payload and the payload itself.
+            # Applying the hunk is done by writing the payload at the specified offset.
+            if ptr + width + 2 > size:
+                raise ValueError(f"truncated hunk header at 0x{ptr:x}")
+            offset = int.from_bytes(data[ptr:ptr + width], "big")
+            length = int.from_bytes(data[ptr + width:ptr + width + 2], "big")
+            ptr += width + 2
 
             # RLE hunks have their length field set to zero;
             # in place of a payload there is a two-byte length of the run
@@ -66,30 +110,81 @@ class IPSReader:
             # Applying the RLE hunk is done by writing this byte
             # the specified number of times at the specified offset.
             if length == 0:
-                #print("RLE")
-                payload, _contents = _contents[:3], _contents[3:]
-                length = int.from_bytes(payload[:2], "big")
-                payload = payload[2:3] * length
+                if ptr + 3 > size:
+                    raise ValueError(f"truncated RLE hunk at 0x{ptr:x}")
+                length = int.from_bytes(data[ptr:ptr + 2], "big")
+                hunk = Hunk(offset, length, data[ptr + 2:ptr + 3], True)
+                ptr += 3
             else:
-                #print("standard")
-                payload, _contents = _contents[:length], _contents[length:]
-            #print(hex(offset), hex(offset + length), length)
+                if ptr + length > size:
+                    raise ValueError(f"truncated hunk at 0x{ptr:x}")
+                hunk = Hunk(offset, length, data[ptr:ptr + length], False)
+                ptr += length
 
-            # length is implied in the bytestring object, not needed to preserve
-            self.contents[offset] = payload
+            yield hunk
+        else:
+            raise ValueError("end bytes invalid")
 
-    def __iter__(self):
-        for offset, payload in self.contents.items():
-            yield offset, payload
+        # As an extension, the end-of-file marker may be followed
+        # by a three-byte length to which the resulting file should be truncated.
+        # Not every patching program will implement this extension, however.
+        trailer = data[ptr + width:]
+        if len(trailer) not in (0, width):
+            raise ValueError("end bytes invalid")
+        return int.from_bytes(trailer, "big")
 
-    def apply(self, inbytes):
-        for offset, payload in self.contents.items():
-            inbytes = inbytes[:offset] + bytes(payload) + inbytes[offset+len(payload):]
+    @classmethod
+    def iter_file(cls, fname):
+        """
+        Lazily iterate over the hunks of the IPS file `fname`, which is memory-mapped rather than read.
+        """
+        return cls.iter_hunks(cls._map(fname))
 
-        if self.trunc_length > 0:
-            inbytes = inbytes[self.trunc_length:]
+    @classmethod
+    def _drain(cls, hunks, func):
+        """
+        Call `func` on each hunk from `iter_hunks` and return the truncation length.
+        """
+        while True:
+            try:
+                func(next(hunks))
+            except StopIteration as eof:
+                return eof.value
 
-        return inbytes
+    @classmethod
+    def _patch(cls, hunks, inbytes, trunc_length=None):
+        # write in place if we can, otherwise make one mutable copy
+        image = inbytes if isinstance(inbytes, bytearray) else bytearray(inbytes)
+        _trunc_length = cls._drain(hunks, lambda hunk: hunk.write(image))
+        trunc_length = _trunc_length if trunc_length is None else trunc_length
+        if trunc_length:
+            del image[trunc_length:]
+        return image
+
+    @classmethod
+    def apply_file(cls, fname, inbytes):
+        """
+        Stream the IPS file `fname` into `inbytes` in a single pass, without decoding the whole patch first.
+        A bytearray (or `RomImage`) is written to in place, anything else is copied once.
+        """
+        return cls._patch(cls.iter_file(fname), inbytes)
+
+    def decode(self, fname):
+        self._decode(self._map(fname))
+
+    def _decode(self, _contents):
+        self.hunks, self._contents = [], None
+        self.trunc_length = self._drain(self.iter_hunks(_contents), self.hunks.append)
+
+    def __iter__(self):
+        for hunk in self.hunks:
+            yield hunk.offset, hunk.data()
+
+    def apply(self, inbytes):
+        """
+        Apply the patch to `inbytes` in a single pass. A bytearray (or `RomImage`) is written to in place, anything else is copied once.
+        """
+        return self._patch(iter(self.hunks), inbytes, self.trunc_length)
 
     def pretty_print(self, width=24, fmt_str=None):
         for offset, payload in self.contents.items():
@@ -108,6 +203,151 @@ class IPSReader:
                 fmt_str.format(addr=hex(offset), contents=pstr)
                 print(fmt_str)
 
+class IPSWriter:
+    """
+    Builds IPS (or IPS32) patches, either from (offset, payload) hunks or from the difference between two images.
+    Given the base image, unchanged bytes are dropped from the hunks and hunks separated by short unchanged gaps are joined (the gap bytes are cheaper than another hunk header).
+    Runs of a single byte are written as RLE hunks where that is smaller, hunks longer than 0xFFFF bytes are split, and no hunk is placed at the offset which reads as the end-of-file marker.
+    """
+    _MAX_LENGTH = 0xFFFF
+
+    def __init__(self, ips32=False, max_gap=None):
+        self._width = 4 if ips32 else 3
+        self._header = IPSReader._HEADER32 if ips32 else IPSReader._HEADER
+        self._eof = IPSReader._EOF32 if ips32 else IPSReader._EOF
+        self._eof_offset = int.from_bytes(self._eof, "big")
+        # a hunk header is the offset and a two byte length
+        self._hunk_cost = self._width + 2
+        # joining across a gap pays for the gap bytes, but saves a header
+        self._max_gap = self._hunk_cost - 1 if max_gap is None else max_gap
+
+    def _segments(self, hunks, base=None):
+        """
+        Resolve the hunks into sorted, disjoint (offset, data) runs of the patched image, trimmed to what actually changed when `base` is given.
+        """
+        from ..components.patchset import PatchSet
+        if not isinstance(hunks, PatchSet):
+            hunks = PatchSet.from_hunks(hunks)
+
+        for offset, data in hunks.coalesce():
+            if base is None:
+                yield offset, data
+                continue
+
+            # compare against the base over the part of the run it covers
+            base_view = memoryview(base)[offset:offset + len(data)]
+            for beg, end in changed_ranges(base_view, data):
+                yield offset + beg, data[beg:end]
+
+    def _join(self, segments, base=None):
+        """
+        Join runs separated by short gaps, filling the gap from `base`.
+        """
+        cur_off, cur_data = None, None
+        for offset, data in segments:
+            if cur_data is not None:
+                gap = offset - (cur_off + len(cur_data))
+                if base is not None and gap <= self._max_gap \
+                        and offset <= len(base):
+                    cur_data += base[offset - gap:offset]
+                    cur_data += data
+                    continue
+                yield cur_off, cur_data
+            cur_off, cur_data = offset, bytearray(data)
+
+        if cur_data is not None:
+            yield cur_off, cur_data
+
+    def _split(self, offset, data):
+        """
+        Split one run into (offset, payload, rle) hunks. A run of `r` identical bytes is worth its own RLE hunk (header + 3 bytes) when `r` is more than 3 bytes plus a header for each literal piece it would cut out of the run.
+        """
+        ptr, lit, size = 0, 0, len(data)
+        while ptr < size:
+            val, end = data[ptr], ptr + 1
+            while end < size and data[end] == val and end - ptr < self._MAX_LENGTH:
+                end += 1
+
+            pieces = (ptr > lit) + (end < size)
+            if end - ptr > 3 + self._hunk_cost * pieces:
+                yield from self._literal(offset + lit, data[lit:ptr])
+                yield offset + ptr, data[ptr:ptr + 1], end - ptr
+                lit = end
+            ptr = end
+
+        yield from self._literal(offset + lit, data[lit:size])
+
+    def _literal(self, offset, data):
+        for ptr in range(0, len(data), self._MAX_LENGTH):
+            yield offset + ptr, data[ptr:ptr + self._MAX_LENGTH], None
+
+    def _dodge_eof(self, hunk, lookup):
+        """
+        A hunk at the end marker's offset would end the patch early, start it one byte before instead.
+        """
+        offset, payload, run = hunk
+        if offset != self._eof_offset:
+            return [hunk]
+
+        prev = lookup(offset - 1)
+        if run is not None:
+            # two bytes by hand, then the rest of the run
+            return [(offset - 1, bytes([prev]) + bytes(payload), None)] \
+                   + ([(offset + 1, payload, run - 1)] if run > 1 else [])
+
+        payload = bytes([prev]) + bytes(payload)
+        return [(offset - 1, payload[:self._MAX_LENGTH], None)] \
+               + ([(offset - 1 + self._MAX_LENGTH, payload[self._MAX_LENGTH:], None)]
+                  if len(payload) > self._MAX_LENGTH else [])
+
+    def _record(self, offset, payload, run):
+        if offset >= 1 << (8 * self._width):
+            raise ValueError(f"Hunk at 0x{offset:x} is out of range for this format, use IPS32.")
+        if run is not None:
+            return offset.to_bytes(self._width, "big") + b"\x00\x00" \
+                   + run.to_bytes(2, "big") + bytes(payload)
+        return offset.to_bytes(self._width, "big") + len(payload).to_bytes(2, "big") \
+               + bytes(payload)
+
+    def records(self, hunks, base=None):
+        """
+        The encoded hunk records (no header or end marker) for `hunks`, applied in order.
+        """
+        segments = list(self._join(self._segments(hunks, base), base))
+        starts = [offset for offset, _ in segments]
+
+        def lookup(addr):
+            idx = bisect.bisect_right(starts, addr) - 1
+            if idx >= 0 and addr < starts[idx] + len(segments[idx][1]):
+                return segments[idx][1][addr - starts[idx]]
+            if base is not None and addr < len(base):
+                return base[addr]
+            raise ValueError(f"Need the byte at 0x{addr:x} to avoid the end-of-file "
+                             "offset, but no base image was given.")
+
+        return b"".join([self._record(*hunk)
+                         for offset, data in segments
+                         for _hunk in self._split(offset, data)
+                         for hunk in self._dodge_eof(_hunk, lookup)])
+
+    def encode(self, hunks, base=None, trunc_length=0):
+        """
+        Encode a full patch from the (offset, payload) `hunks`. With the `base` image, only bytes which differ from it are kept.
+        """
+        patch = self._header + self.records(hunks, base) + self._eof
+        if trunc_length:
+            patch += trunc_length.to_bytes(self._width, "big")
+        return bytes(patch)
+
+    def diff(self, base, target):
+        """
+        Encode the patch taking `base` to `target`.
+        """
+        target = memoryview(target)
+        hunks = [(beg, target[beg:end]) for beg, end in changed_ranges(base, target)]
+        trunc_length = len(target) if len(target) < len(base) else 0
+        return self.encode(hunks, base, trunc_length)
+
 if __name__ == "__main__":
     import sys
     for fname in sys.argv[1:]:
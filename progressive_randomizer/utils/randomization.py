@@ -1,43 +1,217 @@
 import random
 import math
+import hashlib
 
-def shuffle(collection):
-    return random.sample(list(collection), k=len(collection))
+class SeedTree:
+    """
+    Reproducible random streams derived from a single root seed.
+    A stream is keyed by its name (and the names of the subtrees above it), not by when it is requested, so tasks which each draw from their own stream give the same results however many there are and in whatever order they run.
+    """
+    def __init__(self, seed=0, path=()):
+        self.seed = seed
+        self.path = tuple(path)
 
-def shuffle_idx(n):
-    return random.sample(range(n), k=n)
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.seed!r}, {self.path!r})"
 
-def choice_without_replacement(pool, k=1):
+    def spawn(self, *names):
+        """
+        Subtree for the `names`, e.g. one per manager.
+        """
+        return SeedTree(self.seed, self.path + names)
+
+    def entropy(self, *names):
+        """
+        64 bit seed for the stream named `names`.
+        """
+        key = repr((self.seed,) + self.path + names).encode()
+        return int.from_bytes(hashlib.sha256(key).digest()[:8], "little")
+
+    def stream(self, *names):
+        """
+        A new `random.Random` for the `names`. Requesting the same names again restarts the same sequence.
+        """
+        return random.Random(self.entropy(*names))
+
+    def generator(self, *names):
+        """
+        As `stream`, but a NumPy `Generator`, for the array samplers.
+        """
+        import numpy
+        return numpy.random.default_rng(self.entropy(*names))
+
+# All of these draw from the global `random` state unless given a stream
+# (anything with the `random.Random` interface) with `rng`
+def shuffle(collection, rng=None):
+    rng = rng or random
+    return rng.sample(list(collection), k=len(collection))
+
+def shuffle_idx(n, rng=None):
+    rng = rng or random
+    return rng.sample(range(n), k=n)
+
+def choice_without_replacement(pool, k=1, rng=None):
+    rng = rng or random
     # Probably slow
     idx = list(range(len(pool)))
-    random.shuffle(idx)
+    rng.shuffle(idx)
     return [pool[i] for i in idx[:k]]
 
 # TODO: a lot of this could be replaced with a discrete beta
-def triangle(a, b, c=0, n=2):
-    return c + sum([random.randint(a, b) for _ in range(n)])
+def triangle(a, b, c=0, n=2, rng=None):
+    rng = rng or random
+    return c + sum([rng.randint(a, b) for _ in range(n)])
 
-def match_n(n, m=0):
-    return random.randint(0, n) == m
+def match_n(n, m=0, rng=None):
+    rng = rng or random
+    return rng.randint(0, n) == m
 
-def accum_n(n, b, a=0, init=0):
-    while match_n(n):
-        init += random.randint(a, b)
+def accum_n(n, b, a=0, init=0, rng=None):
+    rng = rng or random
+    while match_n(n, rng=rng):
+        init += rng.randint(a, b)
     return init
 
-def random_prob(p=0.5):
-    return random.uniform(0, 1) < p
+def random_prob(p=0.5, rng=None):
+    rng = rng or random
+    return rng.uniform(0, 1) < p
 
-def poisson(l=1):
+def poisson(l=1, rng=None):
+    rng = rng or random
     k, p = 0, 1
     while p > math.exp(-l):
         k += 1
-        p *= random.uniform(0, 1)
+        p *= rng.uniform(0, 1)
 
     return k - 1
 
-def discrete_beta(n=1, mode=1, inv_width=1):
+def discrete_beta(n=1, mode=1, inv_width=1, rng=None):
+    rng = rng or random
     # FIXME: disallow the mode = n problem
     alpha = mode / n * (2 * inv_width - 2) + 1
     beta = (1 - mode / n) * (2 * inv_width - 2) + 1
-    return int(n * random.betavariate(alpha, beta)) % n
+    return int(n * rng.betavariate(alpha, beta)) % n
+
+#
+# Array samplers
+#
+# NumPy counterparts of the above, returning `size` draws at once. `rng` is a
+# NumPy `Generator` (e.g. from `SeedTree.generator`), a fresh one if not given.
+def _generator(rng):
+    import numpy
+    return numpy.random.default_rng() if rng is None else rng
+
+def _shape(size):
+    return (size,) if isinstance(size, int) else tuple(size)
+
+def triangle_array(a, b, c=0, n=2, size=None, rng=None):
+    rng = _generator(rng)
+    shape = (n,) if size is None else (n, *_shape(size))
+    return c + rng.integers(a, b, size=shape, endpoint=True).sum(axis=0)
+
+def match_n_array(n, m=0, size=None, rng=None):
+    return _generator(rng).integers(0, n, size=size, endpoint=True) == m
+
+def accum_n_array(n, b, a=0, init=0, size=None, rng=None):
+    import numpy
+    rng = _generator(rng)
+    # the number of consecutive matches is geometric
+    count = rng.geometric(n / (n + 1), size=size) - 1
+    flat = numpy.ravel(count)
+    draws = rng.integers(a, b, size=flat.sum(), endpoint=True)
+    owner = numpy.repeat(numpy.arange(flat.size), flat)
+    total = numpy.bincount(owner, weights=draws, minlength=flat.size).astype(int)
+    return init + total.reshape(numpy.shape(count))
+
+def random_prob_array(p=0.5, size=None, rng=None):
+    return _generator(rng).random(size=size) < p
+
+def poisson_array(l=1, size=None, rng=None):
+    return _generator(rng).poisson(l, size=size)
+
+def discrete_beta_array(n=1, mode=1, inv_width=1, size=None, rng=None):
+    import numpy
+    rng = _generator(rng)
+    mode = numpy.asarray(mode) / n
+    alpha = mode * (2 * inv_width - 2) + 1
+    beta = (1 - mode) * (2 * inv_width - 2) + 1
+    return (n * rng.beta(alpha, beta, size=size)).astype(int) % n
+
+def k_of_n(n, k, size=None, avail=None, rng=None):
+    """
+    Boolean array of shape (`size`, `n`) with `k` (a number, or one per row) distinct entries set in each row, chosen uniformly from those marked in `avail`. Rows with fewer than `k` available get all of them.
+    A single `k` is found by partitioning random keys rather than shuffling the whole row.
+    """
+    import numpy
+    rng = _generator(rng)
+    rows = () if size is None else _shape(size)
+    avail = numpy.ones((*rows, n), dtype=bool) if avail is None \
+            else numpy.broadcast_to(avail, (*rows, n))
+    keys = numpy.where(avail, rng.random((*rows, n)), 2.)
+    k = numpy.minimum(numpy.asarray(k), n)
+
+    if k.ndim == 0:
+        if k <= 0:
+            return numpy.zeros_like(avail)
+        kth = numpy.partition(keys, k - 1, axis=-1)[..., k - 1:k]
+    else:
+        kth = numpy.take_along_axis(numpy.sort(keys, axis=-1),
+                                    numpy.maximum(k - 1, 0)[..., None], axis=-1)
+        kth = numpy.where(k[..., None] > 0, kth, -1.)
+    return avail & (keys <= kth)
+
+def choice_without_replacement_array(pool, k=1, size=None, rng=None):
+    """
+    `k` distinct items of `pool` for each of `size` draws, shape (`size`, `k`), in random order.
+    """
+    import numpy
+    rng = _generator(rng)
+    pool = numpy.asarray(pool)
+    if size is None:
+        return pool[rng.choice(len(pool), size=min(k, len(pool)), replace=False)]
+    rows = _shape(size)
+    keys = rng.random((*rows, len(pool)))
+    k = min(k, len(pool))
+    # the k smallest keys are a uniform subset, sorting just those orders it
+    idx = numpy.argpartition(keys, k - 1, axis=-1)[..., :k]
+    idx = numpy.take_along_axis(idx, numpy.take_along_axis(keys, idx, -1).argsort(-1), -1)
+    return pool[idx]
+
+class AliasTable:
+    """
+    Walker / Vose alias table for drawing from `pool` with the given `weights` in constant time per draw. Building it is linear in the size of the pool.
+    """
+    def __init__(self, weights, pool=None):
+        import numpy
+        weights = numpy.asarray(weights, dtype=float)
+        if weights.ndim != 1 or len(weights) == 0 or (weights < 0).any() \
+                or weights.sum() <= 0:
+            raise ValueError("Weights must be a non-empty list of non-negative numbers "
+                             "with a positive sum.")
+        n = len(weights)
+        self.pool = None if pool is None else numpy.asarray(pool)
+        self.prob = numpy.ones(n)
+        self.alias = numpy.arange(n)
+
+        scaled = weights * n / weights.sum()
+        small = [i for i in range(n) if scaled[i] < 1]
+        large = [i for i in range(n) if scaled[i] >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s], self.alias[s] = scaled[s], l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+        # anything left over is 1 up to rounding
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, size=None, rng=None):
+        import numpy
+        rng = _generator(rng)
+        idx = rng.integers(0, len(self), size=size)
+        idx = numpy.where(rng.random(size=size) < self.prob[idx], idx, self.alias[idx])
+        return idx if self.pool is None else self.pool[idx]
+
+def weighted_choice_array(pool, weights, size=None, rng=None):
+    return AliasTable(weights, pool).sample(size, rng)